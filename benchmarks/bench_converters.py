@@ -0,0 +1,90 @@
+"""Latency and throughput of the color converters"""
+import numpy as np
+
+import csiro_colors
+from csiro_colors.colorspaces import convert_colorspace
+
+SIZES = [10 ** 3, 10 ** 5, 10 ** 7]
+
+
+class Latency:
+    def setup(self):
+        self.cmap = csiro_colors.get_cmap('viridis')
+
+    def time_hex_to_rgb(self):
+        csiro_colors.hex_to_rgb('#00a9ce')
+
+    def time_rgb_to_hex(self):
+        csiro_colors.rgb_to_hex((0.0, 0.66, 0.8))
+
+    def time_hex_to_rgb_short_list(self):
+        csiro_colors.hex_to_rgb(['#00a9ce', '#004b87', '#78be20', '#e4002b', '#ffb81c'])
+
+    def time_rgb_to_hex_short_list(self):
+        csiro_colors.rgb_to_hex([(0.0, 0.66, 0.8), (0.0, 0.29, 0.53), (0.47, 0.75, 0.13),
+                                 (0.89, 0.0, 0.17), (1.0, 0.72, 0.11)])
+
+    def time_namedcolor_to_hex(self):
+        csiro_colors.namedcolor_to_hex('steelblue')
+
+    def time_cmap_to_hex(self):
+        csiro_colors.cmap_to_hex(self.cmap)
+
+
+class HexThroughput:
+    params = SIZES
+    param_names = ['n_colors']
+
+    def setup(self, n):
+        rng = np.random.default_rng(0)
+        self.rgb = rng.random((n, 3))
+        self.hex = csiro_colors.rgb_to_hex_array(self.rgb)
+
+    def time_hex_to_rgb_array(self, n):
+        csiro_colors.hex_to_rgb_array(self.hex)
+
+    def time_rgb_to_hex_array(self, n):
+        csiro_colors.rgb_to_hex_array(self.rgb)
+
+    def time_color_array_from_hex(self, n):
+        csiro_colors.ColorArray.from_hex(self.hex)
+
+
+class ColorspaceThroughput:
+    params = (SIZES, ['float32', 'float64'])
+    param_names = ['n_colors', 'dtype']
+
+    def setup(self, n, dtype):
+        self.rgb = np.random.default_rng(0).random((n, 3)).astype(dtype)
+
+    def time_srgb_to_oklab(self, n, dtype):
+        convert_colorspace(self.rgb, 'srgb', 'oklab')
+
+    def time_srgb_to_lab(self, n, dtype):
+        convert_colorspace(self.rgb, 'srgb', 'lab')
+
+
+class NearestNamedColor:
+    params = SIZES[:2] + [10 ** 6]
+    param_names = ['n_colors']
+
+    def setup(self, n):
+        self.rgb = np.random.default_rng(0).integers(0, 256, (n, 3), dtype=np.uint8)
+        csiro_colors.get_named_color_index()
+
+    def time_nearest_named_color(self, n):
+        csiro_colors.nearest_named_color(self.rgb)
+
+
+class PrintColor:
+    params = [1000, 10000]
+    param_names = ['n_colors']
+
+    def setup(self, n):
+        self.rgb = np.random.default_rng(0).random((n, 3))
+
+    def time_print_color(self, n):
+        csiro_colors.print_color(self.rgb)
+
+    def time_print_color_tooltips(self, n):
+        csiro_colors.print_color(self.rgb, tooltips=True)
@@ -0,0 +1,42 @@
+"""Colormap generators, with and without their caches"""
+import csiro_colors
+
+COLORS = ['#00a9ce', '#004b87', '#e4002b', '#78be20']
+
+
+class Generators:
+    def time_generate_linear_cmap(self):
+        csiro_colors.generate_linear_cmap.cache_clear()
+        csiro_colors.generate_linear_cmap(COLORS)
+
+    def time_generate_linear_cmap_oklab(self):
+        csiro_colors.generate_linear_cmap.cache_clear()
+        csiro_colors.generate_linear_cmap(COLORS, space='oklab')
+
+    def time_generate_linear_cmap_cached(self):
+        csiro_colors.generate_linear_cmap(COLORS)
+
+    def time_generate_discrete_cmap(self):
+        csiro_colors.generate_discrete_cmap.cache_clear()
+        csiro_colors.generate_discrete_cmap('viridis', n_colors=12)
+
+    def time_brew_colors(self):
+        csiro_colors.brew_colors.cache_clear()
+        csiro_colors.brew_colors('viridis', 7)
+
+    def time_brew_colors_cached(self):
+        csiro_colors.brew_colors('viridis', 7)
+
+    def time_randomize_cmap_batch(self):
+        csiro_colors.randomize_cmap('viridis', 20, seed=0, n_cmaps=100)
+
+
+class DistinctPalette:
+    params = [10, 100, 500]
+    param_names = ['n_colors']
+
+    def setup(self, n):
+        csiro_colors.generate_distinct_palette(2)
+
+    def time_generate_distinct_palette(self, n):
+        csiro_colors.generate_distinct_palette(n)
@@ -0,0 +1,15 @@
+"""Import time, measured in fresh interpreters"""
+
+
+class ImportTime:
+    # timeraw benchmarks return the code to time, which runs in a new interpreter
+    repeat = 10
+
+    def timeraw_import(self):
+        return "import csiro_colors"
+
+    def timeraw_hex_to_rgb(self):
+        return "import csiro_colors; csiro_colors.hex_to_rgb('#00a9ce')"
+
+    def timeraw_get_cmap(self):
+        return "import csiro_colors; csiro_colors.get_cmap('twilight'); csiro_colors.get_cmap('csiro_reds')"
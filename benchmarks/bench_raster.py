@@ -0,0 +1,62 @@
+"""Raster colorization speed and peak memory"""
+import numpy as np
+
+import csiro_colors
+
+SHAPE = (2000, 2000)
+
+
+class ApplyCmap:
+    def setup(self):
+        rng = np.random.default_rng(0)
+        self.data = rng.random(SHAPE, dtype=np.float32)
+        self.labels = rng.integers(0, 5000, SHAPE).astype(np.int32)
+        self.image = rng.integers(0, 256, (500, 500, 3), dtype=np.uint8)
+        self.cmap = csiro_colors.get_cmap('viridis')
+
+    def time_apply_cmap(self):
+        csiro_colors.apply_cmap(self.data, self.cmap)
+
+    def time_matplotlib_call(self):
+        self.cmap(self.data, bytes=True)
+
+    def peakmem_apply_cmap(self):
+        csiro_colors.apply_cmap(self.data, self.cmap)
+
+    def peakmem_matplotlib_call(self):
+        self.cmap(self.data, bytes=True)
+
+    def time_colorize_labels(self):
+        csiro_colors.colorize_labels(self.labels, 'tab20')
+
+    def peakmem_colorize_labels(self):
+        csiro_colors.colorize_labels(self.labels, 'tab20')
+
+    def time_quantize_image(self):
+        csiro_colors.quantize_image(self.image)
+
+    def time_quantize_image_floyd_steinberg(self):
+        csiro_colors.quantize_image(self.image, dither='floyd-steinberg')
+
+
+class ColorVisionDeficiency:
+    def setup(self):
+        rng = np.random.default_rng(0)
+        self.rgba = rng.integers(0, 256, SHAPE + (4,), dtype=np.uint8)
+        csiro_colors.simulate_cvd(self.rgba[:1, :1])
+
+    def time_simulate_cvd(self):
+        csiro_colors.simulate_cvd(self.rgba, 'deutan')
+
+    def time_cvd_scores(self):
+        csiro_colors.cvd._scores.clear()
+        csiro_colors.cvd_scores()
+
+
+class Legibility:
+    def setup(self):
+        rng = np.random.default_rng(0)
+        self.cells = csiro_colors.apply_cmap(rng.random(SHAPE, dtype=np.float32), 'viridis', packed=True)
+
+    def time_best_text_color(self):
+        csiro_colors.best_text_color(self.cells)
@@ -0,0 +1,57 @@
+"""Registry lookups, catalog rendering and colormap export"""
+import shutil
+import tempfile
+
+import csiro_colors
+from csiro_colors import matplotlib_registry
+from csiro_colors.exporters import EXPORT_FORMATS, export_colormaps, load_colormaps
+
+
+class Lookup:
+    def time_get_cmap(self):
+        csiro_colors.get_cmap('viridis')
+
+    def time_get_cmap_reversed(self):
+        csiro_colors.get_cmap('csiro_blues_r')
+
+    def time_search_colormaps(self):
+        csiro_colors.search_colormaps('blue', include_reversed=True)
+
+
+class CatalogRendering:
+    def setup(self):
+        self.names = matplotlib_registry.available_colormaps
+
+    def time_repr_html_first_page(self):
+        matplotlib_registry._thumbnails.clear()
+        matplotlib_registry._repr_html_()
+
+    def time_repr_html_full_catalog(self):
+        matplotlib_registry._thumbnails.clear()
+        matplotlib_registry.search(page_size=len(self.names), include_reversed=True)._repr_html_()
+
+    def peakmem_repr_html_full_catalog(self):
+        matplotlib_registry._thumbnails.clear()
+        matplotlib_registry.search(page_size=len(self.names), include_reversed=True)._repr_html_()
+
+
+class Export:
+    params = [list(EXPORT_FORMATS)]
+    param_names = ['fmt']
+
+    def setup(self, fmt):
+        self.folder = tempfile.mkdtemp()
+        # materialize the colormaps once, only the export is timed
+        matplotlib_registry.colormap_registry
+        export_colormaps(matplotlib_registry, self.folder, formats=fmt)
+
+    def teardown(self, fmt):
+        shutil.rmtree(self.folder, ignore_errors=True)
+
+    def time_export_registry(self, fmt):
+        export_colormaps(matplotlib_registry, self.folder, formats=fmt)
+
+    def time_load_registry(self, fmt):
+        catalog = load_colormaps(self.folder, formats=fmt)
+        for name in catalog:
+            catalog[name]
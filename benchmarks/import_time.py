@@ -0,0 +1,86 @@
+"""Import time benchmark for csiro_colors
+
+Every measurement runs in a fresh interpreter, so that nothing is cached between runs.
+The lightweight import is compared with the modules that ``import csiro_colors``
+used to pull in eagerly (matplotlib.pyplot, IPython and branca).
+
+Usage
+-----
+    python benchmarks/import_time.py [--repeat 10]
+"""
+import argparse
+import os
+import subprocess
+import sys
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+HEAVY_MODULES = ['matplotlib.pyplot', 'IPython', 'branca']
+
+SCENARIOS = {
+    'import csiro_colors': "import csiro_colors",
+    'hex_to_rgb': "import csiro_colors; csiro_colors.hex_to_rgb('#00a9ce')",
+    'get_cmap (matplotlib/csiro)': "import csiro_colors; csiro_colors.get_cmap('twilight'); csiro_colors.get_cmap('csiro_reds')",
+    'eager import (previous behaviour)': (
+        "import csiro_colors; import matplotlib.pyplot; import IPython.display; import branca.colormap"
+    ),
+}
+
+_TEMPLATE = """
+import sys, time
+t0 = time.perf_counter()
+{code}
+t1 = time.perf_counter()
+heavy = [m for m in {heavy!r} if m in sys.modules]
+print(repr((t1 - t0, heavy)))
+"""
+
+
+def time_scenario(code, repeat=10):
+    """Run a snippet in fresh interpreters and time it
+
+    Parameters
+    ----------
+    code : str
+        python code to execute
+    repeat : int, optional
+        number of interpreters to spawn, by default 10
+
+    Returns
+    -------
+    tuple of (list of float, list of str)
+        elapsed times in seconds and the heavy modules that ended up imported
+    """
+    timings = []
+    heavy = []
+    env = dict(os.environ, PYTHONPATH=os.pathsep.join([ROOT, os.environ.get('PYTHONPATH', '')]))
+    for _ in range(repeat):
+        out = subprocess.check_output(
+            [sys.executable, '-c', _TEMPLATE.format(code=code, heavy=HEAVY_MODULES)], env=env, cwd=ROOT
+        )
+        elapsed, heavy = eval(out.decode('utf-8').strip().splitlines()[-1])
+        timings.append(elapsed)
+    return timings, heavy
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--repeat', type=int, default=10, help='number of fresh interpreters per scenario')
+    args = parser.parse_args(argv)
+
+    results = {}
+    print('{0:<36} {1:>10} {2:>10}  {3}'.format('scenario', 'median ms', 'min ms', 'heavy modules imported'))
+    for name, code in SCENARIOS.items():
+        timings, heavy = time_scenario(code, repeat=args.repeat)
+        timings = sorted(timings)
+        results[name] = timings[len(timings) // 2]
+        print('{0:<36} {1:>10.1f} {2:>10.1f}  {3}'.format(
+            name, 1000 * results[name], 1000 * timings[0], ', '.join(heavy) or '-'))
+
+    saving = results['eager import (previous behaviour)'] - results['import csiro_colors']
+    print('\nimport csiro_colors saves {0:.1f} ms compared to the eager import'.format(1000 * saving))
+    return results
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,252 @@
+"""Benchmark runner for csiro_colors
+
+Benchmarks are written in the asv style, in the bench_*.py modules of this folder:
+functions or methods prefixed with ``time_`` are timed, ``peakmem_`` report the
+peak memory allocated during a call (measured with tracemalloc) and ``timeraw_``
+return code that is timed in fresh interpreters. Classes can define ``setup``,
+``params`` and ``param_names``. The same files can also be run with asv.
+
+Results are saved as JSON and can be compared with a stored baseline,
+benchmarks slower (or using more memory) than the baseline by more than
+the given factor are reported as regressions.
+
+Usage
+-----
+    python benchmarks/run.py [--bench REGEX] [--save results.json]
+    python benchmarks/run.py --compare benchmarks/baselines/reference.json [--factor 1.2]
+    python benchmarks/run.py --report results.json --compare benchmarks/baselines/reference.json
+"""
+import argparse
+import importlib.util
+import inspect
+import itertools
+import json
+import os
+import platform
+import re
+import subprocess
+import sys
+import timeit
+import tracemalloc
+
+HERE = os.path.dirname(os.path.abspath(__file__))
+ROOT = os.path.dirname(HERE)
+sys.path.insert(0, ROOT)
+sys.path.insert(0, HERE)
+
+from import_time import time_scenario  # noqa: E402
+
+PREFIXES = ('time_', 'peakmem_', 'timeraw_')
+
+
+def _load_modules(folder=HERE):
+    modules = []
+    for filename in sorted(os.listdir(folder)):
+        if filename.startswith('bench_') and filename.endswith('.py'):
+            name = filename[:-3]
+            spec = importlib.util.spec_from_file_location(name, os.path.join(folder, filename))
+            module = importlib.util.module_from_spec(spec)
+            spec.loader.exec_module(module)
+            modules.append(module)
+    return modules
+
+
+def _param_sets(owner):
+    params = getattr(owner, 'params', None)
+    if params is None:
+        return [()]
+    if not params or not isinstance(params[0], (list, tuple)):
+        params = [params]
+    return list(itertools.product(*params))
+
+
+def discover(pattern=None):
+    """Find the benchmarks of the bench_*.py modules
+
+    Parameters
+    ----------
+    pattern : str, optional
+        regular expression the benchmark names must match, by default None
+
+    Returns
+    -------
+    list of tuple
+        (name, kind, owner class or None, attribute name, parameters)
+    """
+    benchmarks = []
+    for module in _load_modules():
+        for obj_name, obj in sorted(vars(module).items()):
+            if inspect.isclass(obj) and obj.__module__ == module.__name__:
+                owners = [(module.__name__ + '.' + obj_name, obj, sorted(vars(obj)))]
+            elif inspect.isfunction(obj) and obj.__module__ == module.__name__:
+                owners = [(module.__name__, None, [obj_name])]
+            else:
+                continue
+            for prefix_name, owner, attributes in owners:
+                for attribute in attributes:
+                    kind = next((p for p in PREFIXES if attribute.startswith(p)), None)
+                    if kind is None:
+                        continue
+                    for params in _param_sets(owner if owner is not None else getattr(module, attribute)):
+                        name = '{0}.{1}'.format(prefix_name, attribute)
+                        if params:
+                            name += '({0})'.format(', '.join(repr(p) for p in params))
+                        if pattern is None or re.search(pattern, name):
+                            benchmarks.append((name, kind, owner, attribute, params, module))
+    return benchmarks
+
+
+def _bind(owner, attribute, params, module):
+    if owner is None:
+        return getattr(module, attribute), None
+    instance = owner()
+    if hasattr(instance, 'setup'):
+        instance.setup(*params)
+    return getattr(instance, attribute), instance
+
+
+def run_benchmark(benchmark, repeat=5):
+    """Run one benchmark
+
+    Returns
+    -------
+    dict
+        kind, unit and value (median seconds per call or peak bytes), and for timings
+        the min and the number of calls per measurement
+    """
+    name, kind, owner, attribute, params, module = benchmark
+    func, instance = _bind(owner, attribute, params, module)
+    try:
+        if kind == 'time_':
+            timer = timeit.Timer(lambda: func(*params))
+            number, _ = timer.autorange()
+            timings = sorted(t / number for t in timer.repeat(repeat=repeat, number=number))
+            return dict(kind=kind, unit='s', value=timings[len(timings) // 2], min=timings[0], number=number)
+        elif kind == 'peakmem_':
+            func(*params)
+            tracemalloc.start()
+            try:
+                func(*params)
+                _, peak = tracemalloc.get_traced_memory()
+            finally:
+                tracemalloc.stop()
+            return dict(kind=kind, unit='B', value=peak)
+        else:
+            code = func(*params)
+            timings, _ = time_scenario(code, repeat=getattr(instance, 'repeat', repeat))
+            timings = sorted(timings)
+            return dict(kind=kind, unit='s', value=timings[len(timings) // 2], min=timings[0], number=1)
+    finally:
+        if instance is not None and hasattr(instance, 'teardown'):
+            instance.teardown(*params)
+
+
+def _metadata():
+    import matplotlib
+    import numpy
+    try:
+        commit = subprocess.check_output(['git', 'rev-parse', '--short', 'HEAD'], cwd=ROOT,
+                                         stderr=subprocess.DEVNULL).decode().strip()
+    except (OSError, subprocess.CalledProcessError):
+        commit = None
+    return dict(commit=commit, python=platform.python_version(), numpy=numpy.__version__,
+                matplotlib=matplotlib.__version__, machine=platform.machine(), system=platform.system())
+
+
+def format_value(value, unit):
+    """Human readable time or memory value"""
+    if value is None:
+        return '-'
+    if unit == 'B':
+        for scale, suffix in ((2 ** 30, 'GiB'), (2 ** 20, 'MiB'), (2 ** 10, 'KiB')):
+            if value >= scale:
+                return '{0:.1f} {1}'.format(value / scale, suffix)
+        return '{0} B'.format(value)
+    for scale, suffix in ((1, 's'), (1e-3, 'ms'), (1e-6, 'us')):
+        if value >= scale:
+            return '{0:.3g} {1}'.format(value / scale, suffix)
+    return '{0:.3g} ns'.format(value / 1e-9)
+
+
+def compare(baseline, results, factor=1.2):
+    """Compare results with a baseline
+
+    Parameters
+    ----------
+    baseline, results : dict
+        content of results files, as saved by main
+    factor : float, optional
+        ratio above which a benchmark is a regression (and below 1 / factor an improvement), by default 1.2
+        timings are compared by their fastest run
+
+    Returns
+    -------
+    list of tuple
+        (flag, name, baseline value, new value, ratio, unit) for every benchmark,
+        flag is '+' for regressions, '-' for improvements and ' ' otherwise
+    """
+    rows = []
+    old, new = baseline['results'], results['results']
+    for name in sorted(set(old) | set(new)):
+        before, after = old.get(name), new.get(name)
+        unit = (after or before)['unit']
+        if before is None or after is None or not before['value']:
+            rows.append(('x', name, before and before['value'], after and after['value'], None, unit))
+            continue
+        # the fastest run is the least sensitive to noise from other processes
+        ratio = after.get('min', after['value']) / before.get('min', before['value'])
+        flag = '+' if ratio > factor else '-' if ratio < 1 / factor else ' '
+        rows.append((flag, name, before['value'], after['value'], ratio, unit))
+    return rows
+
+
+def print_comparison(rows, baseline, results):
+    print('baseline: {0}'.format(baseline['metadata']))
+    print('current:  {0}\n'.format(results['metadata']))
+    print('  {0:<12} {1:<12} {2:>7}  {3}'.format('before', 'after', 'ratio', 'benchmark'))
+    for flag, name, before, after, ratio, unit in rows:
+        print('{0} {1:<12} {2:<12} {3:>7}  {4}'.format(
+            flag, format_value(before, unit), format_value(after, unit),
+            '-' if ratio is None else '{0:.2f}'.format(ratio), name))
+    regressions = [r for r in rows if r[0] == '+']
+    improvements = [r for r in rows if r[0] == '-']
+    print('\n{0} regressions, {1} improvements'.format(len(regressions), len(improvements)))
+    return regressions
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--bench', '-b', help='regular expression selecting the benchmarks to run')
+    parser.add_argument('--repeat', type=int, default=5, help='number of measurements per benchmark')
+    parser.add_argument('--save', help='file where the results are saved as JSON')
+    parser.add_argument('--report', help='results file to compare instead of running the benchmarks')
+    parser.add_argument('--compare', help='baseline results file to compare with')
+    parser.add_argument('--factor', type=float, default=1.2, help='ratio above which a change is reported')
+    args = parser.parse_args(argv)
+
+    if args.report:
+        with open(args.report) as f:
+            results = json.load(f)
+    else:
+        results = dict(metadata=_metadata(), results={})
+        for benchmark in discover(args.bench):
+            result = run_benchmark(benchmark, repeat=args.repeat)
+            results['results'][benchmark[0]] = result
+            print('{0:<12} {1}'.format(format_value(result['value'], result['unit']), benchmark[0]))
+            sys.stdout.flush()
+        if args.save:
+            with open(args.save, 'w') as f:
+                json.dump(results, f, indent=1, sort_keys=True)
+
+    if args.compare:
+        with open(args.compare) as f:
+            baseline = json.load(f)
+        if args.bench:
+            baseline['results'] = {k: v for k, v in baseline['results'].items() if re.search(args.bench, k)}
+        regressions = print_comparison(compare(baseline, results, args.factor), baseline, results)
+        return 1 if regressions else 0
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
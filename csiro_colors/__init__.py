@@ -1,12 +1,25 @@
 import numpy as np
 import matplotlib.colors as col
 
-from .converters import hex_to_rgb, rgb_to_hex, cmap_to_hex, cmap_to_rgb, namedcolor_to_rgb, namedcolor_to_hex, NAMED_COLORS
-from .cmaps import matplotlib_registry, branca_registry, csiro_registry, get_cmap
-from .generators import generate_discrete_cmap, generate_linear_cmap, generate_palette, randomize_cmap
-from .utils import print_color, colorPicker
-
-
+from ._version import __version__
+from .converters import hex_to_rgb, rgb_to_hex, hex_to_rgb_array, rgb_to_hex_array, cmap_to_hex, cmap_to_rgb, namedcolor_to_rgb, namedcolor_to_hex, NAMED_COLORS
+from .colorarray import ColorArray
+from .colorspaces import convert_colorspace, delta_e
+from .views import ColormapView, ListedColormapView, cmap_view
+from .cmaps import matplotlib_registry, branca_registry, csiro_registry, get_cmap, search_colormaps, ColormapCatalog, CatalogView
+from .generators import generate_discrete_cmap, generate_linear_cmap, generate_palette, generate_distinct_palette, randomize_cmap
+from .nearest import NamedColorIndex, get_named_color_index, nearest_named_color
+from .quantize import quantize_image, get_palette_lut
+from .raster import apply_cmap, apply_cmap_chunked, colorize_labels, get_cmap_lut
+from .contrast import relative_luminance, contrast_matrix, best_text_color, WCAG_AA, WCAG_AA_LARGE, WCAG_AAA
+from .cvd import simulate_cvd, cvd_matrix, cvd_score, cvd_scores, search_cvd_safe_colormaps, CVD_TYPES
+from .exporters import export_colormaps, format_colormap, read_colormap, load_colormaps, EXPORT_FORMATS
+from .utils import print_color, render_swatches, colorPicker, ColorPicker
+from ._cache import memoize, cache_info, cache_clear
+from ._diskcache import get_cache_dir, set_cache_dir
+
+
+@memoize(maxsize=256)
 def brew_colors(cmap, nbins=None):
     """Retrieve a matplotlib or colorbrewer colormap to generate a discrete or linear matplotlib colormap
 
@@ -19,6 +32,8 @@ def brew_colors(cmap, nbins=None):
         passing None will return a discrete colormap with all available colors
         passing False will return a linear colormap
 
+    Calls with a colormap name are cached, every call returns a copy that can be safely modified.
+
     Returns
     -------
     ListedColormap or LinearSegmentColormap
@@ -27,7 +42,7 @@ def brew_colors(cmap, nbins=None):
     name = cmap
 
     if nbins is False:
-        cmap = get_cmap(cmap, return_hex=True)
+        cmap = ColorArray.from_cmap(get_cmap(cmap))
         return generate_linear_cmap(cmap, name)
     elif nbins == None:
         return get_cmap(cmap)
@@ -0,0 +1,169 @@
+import copy
+import threading
+from collections import OrderedDict, namedtuple
+from functools import wraps
+from types import MappingProxyType
+from inspect import signature
+
+import numpy as np
+from matplotlib.colors import Colormap
+
+CacheInfo = namedtuple('CacheInfo', ['hits', 'misses', 'maxsize', 'currsize'])
+
+# every memoized function, so that they can be inspected and cleared together
+_memoized = OrderedDict()
+
+
+class _FrozenList(tuple):
+    pass
+
+
+# arguments keyed by value, without recursing into them
+_SCALAR_TYPES = frozenset([str, bytes, int, float, bool, type(None)])
+
+
+def _freeze_key(value):
+    # lists and tuples of hashable items (for example HEX codes) can be used as keys.
+    # The type is part of the key so that, for example, False and 0 are different entries
+    if isinstance(value, (list, tuple)):
+        types = tuple(map(type, value))
+        if _SCALAR_TYPES.issuperset(types):
+            return (type(value),) + types + tuple(value)
+        return (type(value),) + tuple(_freeze_key(v) for v in value)
+    hash(value)
+    return (type(value), value)
+
+
+def _freeze_array(value):
+    value = np.array(value)
+    value.flags.writeable = False
+    return value
+
+
+def _freeze(result):
+    # cache a private, read-only copy of the result. The segment data and the colors of
+    # the cached Colormap are frozen once here, so that hits only need a shallow copy
+    if isinstance(result, Colormap):
+        result = copy.copy(result)
+        segmentdata = getattr(result, '_segmentdata', None)
+        if segmentdata is not None:
+            result._segmentdata = MappingProxyType(dict(
+                (k, v if callable(v) else _freeze_array(v)) for k, v in segmentdata.items()))
+        # views compute their colors from the base colormap, they have no colors of their own
+        colors = vars(result).get('colors')
+        if isinstance(colors, np.ndarray):
+            result.colors = _freeze_array(colors)
+        elif isinstance(colors, list):
+            result.colors = [tuple(c) if isinstance(c, list) else c for c in colors]
+        # build the lookup table once, copies share it until they are called
+        result._init()
+    elif isinstance(result, list):
+        result = _FrozenList(result)
+    return result
+
+
+def _thaw(result):
+    # hand out a private copy, so that callers can never modify the cached entry.
+    # Like Colormap.__copy__, but the cached entry is always initialized
+    if isinstance(result, Colormap):
+        out = result.__class__.__new__(result.__class__)
+        out.__dict__.update(result.__dict__)
+        out._lut = result._lut.copy()
+        colors = out.__dict__.get('colors')
+        if isinstance(colors, np.ndarray):
+            out.colors = colors.copy()
+        elif isinstance(colors, list):
+            out.colors = list(colors)
+        return out
+    elif isinstance(result, _FrozenList):
+        return list(result)
+    return result
+
+
+def memoize(maxsize=128):
+    """Decorator caching the results of a function in a thread-safe LRU cache
+
+    Arguments are bound to the function signature, so that positional, keyword
+    and default arguments share the same entry. Only calls with hashable arguments,
+    such as colormap names, numbers and lists of HEX codes, are cached: Colormap and
+    ColorArray objects are unhashable, calls with them bypass the cache.
+    Cached Colormap and list results are copied on every call, the colors and lookup
+    table of Colormap results are copied but their segment data is shared read-only.
+
+    The decorated function exposes cache_info() and cache_clear().
+
+    Parameters
+    ----------
+    maxsize : int, optional
+        maximum number of entries, by default 128
+    """
+    def decorator(func):
+        sig = signature(func)
+        defaults = tuple(p.default for p in sig.parameters.values())
+        cache = OrderedDict()
+        lock = threading.Lock()
+        stats = {'hits': 0, 'misses': 0}
+
+        @wraps(func)
+        def wrapper(*args, **kwargs):
+            try:
+                if kwargs or len(args) > len(defaults):
+                    bound = sig.bind(*args, **kwargs)
+                    bound.apply_defaults()
+                    args_key = tuple(bound.arguments.values())
+                else:
+                    # fast path for positional arguments
+                    args_key = args + defaults[len(args):]
+                key = _freeze_key(args_key)
+            except TypeError:
+                return func(*args, **kwargs)
+
+            with lock:
+                try:
+                    result = cache[key]
+                    cache.move_to_end(key)
+                    stats['hits'] += 1
+                    return _thaw(result)
+                except KeyError:
+                    stats['misses'] += 1
+
+            result = _freeze(func(*args, **kwargs))
+            with lock:
+                # another thread might have stored the same entry in the meantime
+                result = cache.setdefault(key, result)
+                cache.move_to_end(key)
+                while len(cache) > maxsize:
+                    cache.popitem(last=False)
+            return _thaw(result)
+
+        def cache_info():
+            with lock:
+                return CacheInfo(stats['hits'], stats['misses'], maxsize, len(cache))
+
+        def cache_clear():
+            with lock:
+                cache.clear()
+                stats['hits'] = stats['misses'] = 0
+
+        wrapper.cache_info = cache_info
+        wrapper.cache_clear = cache_clear
+        _memoized[func.__module__ + '.' + func.__name__] = wrapper
+        return wrapper
+    return decorator
+
+
+def cache_info():
+    """Return the cache statistics of every memoized function
+
+    Returns
+    -------
+    dict
+        CacheInfo(hits, misses, maxsize, currsize) by function name
+    """
+    return {name: func.cache_info() for name, func in _memoized.items()}
+
+
+def cache_clear():
+    """Clear the cache of every memoized function"""
+    for func in _memoized.values():
+        func.cache_clear()
@@ -1,27 +1,57 @@
+import hashlib
 import uuid
-import os
 import json
 
+import numpy as np
+
+from .converters import NAMED_COLORS, _hex_to_uint8
+from .colorspaces import convert_colorspace
+
 class ColorPicker():
-    # this will have an additional line prepended
-    _bootstrap = """
-    var uid = '{uid}';
-    var named_colors = {colors};
-    var currentFrame = document.querySelector('#ColorPickerShadowRoot_' + uid)
-    var shadow = currentFrame.attachShadow({{mode: 'open'}});
-    var template = currentFrame.querySelector('#ColorPickerTemplate');
-    var clone = document.importNode(template.content, true);
-    shadow.appendChild(clone);
+    """Color picker widget for Jupyter notebooks
+
+    The scripts, styles and named color index are sent with the first picker displayed
+    in every frontend session and shared by the next ones, which only send a few hundred
+    bytes. Reloading the page starts a new frontend session, so the assets are sent again.
+
+    Parameters
+    ----------
+    standalone : bool, optional
+        whether to always send the assets, by default False
+        useful when outputs are displayed out of order, e.g. in exported pages
     """
+    # defines the shared assets under a window attribute named after their content
+    _assets = """
+    <script>
+    (function () {{
+        var index = {index};
+        var css = {css};
+        var template = {template};
+        {js}
+        window['{assets_id}'] = {{mount: mount}};
+    }})();
+    </script>
+    """
+    # index is {names: sorted lowercase names, hex: their HEX codes, lab: flat CIELAB
+    # coordinates, order: indices sorted by lightness, lightness: sorted lightness}
     _js = """
-    var currentFrame = document.currentScript.parentNode.shadowRoot
-    var colorPicker = currentFrame.querySelector('#color_picker');
-    colorPicker.addEventListener("input", watchColorPicker, false);
-    var colorSelector = currentFrame.querySelector('#color_selector');
-    colorSelector.addEventListener("input", watchColorSelector, false);
-
     var changeEvent = new CustomEvent("input")
 
+    function mount(root) {
+        var shadow = root.attachShadow({mode: 'open'});
+        shadow.innerHTML = '<style>' + css + '</style>' + template;
+        var colorPicker = shadow.querySelector('#color_picker');
+        colorPicker.addEventListener("input", watchColorPicker, false);
+        var colorSelector = shadow.querySelector('#color_selector');
+        colorSelector.addEventListener("input", watchColorSelector, false);
+        shadow.addEventListener("click", function (event) {
+            var el = event.target.closest('[data-copy]');
+            if (el != null) {
+                copyHexColor(el);
+            }
+        }, false);
+        colorPicker.dispatchEvent(changeEvent)
+    }
 
     function watchColorPicker(event) {
         var currentWidget = event.target.closest('tbody');
@@ -51,28 +81,31 @@ class ColorPicker():
         populateHslTable(hsl_val, currentWidget);
         populateColorTable(hsl_val, currentWidget);
 
-        closerNamedColors = findCloserColors(xyzToLab(rgbToXyz(rgb_val)));
+        var closerNamedColors = findCloserColors(xyzToLab(rgbToXyz(rgb_val)));
 
-        sg_el_index = 1
-        for (var i=0; i < 5; i++) {
-            if (named_colors[closerNamedColors[i]] == event.target.value) {
+        var sg_el_index = 1
+        for (var i=0; i < closerNamedColors.length && sg_el_index <= 4; i++) {
+            var k = closerNamedColors[i];
+            if (index.hex[k] == event.target.value) {
                 continue
             }
 
-            sg_el = currentWidget.querySelector('#suggested_colors' + sg_el_index.toString())
-            sg_el.innerHTML = closerNamedColors[i];
-            sg_el.style.backgroundColor = named_colors[closerNamedColors[i]];
-            adjustColor(sg_el, rgbToHsl(hexToRgb(named_colors[closerNamedColors[i]])));
+            var sg_el = currentWidget.querySelector('#suggested_colors' + sg_el_index.toString())
+            sg_el.innerHTML = index.names[k];
+            sg_el.style.backgroundColor = index.hex[k];
+            adjustColor(sg_el, rgbToHsl(hexToRgb(index.hex[k])));
             sg_el_index ++
         }
 
     }
 
     function watchColorSelector(event) {
+        var currentWidget = event.target.closest('tbody');
+        suggestNames(event.target.value, currentWidget.querySelector('#color_names'));
+
         var validColor = isValidColor(event.target.value)
-        var isNamedColor = event.target.value in named_colors
+        var isNamedColor = findName(event.target.value) >= 0
         if(validColor != '' || isNamedColor) {
-            var currentWidget = event.target.closest('tbody');
             var picker = currentWidget.querySelector('#color_picker');
             
             rgb_val = digestRGBCode(validColor);
@@ -170,16 +203,9 @@ class ColorPicker():
     }
 
     function copyHexColor(el) {
-        console.log('clicked');
-        console.log(el);
         var currentWidget = el.closest('tbody');
-        console.log(currentWidget);
         var picker = currentWidget.querySelector('#color_picker');
-        console.log(picker);
-
-        console.log('clicked2');
         var hex_code = rgbToHex(el.style.backgroundColor);
-        console.log(hex_code);
         picker.value = hex_code;
         picker.dispatchEvent(changeEvent);
     }
@@ -230,14 +256,40 @@ class ColorPicker():
 
     function colourNameToHex(colour)
     {
-        if (typeof named_colors == 'undefined') {
-            return false;
+        var k = findName(colour);
+        return k >= 0 ? index.hex[k] : false;
+    }
+
+    function lowerBound(sorted, value) {
+        // first position of a sorted array whose value is not lower than value
+        var lo = 0, hi = sorted.length;
+        while (lo < hi) {
+            var mid = (lo + hi) >> 1;
+            if (sorted[mid] < value) lo = mid + 1;
+            else hi = mid;
         }
+        return lo;
+    }
 
-        if (typeof named_colors[colour.toLowerCase()] != 'undefined')
-            return named_colors[colour.toLowerCase()];
+    function findName(name) {
+        name = name.trim().toLowerCase();
+        var k = lowerBound(index.names, name);
+        return index.names[k] === name ? k : -1;
+    }
 
-        return false;
+    function suggestNames(prefix, datalist, n_names=10) {
+        // named colors starting with prefix, a contiguous range of the sorted names
+        prefix = prefix.trim().toLowerCase();
+        var options = [];
+        if (prefix.length > 0) {
+            for (var k = lowerBound(index.names, prefix);
+                 k < index.names.length && options.length < n_names && index.names[k].startsWith(prefix); k++) {
+                var option = document.createElement('option');
+                option.value = index.names[k];
+                options.push(option);
+            }
+        }
+        datalist.replaceChildren(...options);
     }
 
     function rgbToHsl(rgb){
@@ -347,28 +399,29 @@ class ColorPicker():
         }
     }
 
-    var named_color_lab = { }
-    for (const [key, value] of Object.entries(named_colors)) {
-        named_color_lab[key] = xyzToLab(rgbToXyz(hexToRgb(value)))
-    }
-
-    // https://stackoverflow.com/questions/46622486/what-is-the-javascript-equivalent-of-numpy-argsort
-    var argsort = (arr1, arr2) => arr1
-        .map((item, index) => [arr2[index], item]) // add the args to sort by
-        .sort(([arg1], [arg2]) => arg2 - arg1) // sort by the args
-        .map(([, item]) => item); // extract the sorted items
-
     function findCloserColors(target_labColor, n_colors=5) {
-        var colorDistance = { }
-        for (const [key, value] of Object.entries(named_color_lab)) {
-            colorDistance[key] = Math.sqrt( Math.pow(target_labColor.l - value.l, 2) + Math.pow(target_labColor.a - value.a, 2) + Math.pow(target_labColor.b - value.b, 2) )
+        // colors are visited by increasing lightness difference from the target, the search
+        // stops when the lightness difference alone exceeds the distance of the n-th closest color
+        var best = [];
+        var hi = lowerBound(index.lightness, target_labColor.l), lo = hi - 1;
+        while (lo >= 0 || hi < index.order.length) {
+            var dlo = lo >= 0 ? target_labColor.l - index.lightness[lo] : Infinity;
+            var dhi = hi < index.order.length ? index.lightness[hi] - target_labColor.l : Infinity;
+            var pos = dlo < dhi ? lo-- : hi++;
+            if (best.length == n_colors && Math.min(dlo, dhi) >= best[n_colors - 1][0]) {
+                break;
+            }
+            var k = index.order[pos];
+            var distance = Math.sqrt(Math.pow(target_labColor.l - index.lab[3 * k], 2) +
+                                     Math.pow(target_labColor.a - index.lab[3 * k + 1], 2) +
+                                     Math.pow(target_labColor.b - index.lab[3 * k + 2], 2));
+            if (best.length < n_colors || distance < best[best.length - 1][0]) {
+                best.splice(lowerBound(best.map(b => b[0]), distance), 0, [distance, k]);
+                best.length = Math.min(best.length, n_colors);
+            }
         }
-
-        closerColors = argsort(Object.keys(colorDistance), Object.values(colorDistance))
-        return closerColors.slice(-n_colors).reverse()
+        return best.map(b => b[1]);
     }
-
-    colorPicker.dispatchEvent(changeEvent)
     """
 
     _style = """
@@ -448,21 +501,24 @@ class ColorPicker():
             }
     """
 
-    _layout = """
+    # displayed by every picker, mounts the shared assets into a shadow root
+    _instance = """
+    <div id='ColorPickerShadowRoot_{uid}'></div>
     <script>
-    {bootstrap}
+    (function () {{
+        var root = document.getElementById('ColorPickerShadowRoot_{uid}');
+        var assets = window['{assets_id}'];
+        if (assets) {{
+            assets.mount(root);
+        }} else {{
+            root.innerHTML = '<p>The color picker scripts were sent with an earlier output, ' +
+                'display csiro_colors.ColorPicker(standalone=True) instead</p>';
+        }}
+    }})();
     </script>
+    """
 
-    <div id='ColorPickerShadowRoot_{uid}'>
-        <script>
-        {js}
-        </script>
-        <template id='ColorPickerTemplate'>
-
-            <style>
-            {css}
-            </style>
-
+    _template = """
             <table>
                 <thead><tr>
                         <td colspan=6 style='text-align:center;'>Color Picker</td>
@@ -476,93 +532,132 @@ class ColorPicker():
                             <p id='input_label'>Pick a color or type a color code below</p>
                         </td>
                         <td colspan=2 rowspan=1 class='empty'></td>
-                        <td colspan=2 rowspan=1 class='hsl_cell'><div class="0perc" onclick='copyHexColor(this)'>0%</div></td>
+                        <td colspan=2 rowspan=1 class='hsl_cell'><div class="0perc" data-copy>0%</div></td>
                     </tr>
                     <tr>
                         <td colspan=2 rowspan=1 class='color_bg' ><p  style='color: black;' >black text</p></td>
-                        <td colspan=2 rowspan=1 class='hsl_cell'><div class="10perc" onclick='copyHexColor(this)'>10%</div></td>
+                        <td colspan=2 rowspan=1 class='hsl_cell'><div class="10perc" data-copy>10%</div></td>
                     </tr>
                     <tr>
                         <td colspan=2 rowspan=1 class='color_bg' ><p style='color:white;'>white text</p></td>
-                        <td colspan=2 rowspan=1 class='hsl_cell'><div class="20perc" onclick='copyHexColor(this)'>20%</div></td>
+                        <td colspan=2 rowspan=1 class='hsl_cell'><div class="20perc" data-copy>20%</div></td>
                     </tr>
                     <tr>
                         <td colspan=2 rowspan=1 style='background-color:black;'><p class='color_text' >colored text</p></td>
-                        <td colspan=2 rowspan=1 class='hsl_cell'><div class="30perc" onclick='copyHexColor(this)'>30%</div></td>
+                        <td colspan=2 rowspan=1 class='hsl_cell'><div class="30perc" data-copy>30%</div></td>
                     </tr>
 
                     <tr colspan=6>
                         <td colspan=2 rowspan=1 class='empty'></td>
                         <td colspan=2 rowspan=1 style='background-color:white;'><p class='color_text' >colored text</p></td>
-                        <td colspan=2 rowspan=1 class='hsl_cell'><div class="40perc" onclick='copyHexColor(this)'>40%</div></td>
+                        <td colspan=2 rowspan=1 class='hsl_cell'><div class="40perc" data-copy>40%</div></td>
                     </tr>
 
                     <tr colspan=6>
                         <td colspan=2 rowspan=1>
-                            <input type="text" id="color_selector" name="color_selector"
+                            <input type="text" id="color_selector" name="color_selector" list="color_names"
                                     placeholder="(e.g. csiro_darkblue, gold, rgb(..), hsl(..), #..">
+                            <datalist id="color_names"></datalist>
                         </td>
-                        <td colspan=2 rowspan=1><p class="analogue1" onclick='copyHexColor(this)'>(analogue)</p></td>
-                        <td colspan=2 rowspan=1 class='hsl_cell'><div class="50perc" onclick='copyHexColor(this)'>50%</div></td>
+                        <td colspan=2 rowspan=1><p class="analogue1" data-copy>(analogue)</p></td>
+                        <td colspan=2 rowspan=1 class='hsl_cell'><div class="50perc" data-copy>50%</div></td>
                     </tr>
 
                     <tr colspan=6>
                         <td colspan=2 rowspan=1 class='empty'></td>
-                        <td colspan=2 rowspan=1><p class="analogue2" onclick='copyHexColor(this)'>(analogue)</p></td>
-                        <td colspan=2 rowspan=1 class='hsl_cell'><div class="60perc" onclick='copyHexColor(this)'>60%</div></td>
+                        <td colspan=2 rowspan=1><p class="analogue2" data-copy>(analogue)</p></td>
+                        <td colspan=2 rowspan=1 class='hsl_cell'><div class="60perc" data-copy>60%</div></td>
                     </tr>
 
                     <tr colspan=6>
                         <td colspan=2 rowspan=1><p class='value_element' id='rgb_code'>rbg(0, 0, 0)</p></td>
-                        <td colspan=2 rowspan=1><p class="complementary" onclick='copyHexColor(this)'>(complementary)</p></td>
-                        <td colspan=2 rowspan=1 class='hsl_cell'><div class="70perc" onclick='copyHexColor(this)'>70%</div></td>
+                        <td colspan=2 rowspan=1><p class="complementary" data-copy>(complementary)</p></td>
+                        <td colspan=2 rowspan=1 class='hsl_cell'><div class="70perc" data-copy>70%</div></td>
                     </tr>
 
                     <tr colspan=6>
                         <td colspan=2 rowspan=1><p class='value_element' id='hsl_code'>hsl(0, 0%, 0%)</p></td>
-                        <td colspan=2 rowspan=1><p class="triadic1" onclick='copyHexColor(this)'>(triadic)</p></td>
-                        <td colspan=2 rowspan=1 class='hsl_cell'><div class="80perc" onclick='copyHexColor(this)'>80%</div></td>
+                        <td colspan=2 rowspan=1><p class="triadic1" data-copy>(triadic)</p></td>
+                        <td colspan=2 rowspan=1 class='hsl_cell'><div class="80perc" data-copy>80%</div></td>
                     </tr>
 
                     <tr colspan=6>
                         <td colspan=2 colspan=1 rowspan=1><p class='value_element' id='hex_code'>#000000</p></td>
-                        <td colspan=2 rowspan=1><p class="triadic2" onclick='copyHexColor(this)'>(triadic)</p></td>
-                        <td colspan=2 rowspan=1 class='hsl_cell'><div class="90perc" onclick='copyHexColor(this)'>90%</div></td>
+                        <td colspan=2 rowspan=1><p class="triadic2" data-copy>(triadic)</p></td>
+                        <td colspan=2 rowspan=1 class='hsl_cell'><div class="90perc" data-copy>90%</div></td>
                     </tr>
 
                     <tr colspan=6>
                         <td colspan=2 rowspan=1 class='empty'></td>
                         <td colspan=2 rowspan=1 class='empty'></td>
-                        <td colspan=2 rowspan=1 class='hsl_cell'><div class="100perc" onclick='copyHexColor(this)'>100%</div></td>
+                        <td colspan=2 rowspan=1 class='hsl_cell'><div class="100perc" data-copy>100%</div></td>
                     </tr>
                     <tr colspan=6>
                         <td colspan=2 rowspan=1 class='value_element'>
                             <p class='value_element'>Suggested Named Colors</p>
                         </td>
                         <td colspan=4 rowspan=1 class='value_element'>
-                            <p class='value_element' id='suggested_colors1' onclick='copyHexColor(this)' style="width:23%; display:inline-block">Suggested Named Colors</p>
-                            <p class='value_element' id='suggested_colors2' onclick='copyHexColor(this)' style="width:23%; display:inline-block">Suggested Named Colors</p>
-                            <p class='value_element' id='suggested_colors3' onclick='copyHexColor(this)' style="width:23%; display:inline-block">Suggested Named Colors</p>
-                            <p class='value_element' id='suggested_colors4' onclick='copyHexColor(this)' style="width:23%; display:inline-block">Suggested Named Colors</p>
+                            <p class='value_element' id='suggested_colors1' data-copy style="width:23%; display:inline-block">Suggested Named Colors</p>
+                            <p class='value_element' id='suggested_colors2' data-copy style="width:23%; display:inline-block">Suggested Named Colors</p>
+                            <p class='value_element' id='suggested_colors3' data-copy style="width:23%; display:inline-block">Suggested Named Colors</p>
+                            <p class='value_element' id='suggested_colors4' data-copy style="width:23%; display:inline-block">Suggested Named Colors</p>
                         </td>
                     </tr>
 
                 </tbody>
             </table>
-        </template>
-    </div>
     """
 
-    NAMED_COLORS = json.load(open(os.path.join(os.path.dirname(__file__), './named_colors.json')))
-
-    def __init__(self):
-        pass
+    NAMED_COLORS = NAMED_COLORS
+
+    # shared assets, built once, and the frontend sessions they were displayed in
+    _assets_html = None
+    _assets_id = None
+    _assets_sessions = set()
+
+    def __init__(self, standalone=False):
+        self.standalone = standalone
+
+    @classmethod
+    def _color_index(cls):
+        # named colors sorted by name for the lookups, and by lightness for the nearest color search
+        names = sorted(cls.NAMED_COLORS)
+        hex_codes = [cls.NAMED_COLORS[n].lower() for n in names]
+        lab = convert_colorspace(_hex_to_uint8(np.array(hex_codes)), 'srgb', 'lab')
+        order = np.argsort(lab[:, 0], kind='stable')
+        return dict(names=names, hex=hex_codes, lab=np.round(lab, 3).ravel().tolist(),
+                    order=order.tolist(), lightness=np.round(lab[order, 0], 3).tolist())
+
+    @classmethod
+    def _get_assets(cls):
+        if cls._assets_html is None:
+            index = json.dumps(cls._color_index(), separators=(',', ':'))
+            content = ''.join([index, cls._style, cls._template, cls._js])
+            cls._assets_id = 'csiroColorPicker_' + hashlib.sha1(content.encode('utf-8')).hexdigest()[:12]
+            cls._assets_html = cls._assets.format(index=index, css=json.dumps(cls._style),
+                                                  template=json.dumps(cls._template), js=cls._js,
+                                                  assets_id=cls._assets_id)
+        return cls._assets_html, cls._assets_id
 
     def _repr_html_(self):
-
+        assets, assets_id = self._get_assets()
         uid = uuid.uuid4().hex
-        _bootstrap = self._bootstrap.format(uid=str(uid), colors=json.dumps(self.NAMED_COLORS))
+        html = self._instance.format(uid=uid, assets_id=assets_id)
+        session = _frontend_session()
+        if self.standalone or session is None or session not in ColorPicker._assets_sessions:
+            if session is not None:
+                ColorPicker._assets_sessions.add(session)
+            html = assets + html
+        return html
+
+
+def _frontend_session():
+    # id of the frontend session (page) that requested the output, None when it is unknown
+    try:
+        from IPython import get_ipython
+        return get_ipython().parent_header['header']['session'] or None
+    except (ImportError, AttributeError, KeyError, TypeError):
+        return None
 
-        return self._layout.format(uid=uid, js=self._js, bootstrap=_bootstrap, css=self._style)
 
-colorPicker = ColorPicker()
\ No newline at end of file
+colorPicker = ColorPicker()
@@ -0,0 +1,157 @@
+import os
+import sys
+import tempfile
+
+import matplotlib
+import numpy as np
+
+from ._version import __version__
+
+# bump this whenever the layout or the content of the cache changes
+CACHE_FORMAT = 2
+
+# None until set_cache_dir is called, then the cache folder, True for the default location or False
+_cache_root = None
+_version_folder = None
+
+
+def _user_cache_root():
+    if os.environ.get('CSIRO_COLORS_CACHE_DIR'):
+        return os.environ['CSIRO_COLORS_CACHE_DIR']
+    if sys.platform.startswith('win'):
+        base = os.environ.get('LOCALAPPDATA') or os.path.join(os.path.expanduser('~'), 'AppData', 'Local')
+    elif sys.platform == 'darwin':
+        base = os.path.join(os.path.expanduser('~'), 'Library', 'Caches')
+    else:
+        base = os.environ.get('XDG_CACHE_HOME') or os.path.join(os.path.expanduser('~'), '.cache')
+    return os.path.join(base, 'csiro_colors')
+
+
+def _branca_version():
+    try:
+        from importlib.metadata import version, PackageNotFoundError
+    except ImportError:
+        return 'unknown'
+    try:
+        return version('branca')
+    except PackageNotFoundError:
+        return 'none'
+
+
+def set_cache_dir(path=True):
+    """Enable the persistent on-disk cache, or disable it
+
+    The cache is disabled by default. It stores brewed colormap tables in a subfolder
+    specific to the csiro_colors, matplotlib and branca versions, every table is written
+    the first time its colormap is used.
+    It can also be enabled setting the CSIRO_COLORS_CACHE environment variable to 1, or
+    CSIRO_COLORS_CACHE_DIR to a folder, and disabled setting CSIRO_COLORS_CACHE to 0.
+
+    Parameters
+    ----------
+    path : str, True or False, optional
+        cache folder, by default True
+        passing True will use the user cache folder (or CSIRO_COLORS_CACHE_DIR)
+        passing False will disable the disk cache
+    """
+    global _cache_root
+    _cache_root = path
+
+
+def get_cache_dir():
+    """Return the versioned folder of the persistent on-disk cache
+
+    Returns
+    -------
+    str or None
+        cache folder, or None if the disk cache is disabled
+    """
+    setting = os.environ.get('CSIRO_COLORS_CACHE')
+    if _cache_root is False or setting == '0':
+        return None
+    if _cache_root is None and setting != '1' and not os.environ.get('CSIRO_COLORS_CACHE_DIR'):
+        return None
+    global _version_folder
+    if _version_folder is None:
+        _version_folder = 'v{0}-csiro_colors{1}-matplotlib{2}-branca{3}'.format(
+            CACHE_FORMAT, __version__, matplotlib.__version__, _branca_version())
+    root = _user_cache_root() if _cache_root in (None, True) else _cache_root
+    return os.path.join(root, _version_folder)
+
+
+def is_writable():
+    """Whether the disk cache is enabled and its folder can be written"""
+    folder = get_cache_dir()
+    if folder is None:
+        return False
+    try:
+        os.makedirs(folder, exist_ok=True)
+    except OSError:
+        return False
+    return os.access(folder, os.W_OK)
+
+
+def _atomic_write(path, write):
+    # write to a temporary file first, so that concurrent processes never see partial files
+    folder = os.path.dirname(path)
+    os.makedirs(folder, exist_ok=True)
+    fd, tmp = tempfile.mkstemp(dir=folder, suffix='.tmp')
+    try:
+        with os.fdopen(fd, 'wb') as f:
+            write(f)
+        os.replace(tmp, path)
+    except BaseException:
+        try:
+            os.remove(tmp)
+        except OSError:
+            pass
+        raise
+
+
+def _table_path(folder, name, key):
+    # one file per table, so that tables are only read and written when they are used
+    return os.path.join(folder, name, key + '.npy')
+
+
+def load_table(name, key):
+    """Load a colormap table from the disk cache
+
+    Parameters
+    ----------
+    name : str
+        name of the set of tables, for example 'branca'
+    key : str
+        colormap name
+
+    Returns
+    -------
+    np.ndarray or None
+        packed RGBA array (see ColorArray), or None if not cached
+    """
+    folder = get_cache_dir()
+    if folder is None:
+        return None
+    try:
+        return np.load(_table_path(folder, name, key))
+    except (OSError, ValueError):
+        return None
+
+
+def save_table(name, key, table):
+    """Save a colormap table to the disk cache, failing silently
+
+    Parameters
+    ----------
+    name : str
+        name of the set of tables, for example 'branca'
+    key : str
+        colormap name
+    table : np.ndarray
+        packed RGBA array (see ColorArray)
+    """
+    if not is_writable():
+        return
+    try:
+        _atomic_write(_table_path(get_cache_dir(), name, key), lambda f: np.save(f, table))
+    except OSError:
+        pass
@@ -0,0 +1,41 @@
+import struct
+import zlib
+
+import numpy as np
+
+_PNG_SIGNATURE = b'\x89PNG\r\n\x1a\n'
+
+
+def _chunk(tag, data):
+    return struct.pack('>I', len(data)) + tag + data + struct.pack('>I', zlib.crc32(tag + data) & 0xffffffff)
+
+
+def encode_png(rgba, compression=9):
+    """Encode an image as PNG, without matplotlib or PIL
+
+    Parameters
+    ----------
+    rgba : np.ndarray
+        (height, width, 4) uint8 RGBA image
+    compression : int, optional
+        zlib compression level, by default 9
+
+    Returns
+    -------
+    bytes
+        PNG file content
+    """
+    rgba = np.ascontiguousarray(rgba, dtype=np.uint8)
+    if rgba.ndim != 3 or rgba.shape[2] != 4:
+        raise ValueError("the image must have shape (height, width, 4)")
+    height, width = rgba.shape[:2]
+    # every scanline starts with its filter type, 0 means no filter
+    raw = np.zeros((height, width * 4 + 1), dtype=np.uint8)
+    raw[:, 1:] = rgba.reshape(height, width * 4)
+    header = struct.pack('>IIBBBBB', width, height, 8, 6, 0, 0, 0)
+    return b''.join([
+        _PNG_SIGNATURE,
+        _chunk(b'IHDR', header),
+        _chunk(b'IDAT', zlib.compress(raw.tobytes(), compression)),
+        _chunk(b'IEND', b''),
+    ])
@@ -0,0 +1,134 @@
+import struct
+
+import numpy as np
+
+# TIFF tags used by palette images
+_IMAGE_WIDTH = 256
+_IMAGE_LENGTH = 257
+_BITS_PER_SAMPLE = 258
+_COMPRESSION = 259
+_PHOTOMETRIC = 262
+_IMAGE_DESCRIPTION = 270
+_STRIP_OFFSETS = 273
+_SAMPLES_PER_PIXEL = 277
+_ROWS_PER_STRIP = 278
+_STRIP_BYTE_COUNTS = 279
+_COLOR_MAP = 320
+
+_SHORT, _LONG, _ASCII = 3, 4, 2
+_TYPE_SIZES = {1: 1, 2: 1, 3: 2, 4: 4, 5: 8, 6: 1, 7: 1, 8: 2, 9: 4, 10: 8, 11: 4, 12: 8}
+_TYPE_CODES = {1: 'B', 2: 's', 3: 'H', 4: 'I', 6: 'b', 7: 'B', 8: 'h', 9: 'i', 11: 'f', 12: 'd'}
+
+
+def encode_palette_tiff(rgb, description=''):
+    """Encode a palette as a 8 bit paletted TIFF, readable by GDAL, without GDAL or PIL
+
+    The image is a single row showing every palette entry.
+
+    Parameters
+    ----------
+    rgb : np.ndarray
+        (N, 3) uint8 palette, up to 256 colors
+    description : str, optional
+        image description, by default ''
+
+    Returns
+    -------
+    bytes
+        TIFF file content
+    """
+    rgb = np.asarray(rgb, dtype=np.uint8)
+    if rgb.ndim != 2 or rgb.shape[1] != 3 or not 0 < len(rgb) <= 256:
+        raise ValueError("the palette must have shape (N, 3), with N between 1 and 256")
+    n = len(rgb)
+    # the color map always has 2**8 entries per channel, as 16 bit values
+    colormap = np.zeros((3, 256), dtype='<u2')
+    colormap[:, :n] = rgb.T.astype('<u2') * 257
+    text = description.encode('ascii', 'replace') + b'\0'
+    pixels = np.arange(n, dtype=np.uint8).tobytes()
+
+    entries = [
+        (_IMAGE_WIDTH, _LONG, 1, n),
+        (_IMAGE_LENGTH, _LONG, 1, 1),
+        (_BITS_PER_SAMPLE, _SHORT, 1, 8),
+        (_COMPRESSION, _SHORT, 1, 1),
+        (_PHOTOMETRIC, _SHORT, 1, 3),
+        (_IMAGE_DESCRIPTION, _ASCII, len(text), text),
+        (_STRIP_OFFSETS, _LONG, 1, None),
+        (_SAMPLES_PER_PIXEL, _SHORT, 1, 1),
+        (_ROWS_PER_STRIP, _LONG, 1, 1),
+        (_STRIP_BYTE_COUNTS, _LONG, 1, n),
+        (_COLOR_MAP, _SHORT, colormap.size, colormap.tobytes()),
+    ]
+    # header, then the IFD, then the values that do not fit in the entries, then the pixels
+    ifd_size = 2 + 12 * len(entries) + 4
+    offset = 8 + ifd_size
+    extra = []
+    ifd = [struct.pack('<H', len(entries))]
+    for tag, typ, count, value in entries:
+        if isinstance(value, bytes) and len(value) > 4:
+            ifd.append(struct.pack('<HHII', tag, typ, count, offset))
+            extra.append(value)
+            offset += len(value)
+        elif isinstance(value, bytes):
+            ifd.append(struct.pack('<HHI', tag, typ, count) + value.ljust(4, b'\0'))
+        elif tag == _STRIP_OFFSETS:
+            strip_entry = len(ifd)
+            ifd.append(None)
+        elif typ == _SHORT:
+            ifd.append(struct.pack('<HHIHH', tag, typ, count, value, 0))
+        else:
+            ifd.append(struct.pack('<HHII', tag, typ, count, value))
+    ifd[strip_entry] = struct.pack('<HHII', _STRIP_OFFSETS, _LONG, 1, offset)
+    ifd.append(struct.pack('<I', 0))
+    return b''.join([b'II*\0', struct.pack('<I', 8)] + ifd + extra + [pixels])
+
+
+def _read_ifd(data):
+    # tags of the first IFD of a classic TIFF file, as tuples of values
+    byteorder = {b'II': '<', b'MM': '>'}.get(data[:2])
+    if byteorder is None or struct.unpack(byteorder + 'H', data[2:4])[0] != 42:
+        raise ValueError("not a TIFF file (BigTIFF is not supported)")
+    offset, = struct.unpack(byteorder + 'I', data[4:8])
+    count, = struct.unpack(byteorder + 'H', data[offset:offset + 2])
+    tags = {}
+    for i in range(count):
+        entry = data[offset + 2 + 12 * i:offset + 14 + 12 * i]
+        tag, typ, n = struct.unpack(byteorder + 'HHI', entry[:8])
+        if typ not in _TYPE_CODES:
+            continue
+        size = _TYPE_SIZES[typ] * n
+        if size > 4:
+            start, = struct.unpack(byteorder + 'I', entry[8:12])
+            raw = data[start:start + size]
+        else:
+            raw = entry[8:8 + size]
+        if typ == _ASCII:
+            tags[tag] = raw.rstrip(b'\0').decode('ascii', 'replace')
+        else:
+            tags[tag] = struct.unpack('{0}{1}{2}'.format(byteorder, n, _TYPE_CODES[typ]), raw)
+    return tags
+
+
+def decode_palette_tiff(data):
+    """Read the palette of a paletted TIFF or GeoTIFF
+
+    Parameters
+    ----------
+    data : bytes
+        TIFF file content
+
+    Returns
+    -------
+    tuple of np.ndarray and str
+        (N, 3) uint8 palette and the image description
+        N is 2**bits, or the width of single row images such as the ones of encode_palette_tiff
+    """
+    tags = _read_ifd(data)
+    if _COLOR_MAP not in tags:
+        raise ValueError("the TIFF file has no color map")
+    colormap = np.array(tags[_COLOR_MAP], dtype=np.uint32).reshape(3, -1)
+    rgb = np.rint(colormap.T / 257).astype(np.uint8)
+    if tags.get(_IMAGE_LENGTH, (0,))[0] == 1:
+        rgb = rgb[:tags[_IMAGE_WIDTH][0]]
+    return rgb, tags.get(_IMAGE_DESCRIPTION, '')
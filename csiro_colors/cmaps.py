@@ -1,12 +1,20 @@
-from branca.colormap import _schemes as branca_registry
-from matplotlib.cm import _gen_cmap_registry
 from base64 import b64encode
 from io import BytesIO
+import copy
+import fnmatch
+import threading
+from collections import Counter
+from types import MappingProxyType
 from matplotlib.colors import Colormap
 import numpy as np
-import matplotlib.pyplot as plt
-from branca.utilities import color_brewer
 import matplotlib.colors as col
+import matplotlib
+import importlib.util
+import json
+import os
+from functools import partial
+# NOTE matplotlib.pyplot, branca and IPython are imported only where needed
+# so that importing this module stays cheap
 # for python 2 and python 3 compatibility
 try:
     # python 2
@@ -16,90 +24,359 @@ except NameError:
     basestring = (str, bytes)
 number = (int, float, np.integer, np.floating)
 
-from .converters import hex_to_rgb, cmap_to_hex
+from .converters import cmap_to_hex
+from .colorarray import ColorArray
+from . import _diskcache
+from ._png import encode_png
+from .views import cmap_view
+
+
+class _ReversedEntry():
+    # registry placeholder for a '_r' colormap, materialized as a reversed view of its base entry.
+    # Reversing a ListedColormap view is exact, other colormaps can provide a fallback builder
+    def __init__(self, key, fallback=None):
+        self.key = key
+        self.fallback = fallback
 
-matplotlib_registry = _gen_cmap_registry()
 
 class ColormapCatalog():
+    """Dictionary-like collection of colormaps
+
+    Entries are materialized as matplotlib colormaps only on first access and
+    then memoized, so building a catalog is cheap.
+
+    Parameters
+    ----------
+    name : str
+        name of the catalog
+    cmap_registry : dict or callable
+        mapping of colormap names to a Colormap, a list of HEX colors, a
+        ColorArray or a callable returning any of them.
+        If a callable is passed instead of a dict, it will be invoked to
+        retrieve the mapping the first time the catalog is accessed
+    kinds : dict or callable, optional
+        mapping of colormap names (without '_r') to their kind, one of
+        'sequential', 'diverging', 'qualitative', 'cyclic' or 'miscellaneous'.
+        Colormaps not listed are classified from their type and number of colors
+    """
     __colormap_image_catalog = None
-    
+
+    # number of colormaps rendered by _repr_html_, see search
+    page_size = 50
+
     @property
     def _colormap_image_catalog(self):
         if self.__colormap_image_catalog is None:
-            plt.ioff()
             image_catalog= {}
-            gradient = np.repeat(np.linspace(0, 1, 256)[None, :], 25,0)
-            
-            for cmap_name in sorted(self.colormap_registry.keys()):
+            for cmap_name in sorted(self.keys()):
                 if cmap_name.endswith('_r'):
                     continue
-                cmap = self.colormap_registry[cmap_name]
-                fig = plt.figure(frameon=False, figsize=(10, 0.5))
-                ax = fig.add_axes([0, 0, 1, 1])
-                ax.imshow(gradient, aspect='auto', cmap=cmap)
-                ax.set_axis_off()
-                
-                tmpfile = BytesIO()
-                fig.savefig(tmpfile, format='png', bbox_inches='tight')
-                image_catalog[cmap_name] = {'fig': tmpfile}
-                plt.close()
+                image_catalog[cmap_name] = {'fig': self._thumbnail(cmap_name)}
             self.__colormap_image_catalog = image_catalog
-            plt.ion()
         else:
             image_catalog = self.__colormap_image_catalog
         return image_catalog
 
-    
-    def __init__(self, name, cmap_registry):
+    def _thumbnail(self, key):
+        try:
+            return self._thumbnails[key]
+        except KeyError:
+            pass
+        return self._thumbnails.setdefault(key, BytesIO(_colormap_thumbnail(self[key])))
+
+    def __init__(self, name, cmap_registry, kinds=None):
         self.name = name
-        
-        cmap_registry = cmap_registry.copy()
-        for k, v in cmap_registry.items():
-            if isinstance(v, Colormap):
-                pass
-            elif isinstance(v, list):
-                color_list = [hex_to_rgb(c) for c in v]
-                cmap_registry[k] = col.ListedColormap(color_list, name=k)
-            else:
-                raise TypeError("Only Colormap or list are supported")
-        self.colormap_registry = cmap_registry
-        self.available_colormaps = list(cmap_registry.keys())
-    
+        self._kinds = kinds
+        self._thumbnails = {}
+
+        if callable(cmap_registry):
+            self._loader = cmap_registry
+            self._entries = None
+        else:
+            self._loader = None
+            self._entries = dict(cmap_registry)
+        self._materialized = {}
+
+    @property
+    def _registry_entries(self):
+        if self._entries is None:
+            self._entries = dict(self._loader())
+        return self._entries
+
+    def _materialize(self, key, value):
+        if isinstance(value, _ReversedEntry):
+            base = self[value.key]
+            if value.fallback is None or isinstance(base, col.ListedColormap):
+                return cmap_view(base, start=1, stop=0, name=key)
+            value = value.fallback
+        if callable(value) and not isinstance(value, Colormap):
+            value = value()
+        if isinstance(value, Colormap):
+            return value
+        elif isinstance(value, ColorArray):
+            return value.to_cmap(name=key)
+        elif isinstance(value, list):
+            return ColorArray(value).to_cmap(name=key)
+        else:
+            raise TypeError("Only Colormap or list are supported")
+
+    @property
+    def colormap_registry(self):
+        return {k: self[k] for k in self.keys()}
+
+    @property
+    def available_colormaps(self):
+        return list(self.keys())
+
+    def kind(self, key):
+        """Return the kind of a colormap
+
+        Parameters
+        ----------
+        key : str
+            colormap name
+
+        Returns
+        -------
+        str
+            'sequential', 'diverging', 'qualitative', 'cyclic' or 'miscellaneous'
+        """
+        if callable(self._kinds):
+            self._kinds = dict(self._kinds())
+        kinds = self._kinds or {}
+        base = _removesuffix(key, '_r')
+        try:
+            return kinds[base]
+        except KeyError:
+            pass
+        cmap = self[key]
+        if isinstance(cmap, col.ListedColormap) and cmap.N <= 20:
+            return 'qualitative'
+        return 'sequential'
+
+    def search(self, query=None, kind=None, page=0, page_size=None, include_reversed=False):
+        """Filter the colormaps of this catalog
+
+        Only the colormaps of the selected page are rendered when the result is displayed.
+
+        Parameters
+        ----------
+        query : str, optional
+            case insensitive text to look for in the colormap names, wildcards (*, ?) are supported
+        kind : str or list of str, optional
+            kind(s) of colormaps to keep, see kind
+        page : int, optional
+            page to display, by default 0
+        page_size : int, optional
+            number of colormaps per page, by default ColormapCatalog.page_size
+        include_reversed : bool, optional
+            whether to include the '_r' colormaps, by default False
+
+        Returns
+        -------
+        CatalogView
+            filtered colormaps
+        """
+        return CatalogView([self], query=query, kind=kind, page=page, page_size=page_size,
+                           include_reversed=include_reversed)
+
+    def get_colors(self, key, n=None):
+        """Retrieve the colors of a colormap as a ColorArray
+
+        Parameters
+        ----------
+        key : str
+            colormap name
+        n : int, optional
+            number of colors to sample, by default None
+            passing None will return all the colors of a discrete colormap, or 256 samples otherwise
+
+        Returns
+        -------
+        ColorArray
+            colormap colors
+        """
+        return ColorArray.from_cmap(self[key], n=n)
+
     def keys(self):
-        return self.colormap_registry.keys()
+        return self._registry_entries.keys()
     def items(self):
         return self.colormap_registry.items()
     def values(self):
         return self.colormap_registry.values()
-    
+
     def __getitem__(self, key):
-        return self.colormap_registry[key]
-    
+        try:
+            return self._materialized[key]
+        except KeyError:
+            pass
+        cmap = self._materialize(key, self._registry_entries[key])
+        # setdefault keeps the first result if another thread got here first
+        return self._materialized.setdefault(key, cmap)
+
     def __contains__(self, key):
-        return key in self.keys()
+        return key in self._registry_entries
+
+    def __iter__(self):
+        return iter(self.keys())
+
+    def __len__(self):
+        return len(self._registry_entries)
     
     @staticmethod
     def _repr_html_fig(figtmpfile, alt=None):
-        return '<img src="data:image/png;base64,{0}" alt="{1}">'.format(b64encode(figtmpfile.getvalue()).decode('utf-8'), alt)
+        # thumbnails are one pixel high strips, stretched to fill the cell
+        return ('<img src="data:image/png;base64,{0}" alt="{1}" '
+                'style="width:100%; height:25px; image-rendering:pixelated">').format(
+                    b64encode(figtmpfile.getvalue()).decode('utf-8'), alt)
+
+    def _repr_html_(self):
+        return self.search()._repr_html_()
+
+
+class CatalogView():
+    """Filtered and paginated view over one or more ColormapCatalog
+
+    The matching names are computed when the view is created, thumbnails are
+    only rendered for the rows of the current page when the view is displayed.
+
+    Parameters
+    ----------
+    catalogs : list of ColormapCatalog
+        catalogs to search
+    query : str, optional
+        case insensitive text to look for in the colormap names, wildcards (*, ?) are supported
+    kind : str or list of str, optional
+        kind(s) of colormaps to keep, see ColormapCatalog.kind
+    page : int, optional
+        page to display, by default 0
+    page_size : int, optional
+        number of colormaps per page, by default ColormapCatalog.page_size
+    include_reversed : bool, optional
+        whether to include the '_r' colormaps, by default False
+    """
+
+    def __init__(self, catalogs, query=None, kind=None, page=0, page_size=None, include_reversed=False):
+        self.catalogs = list(catalogs)
+        self.query = query
+        self.kind = kind
+        self.page_size = ColormapCatalog.page_size if page_size is None else page_size
+        self.include_reversed = include_reversed
+        self.page = page
+
+        if isinstance(kind, basestring):
+            kind = [kind]
+        kinds = None if kind is None else set(k.lower() for k in kind)
+        if query is None:
+            match = None
+        elif any(c in query for c in '*?['):
+            pattern = query.lower()
+            match = lambda name: fnmatch.fnmatchcase(name.lower(), pattern)
+        else:
+            pattern = query.lower()
+            match = lambda name: pattern in name.lower()
+
+        self.entries = []
+        for catalog in self.catalogs:
+            for name in sorted(catalog.keys()):
+                if not include_reversed and name.endswith('_r'):
+                    continue
+                if match is not None and not match(name):
+                    continue
+                if kinds is not None and catalog.kind(name) not in kinds:
+                    continue
+                self.entries.append((catalog, name))
+
+    @property
+    def n_pages(self):
+        return max(1, -(-len(self.entries) // self.page_size))
+
+    def keys(self):
+        return [name for _, name in self.entries]
+
+    def __len__(self):
+        return len(self.entries)
+
+    def __iter__(self):
+        return iter(self.keys())
+
+    def __getitem__(self, key):
+        for catalog, name in self.entries:
+            if name == key:
+                return catalog[name]
+        raise KeyError(key)
+
+    def get_page(self, page):
+        """Return the same selection, displaying another page
+
+        Parameters
+        ----------
+        page : int
+            page to display
+
+        Returns
+        -------
+        CatalogView
+        """
+        view = copy.copy(self)
+        view.page = page
+        return view
 
     def _repr_html_(self):
-        
-        # gradient = np.vstack((gradient, gradient))
-        
-        html = "<table><tbody>"
-        
-        image_catalog = self._colormap_image_catalog
-        
-        for cmap_name, cmap in sorted(image_catalog.items()):
-            figtmpfile = cmap['fig'] 
-            html += '<tr><td style="width:20%; padding:0">{0}</td><td style="width:80%; padding:0">{1}</td></tr>'.format(cmap_name, self._repr_html_fig(figtmpfile))
-            
-        
-        html += "</tbody></table>"
-        return html
+        start = self.page * self.page_size
+        rows = self.entries[start:start + self.page_size]
+        show_source = len(self.catalogs) > 1
+
+        html = ["<table><tbody>"]
+        for catalog, name in rows:
+            label = name
+            if show_source:
+                label = '{0} <small>({1})</small>'.format(name, catalog.name)
+            html.append('<tr><td style="width:20%; padding:0">{0}</td><td style="width:80%; padding:0">{1}</td></tr>'.format(
+                label, catalog._repr_html_fig(catalog._thumbnail(name), alt=name)))
+        html.append("</tbody></table>")
+        if self.n_pages > 1:
+            html.append('<p><small>Showing {0}-{1} of {2} colormaps, page {3} of {4}. '
+                        'Use .search(..., page=n) or .get_page(n) to see the others</small></p>'.format(
+                            start + 1 if rows else 0, start + len(rows), len(self.entries), self.page + 1, self.n_pages))
+        return "".join(html)
+
+
+def search_colormaps(query=None, kind=None, source=None, page=0, page_size=None, include_reversed=False):
+    """Filter the colormaps of all the registries
+
+    Parameters
+    ----------
+    query : str, optional
+        case insensitive text to look for in the colormap names, wildcards (*, ?) are supported
+    kind : str or list of str, optional
+        kind(s) of colormaps to keep: 'sequential', 'diverging', 'qualitative', 'cyclic' or 'miscellaneous'
+    source : str or list of str, optional
+        registries to search: 'branca', 'csiro' or 'matplotlib', by default all of them
+    page : int, optional
+        page to display, by default 0
+    page_size : int, optional
+        number of colormaps per page, by default ColormapCatalog.page_size
+    include_reversed : bool, optional
+        whether to include the '_r' colormaps, by default False
+
+    Returns
+    -------
+    CatalogView
+        filtered colormaps
+    """
+    return CatalogView(_select_registries(source), query=query, kind=kind, page=page, page_size=page_size,
+                       include_reversed=include_reversed)
+
+
+def _colormap_thumbnail(cmap, width=256):
+    # gradient strip rendered straight from the colormap, as a 1 pixel high PNG
+    rgba = cmap(np.linspace(0, 1, width), bytes=True)
+    return encode_png(rgba[None, :, :])
 
 
 def _brew_branca_cmap(cmap):
+    from branca.utilities import color_brewer
     # BUG there is a bug with branca https://github.com/python-visualization/branca/issues/104
     # to avoid that we need to iterate to find how many colors the colormap has, then retrieve all of them
     for i in range(12, 5, -1):
@@ -123,38 +400,140 @@ def _removesuffix(s, suf):
     return s
 
 
-def _smells_like_branca(cmap):
-    if not isinstance(cmap, basestring):
-        raise TypeError("the argument cmap must be a colormap name")
-    return _removesuffix(cmap, '_r') in branca_registry
+def _select_registries(source=None):
+    # registries selected by their names ('branca', 'csiro' or 'matplotlib'), by default all of them
+    registries = [branca_registry, csiro_registry, matplotlib_registry]
+    if source is None:
+        return registries
+    if isinstance(source, basestring):
+        source = [source]
+    source = set(s.lower() for s in source)
+    unknown = source - set(r.name.lower() for r in registries)
+    if unknown:
+        raise ValueError("Unknown colormap source(s): {0}".format(', '.join(sorted(unknown))))
+    return [r for r in registries if r.name.lower() in source]
 
-def _smells_like_csiro(cmap):
-    if not isinstance(cmap, basestring):
-        raise TypeError("the argument cmap must be a colormap name")
-    return _removesuffix(cmap, '_r') in csiro_registry
 
-def _smells_like_matplotlib(cmap):
-    if not isinstance(cmap, basestring):
-        raise TypeError("the argument cmap must be a colormap name")
-    return _removesuffix(cmap, '_r') in matplotlib_registry
+def _registry_sources():
+    # registries in priority order, with the namespaces that select them explicitly
+    return [
+        (branca_registry, ('branca', 'colorbrewer')),
+        (csiro_registry, ('csiro',)),
+        (matplotlib_registry, ('matplotlib', 'mpl')),
+    ]
 
 
-def get_cmap(cmap, return_hex=False):
+_name_index = None
+_name_ngrams = None
+_name_index_lock = threading.Lock()
+_reversed_cmaps = {}
+
+
+def _get_name_index():
+    # Map every colormap name to (catalog, key, reversed): canonical names, their '_r' variants,
+    # the namespaced names (e.g. 'mpl:viridis') and, with a lower priority, lowercase aliases.
+    # A trigram index of the canonical names is built at the same time for the suggestions
+    global _name_index, _name_ngrams
+    if _name_index is not None:
+        return _name_index
+    with _name_index_lock:
+        if _name_index is not None:
+            return _name_index
+        index = {}
+        aliases = {}
+        postings = {}
+        for catalog, namespaces in _registry_sources():
+            names = {}
+            for key in catalog.keys():
+                names[key] = (catalog, key, False)
+                if not key.endswith('_r'):
+                    for gram in _ngrams(key):
+                        postings.setdefault(gram, set()).add(key)
+            for key in list(names):
+                if not key.endswith('_r') and key + '_r' not in names:
+                    names[key + '_r'] = (catalog, key, True)
+            for name, target in names.items():
+                index.setdefault(name, target)
+                aliases.setdefault(name.lower(), target)
+                for namespace in namespaces:
+                    index[namespace + ':' + name] = target
+                    aliases.setdefault(namespace + ':' + name.lower(), target)
+        for alias, target in aliases.items():
+            index.setdefault(alias, target)
+        _name_ngrams = {gram: tuple(sorted(names)) for gram, names in postings.items()}
+        _name_index = MappingProxyType(index)
+    return _name_index
+
+
+def _ngrams(name, n=3):
+    name = ' {0} '.format(name.lower())
+    return set(name[i:i + n] for i in range(len(name) - n + 1))
+
+
+def _suggest_names(name, n=3):
+    # "did you mean" suggestions, ranked by the Jaccard similarity of their trigrams
+    _get_name_index()
+    grams = _ngrams(_removesuffix(name.split(':', 1)[-1], '_r'))
+    shared = Counter()
+    for gram in grams:
+        shared.update(_name_ngrams.get(gram, ()))
+    scores = [(count / float(len(grams) + len(_ngrams(candidate)) - count), candidate)
+              for candidate, count in shared.items()]
+    scores.sort(key=lambda x: (-x[0], x[1]))
+    return [candidate for score, candidate in scores[:n] if score > 0.2]
+
 
+def _resolve_cmap(cmap):
+    # return the registry colormap itself, without copying it
     if isinstance(cmap, basestring):
-        if _smells_like_branca(cmap):
-            cmap = branca_registry[cmap]
-        elif _smells_like_csiro(cmap):
-            cmap = csiro_registry[cmap]
-        elif _smells_like_matplotlib(cmap):
-            cmap = matplotlib_registry[cmap]
-        else:
-            raise RuntimeError("Could not find the selected colormap. Please check available colormaps at https://rdrr.io/cran/RColorBrewer/man/ColorBrewer.html or https://matplotlib.org/stable/gallery/color/colormap_reference.html")
+        index = _get_name_index()
+        try:
+            target = index[cmap]
+        except KeyError:
+            target = index.get(cmap.lower())
+        if target is None:
+            suggestions = _suggest_names(cmap)
+            hint = " Did you mean {0}?".format(", ".join("'{0}'".format(s) for s in suggestions)) if suggestions else ""
+            raise RuntimeError("Could not find the selected colormap '{0}'.{1} Please check available colormaps at https://rdrr.io/cran/RColorBrewer/man/ColorBrewer.html or https://matplotlib.org/stable/gallery/color/colormap_reference.html".format(cmap, hint))
+        catalog, key, reverse = target
+        if not reverse:
+            return catalog[key]
+        try:
+            return _reversed_cmaps[catalog.name, key]
+        except KeyError:
+            return _reversed_cmaps.setdefault((catalog.name, key), cmap_view(catalog[key], start=1, stop=0))
     elif isinstance(cmap, col.Colormap):
         pass
     else:
         raise TypeError("The argument cmap must be a valid colormap name")
+    return cmap
+
+
+def get_cmap(cmap, return_hex=False):
+    """Retrieve a colormap from the Branca, CSIRO or matplotlib registries
+
+    Names are resolved with a single lookup in a prebuilt index and the registry
+    colormap is returned without copying it: use its copy() method before
+    modifying it, for example with set_bad.
+
+    Names are looked up in the Branca, CSIRO and matplotlib registries, in this
+    order. A registry can be selected explicitly with a prefix such as
+    'branca:Spectral', 'csiro:csiro_reds' or 'mpl:viridis'. Any colormap can be
+    reversed with the '_r' suffix and names are case insensitive.
+
+    Parameters
+    ----------
+    cmap : str or Colormap
+        colormap name or Colormap object
+    return_hex : bool, optional
+        whether to return the colormap as a list of HEX strings, by default False
 
+    Returns
+    -------
+    Colormap or list of str
+        colormap
+    """
+    cmap = _resolve_cmap(cmap)
     if return_hex:
         return cmap_to_hex(cmap)
     else:
@@ -250,15 +629,100 @@ csiro_registry = {
     'csiro_all' : csiro_all
 }
 
-for k, v in csiro_registry.copy().items():
-    csiro_registry[k + '_r'] = v[::-1]
+for k in list(csiro_registry):
+    csiro_registry[k + '_r'] = _ReversedEntry(k)
+
+
+def _branca_rootpath():
+    spec = importlib.util.find_spec('branca')
+    if spec is None or not spec.submodule_search_locations:
+        return None
+    return list(spec.submodule_search_locations)[0]
+
+
+def _branca_loader():
+    # nothing is brewed here, every scheme is brewed (or read from the disk cache) on first access
+    return {k: partial(_cached_branca_colors, k, brew) for k, brew in _branca_builders().items()}
+
+
+def _cached_branca_colors(key, brew):
+    table = _diskcache.load_table('branca', key)
+    if table is not None:
+        return ColorArray.from_packed(table)
+    colors = ColorArray(brew())
+    _diskcache.save_table('branca', key, colors.packed)
+    return colors
+
+
+def _branca_builders():
+    # Only list the schemes that _brew_branca_cmap can actually brew, without brewing them.
+    # This mirrors the checks done by branca.utilities.color_brewer for n=12: the base code
+    # must be a valid ColorBrewer code, and qualitative schemes cannot be interpolated.
+    # The metadata is read straight from the branca package folder to avoid importing branca
+    rootpath = _branca_rootpath()
+    if rootpath is None:
+        return {}
+    with open(os.path.join(rootpath, '_schemes.json')) as f:
+        _branca_schemes = json.load(f)
+    with open(os.path.join(rootpath, 'scheme_base_codes.json')) as f:
+        core_schemes = set(json.load(f)['codes'])
+    with open(os.path.join(rootpath, 'scheme_info.json')) as f:
+        scheme_info = json.load(f)
+
+    registry = {}
+    for k in set([s.split('_')[0] for s in _branca_schemes.keys()]):
+        if k not in core_schemes:
+            continue
+        if scheme_info.get(k) == 'Qualitative' and k + '_12' not in _branca_schemes:
+            continue
+        registry[k] = partial(_brew_branca_cmap, k)
+    return registry
+
+
+def _branca_kinds():
+    rootpath = _branca_rootpath()
+    if rootpath is None:
+        return {}
+    with open(os.path.join(rootpath, 'scheme_info.json')) as f:
+        return {k: v.lower() for k, v in json.load(f).items()}
+
+
+# classification from https://matplotlib.org/stable/users/explain/colors/colormaps.html
+_matplotlib_kinds = dict(
+    [(k, 'diverging') for k in [
+        'PiYG', 'PRGn', 'BrBG', 'PuOr', 'RdGy', 'RdBu', 'RdYlBu', 'RdYlGn', 'Spectral',
+        'coolwarm', 'bwr', 'seismic', 'berlin', 'managua', 'vanimo']] +
+    [(k, 'cyclic') for k in ['twilight', 'twilight_shifted', 'hsv']] +
+    [(k, 'qualitative') for k in [
+        'Pastel1', 'Pastel2', 'Paired', 'Accent', 'okabe_ito', 'Dark2', 'Set1', 'Set2', 'Set3',
+        'tab10', 'tab20', 'tab20b', 'tab20c']] +
+    [(k, 'miscellaneous') for k in [
+        'flag', 'prism', 'ocean', 'gist_earth', 'terrain', 'gist_stern', 'gnuplot', 'gnuplot2',
+        'CMRmap', 'cubehelix', 'brg', 'gist_rainbow', 'rainbow', 'jet', 'turbo', 'nipy_spectral',
+        'gist_ncar']]
+)
+
+
+def _matplotlib_loader():
+    try:
+        # matplotlib >= 3.5
+        source = matplotlib.colormaps
+    except AttributeError:
+        from matplotlib.cm import _cmap_registry as source
+    # colormaps are copied on access so that the matplotlib registry is never modified,
+    # and the listed '_r' colormaps are views over the copies
+    registry = {k: partial(_copy_matplotlib_cmap, source, k) for k in list(source)}
+    for k, builder in registry.items():
+        if k.endswith('_r') and k[:-2] in registry:
+            registry[k] = _ReversedEntry(k[:-2], fallback=builder)
+    return registry
+
 
+def _copy_matplotlib_cmap(source, name):
+    return source[name].copy()
 
-_branca_cmaps = set([s.split('_')[0] for s in branca_registry.keys()])
-# _csiro_cmaps = set(_removesuffix(s, '_r') for s in csiro_registry.keys())
-# _matplotlib_cmaps = set([_removesuffix(s, '_r') for s in  matplotlib_registry.keys()])
 
-branca_registry = {k: _brew_branca_cmap(k) for k in _branca_cmaps if _brew_branca_cmap(k)}
-branca_registry = ColormapCatalog('Branca', branca_registry)
-matplotlib_registry = ColormapCatalog('Matplotlib', matplotlib_registry)
-csiro_registry = ColormapCatalog('CSIRO', csiro_registry)
\ No newline at end of file
+branca_registry = ColormapCatalog('Branca', _branca_loader, kinds=_branca_kinds)
+matplotlib_registry = ColormapCatalog('Matplotlib', _matplotlib_loader, kinds=_matplotlib_kinds)
+# the CSIRO colormaps are palettes of brand colors
+csiro_registry = ColormapCatalog('CSIRO', csiro_registry, kinds={k: 'qualitative' for k in csiro_registry})
\ No newline at end of file
@@ -0,0 +1,227 @@
+import matplotlib.colors as col
+import numpy as np
+
+from .converters import _hex_to_uint8, _rgb_to_uint8, rgb_to_hex_array
+
+# for python 2 and python 3 compatibility
+try:
+    # python 2
+    basestring # type: ignore
+except NameError:
+    # python 3
+    basestring = (str, bytes)
+
+# packed values are stored little-endian so that the bytes in memory are always R, G, B, A
+PACKED_DTYPE = np.dtype('<u4')
+
+
+class ColorArray():
+    """Compact array of RGBA colors backed by a single packed uint32 buffer
+
+    Each color takes 4 bytes, laid out in memory as R, G, B, A (the packed
+    little-endian value is 0xAABBGGRR). The (N, 4) uint8 view and slices are
+    zero-copy; float and HEX representations are computed from the buffer
+    on request.
+
+    Parameters
+    ----------
+    colors : ColorArray, Colormap, array-like
+        colors to store. It can be a list or array of HEX strings, a 1-D integer array
+        of 0xRRGGBB values (as in hex_to_rgb_array), a (N, 3) or (N, 4) array of RGB(A)
+        values (float or uint8) or a matplotlib Colormap.
+        Packed RGBA values (see PACKED_DTYPE) must be passed to ColorArray.from_packed
+    normalized : bool, optional
+        Whether float RGB(A) values are expressed as [0,1] or [0,255], by default True
+    """
+
+    def __init__(self, colors, normalized=True):
+        if isinstance(colors, ColorArray):
+            packed = colors.packed
+        elif isinstance(colors, col.Colormap):
+            packed = ColorArray.from_cmap(colors).packed
+        else:
+            if isinstance(colors, basestring):
+                colors = [colors]
+            colors = np.asarray(colors)
+            if colors.dtype.kind in 'US' or (colors.ndim == 1 and colors.dtype.kind in 'ui'):
+                packed = ColorArray.from_hex(colors).packed
+            else:
+                packed = ColorArray.from_rgb(colors, normalized=normalized).packed
+        self._packed = packed
+
+    @classmethod
+    def from_packed(cls, packed):
+        """Create a ColorArray from a 1-D uint32 array of packed RGBA values, without copying it
+
+        Packed values are 0xAABBGGRR on little-endian machines, as returned by
+        get_cmap_lut or apply_cmap(..., packed=True), see PACKED_DTYPE
+        """
+        packed = np.asarray(packed)
+        if packed.ndim != 1 or packed.dtype.kind != 'u' or packed.dtype.itemsize != 4:
+            raise ValueError("you must provide a 1-D uint32 array of packed RGBA values")
+        out = cls.__new__(cls)
+        out._packed = packed.astype(PACKED_DTYPE, copy=False)
+        return out
+
+    @classmethod
+    def from_rgba8(cls, rgba8):
+        """Create a ColorArray from a (N, 4) uint8 array, without copying it if it is contiguous"""
+        rgba8 = np.ascontiguousarray(rgba8, dtype=np.uint8)
+        if rgba8.ndim != 2 or rgba8.shape[1] != 4:
+            raise ValueError("you must provide an array of shape (N, 4)")
+        return cls.from_packed(rgba8.view(PACKED_DTYPE).reshape(-1))
+
+    @classmethod
+    def from_rgb(cls, rgb, normalized=True):
+        """Create a ColorArray from a (N, 3) or (N, 4) array of RGB(A) values
+
+        Parameters
+        ----------
+        rgb : array-like
+            RGB or RGBA values, uint8 arrays are always interpreted as [0,255] values
+        normalized : bool, optional
+            Whether float values are expressed as [0,1] or [0,255], by default True
+
+        Returns
+        -------
+        ColorArray
+        """
+        rgb = np.asarray(rgb)
+        if rgb.ndim == 1:
+            rgb = rgb[None, :]
+        if rgb.ndim != 2 or rgb.shape[1] not in (3, 4):
+            raise ValueError("you must provide an array of shape (N, 3) or (N, 4)")
+        if rgb.shape[1] == 4 and rgb.dtype == np.uint8:
+            return cls.from_rgba8(rgb)
+        rgba8 = np.full((rgb.shape[0], 4), 255, dtype=np.uint8)
+        rgba8[:, :rgb.shape[1]] = _rgb_to_uint8(rgb, normalized=normalized)
+        return cls.from_rgba8(rgba8)
+
+    @classmethod
+    def from_hex(cls, hex_code):
+        """Create a ColorArray from HEX strings or packed 0xRRGGBB integers
+
+        Parameters
+        ----------
+        hex_code : array-like of str or int
+            HEX codes, see hex_to_rgb_array
+
+        Returns
+        -------
+        ColorArray
+        """
+        rgb8 = _hex_to_uint8(hex_code)
+        rgba8 = np.full((rgb8.shape[0], 4), 255, dtype=np.uint8)
+        rgba8[:, :3] = rgb8
+        return cls.from_rgba8(rgba8)
+
+    @classmethod
+    def from_cmap(cls, cmap, n=None):
+        """Create a ColorArray from a Colormap
+
+        Parameters
+        ----------
+        cmap : matplotlib.colors.Colormap
+            colormap to sample
+        n : int, optional
+            number of colors to sample, by default None
+            passing None will use all the colors of a ListedColormap, or 256 samples otherwise
+
+        Returns
+        -------
+        ColorArray
+        """
+        if not isinstance(cmap, col.Colormap):
+            raise TypeError("The argument 'cmap' must be a Colormap")
+        if n is None and hasattr(cmap, 'colors'):
+            rgba = col.to_rgba_array(cmap.colors)
+        else:
+            rgba = cmap(np.linspace(0, 1, 256 if n is None else n))
+        return cls.from_rgb(rgba)
+
+    @property
+    def packed(self):
+        """(N,) uint32 array of packed RGBA values"""
+        return self._packed
+
+    @property
+    def rgba8(self):
+        """(N, 4) uint8 view of the RGBA values"""
+        return self._packed.view(np.uint8).reshape(-1, 4)
+
+    @property
+    def rgb8(self):
+        """(N, 3) uint8 view of the RGB values"""
+        return self.rgba8[:, :3]
+
+    @property
+    def alpha8(self):
+        """(N,) uint8 view of the alpha channel"""
+        return self.rgba8[:, 3]
+
+    def to_rgba(self, dtype=np.float64):
+        """Return a (N, 4) float array of normalized RGBA values, as expected by matplotlib"""
+        return self.rgba8.astype(dtype) / np.dtype(dtype).type(255)
+
+    @property
+    def rgba(self):
+        """(N, 4) float array of normalized RGBA values"""
+        return self.to_rgba()
+
+    @property
+    def rgb(self):
+        """(N, 3) float array of normalized RGB values"""
+        return self.to_rgba()[:, :3]
+
+    @property
+    def hex(self):
+        """(N,) array of HEX strings (U7)"""
+        return rgb_to_hex_array(self.rgb8)
+
+    def to_cmap(self, name='CSIRO'):
+        """Return a ListedColormap with these colors
+
+        Parameters
+        ----------
+        name : str, optional
+            name of the colormap, by default 'CSIRO'
+
+        Returns
+        -------
+        ListedColormap
+        """
+        return col.ListedColormap(self.to_rgba(), name=name)
+
+    def copy(self):
+        return ColorArray.from_packed(self._packed.copy())
+
+    def __len__(self):
+        return self._packed.shape[0]
+
+    def __getitem__(self, key):
+        return ColorArray.from_packed(np.atleast_1d(self._packed[key]))
+
+    def __array__(self, dtype=None, copy=None):
+        rgba = self.to_rgba()
+        if dtype is not None:
+            rgba = rgba.astype(dtype, copy=False)
+        return rgba
+
+    def __eq__(self, other):
+        if not isinstance(other, ColorArray):
+            return NotImplemented
+        return len(self) == len(other) and bool(np.all(self._packed == other._packed))
+
+    def __ne__(self, other):
+        eq = self.__eq__(other)
+        return eq if eq is NotImplemented else not eq
+
+    __hash__ = None
+
+    def __repr__(self):
+        hex_codes = self.hex
+        if len(hex_codes) > 6:
+            body = ', '.join(hex_codes[:3].tolist() + ['...'] + hex_codes[-3:].tolist())
+        else:
+            body = ', '.join(hex_codes.tolist())
+        return 'ColorArray([{0}], n={1})'.format(body, len(self))
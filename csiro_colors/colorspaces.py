@@ -0,0 +1,347 @@
+import numpy as np
+
+# Vectorized conversions between sRGB and perceptual color spaces.
+# Every conversion goes through linear sRGB, colors are (..., 3) arrays.
+
+SPACES = ('srgb', 'linear', 'xyz', 'lab', 'lch', 'oklab', 'oklch')
+
+# D65 white point, for XYZ and CIELAB
+WHITE_D65 = np.array([0.95047, 1.0, 1.08883])
+
+_LINEAR_TO_XYZ = np.array([
+    [0.4124564, 0.3575761, 0.1804375],
+    [0.2126729, 0.7151522, 0.0721750],
+    [0.0193339, 0.1191920, 0.9503041],
+])
+_XYZ_TO_LINEAR = np.linalg.inv(_LINEAR_TO_XYZ)
+# XYZ relative to the white point, for CIELAB. Broadcasting over the last axis of length 3
+# is much slower than a matrix product, so the white point is folded into the matrices
+_XYZ_TO_RELATIVE = np.diag(1 / WHITE_D65)
+_LINEAR_TO_RELATIVE = _LINEAR_TO_XYZ / WHITE_D65[:, None]
+
+# https://bottosson.github.io/posts/oklab/
+_LINEAR_TO_LMS = np.array([
+    [0.4122214708, 0.5363325363, 0.0514459929],
+    [0.2119034982, 0.6806995451, 0.1073969566],
+    [0.0883024619, 0.2817188376, 0.6299787005],
+])
+_LMS_TO_OKLAB = np.array([
+    [0.2104542553, 0.7936177850, -0.0040720468],
+    [1.9779984951, -2.4285922050, 0.4505937099],
+    [0.0259040371, 0.7827717662, -0.8086757660],
+])
+_LMS_TO_LINEAR = np.linalg.inv(_LINEAR_TO_LMS)
+_OKLAB_TO_LMS = np.linalg.inv(_LMS_TO_OKLAB)
+
+# CIELAB constants
+_LAB_EPSILON = 216 / 24389
+_LAB_KAPPA = 24389 / 27
+
+# number of colors converted at once by convert_colorspace, small enough to fit in the CPU cache
+CHUNK_SIZE = 2**14
+
+# linear values of the 256 sRGB levels, used for uint8 inputs
+_SRGB8_TO_LINEAR = np.arange(256) / 255
+_SRGB8_TO_LINEAR = np.where(_SRGB8_TO_LINEAR <= 0.04045, _SRGB8_TO_LINEAR / 12.92,
+                            ((_SRGB8_TO_LINEAR + 0.055) / 1.055) ** 2.4)
+
+
+def _float_array(colors, dtype):
+    colors = np.asarray(colors)
+    if colors.shape[-1:] != (3,):
+        raise ValueError("colors must have shape (..., 3), not {0}".format(colors.shape))
+    if dtype is None:
+        dtype = colors.dtype if colors.dtype in (np.float32, np.float64) else np.float64
+    return colors.astype(dtype, copy=False)
+
+
+_MATRICES = {}
+
+
+def _matmul(colors, matrix):
+    # colors @ matrix.T in the precision of colors, with contiguous matrices for the fast BLAS path
+    key = (id(matrix), colors.dtype)
+    try:
+        transposed = _MATRICES[key]
+    except KeyError:
+        transposed = _MATRICES.setdefault(key, np.ascontiguousarray(matrix.T, dtype=colors.dtype))
+    return np.dot(colors, transposed)
+
+
+def srgb_to_linear(rgb, dtype=None):
+    """Convert sRGB values to linear sRGB
+
+    Parameters
+    ----------
+    rgb : array-like
+        (..., 3) array of sRGB values in [0,1], uint8 arrays are interpreted as [0,255]
+    dtype : numpy dtype, optional
+        np.float32 or np.float64, by default the float type of rgb (np.float64 otherwise)
+
+    Returns
+    -------
+    np.ndarray
+        (..., 3) array of linear sRGB values
+    """
+    rgb = np.asarray(rgb)
+    if rgb.dtype == np.uint8:
+        return _SRGB8_TO_LINEAR.astype(dtype or np.float64)[rgb]
+    rgb = _float_array(rgb, dtype)
+    # the linear segment also applies to negative (out of gamut) values
+    out = np.maximum(rgb, 0.04045)
+    out += 0.055
+    out *= 1 / 1.055
+    np.power(out, 2.4, out=out)
+    np.multiply(rgb, 1 / 12.92, out=out, where=rgb < 0.04045)
+    return out
+
+
+def linear_to_srgb(rgb, dtype=None):
+    """Convert linear sRGB values to sRGB
+
+    Parameters
+    ----------
+    rgb : array-like
+        (..., 3) array of linear sRGB values
+    dtype : numpy dtype, optional
+        np.float32 or np.float64, by default the float type of rgb (np.float64 otherwise)
+
+    Returns
+    -------
+    np.ndarray
+        (..., 3) array of sRGB values, in [0,1] for colors in the sRGB gamut
+    """
+    rgb = _float_array(rgb, dtype)
+    out = np.maximum(rgb, 0.0031308)
+    np.power(out, 1 / 2.4, out=out)
+    out *= 1.055
+    out -= 0.055
+    np.multiply(rgb, 12.92, out=out, where=rgb < 0.0031308)
+    return out
+
+
+def linear_to_xyz(rgb, dtype=None):
+    """Convert linear sRGB values to CIE XYZ (D65)"""
+    return _matmul(_float_array(rgb, dtype), _LINEAR_TO_XYZ)
+
+
+def xyz_to_linear(xyz, dtype=None):
+    """Convert CIE XYZ (D65) values to linear sRGB"""
+    return _matmul(_float_array(xyz, dtype), _XYZ_TO_LINEAR)
+
+
+def xyz_to_lab(xyz, dtype=None):
+    """Convert CIE XYZ (D65) values to CIELAB
+
+    Parameters
+    ----------
+    xyz : array-like
+        (..., 3) array of XYZ values, with Y in [0,1]
+    dtype : numpy dtype, optional
+        np.float32 or np.float64, by default the float type of xyz (np.float64 otherwise)
+
+    Returns
+    -------
+    np.ndarray
+        (..., 3) array of L*, a*, b* values, with L* in [0,100]
+    """
+    return _relative_to_lab(_matmul(_float_array(xyz, dtype), _XYZ_TO_RELATIVE))
+
+
+def _linear_to_lab(rgb, dtype=None):
+    return _relative_to_lab(_matmul(_float_array(rgb, dtype), _LINEAR_TO_RELATIVE))
+
+
+def _relative_to_lab(f):
+    # CIELAB from XYZ relative to the white point, computed in place
+    low = f <= _LAB_EPSILON
+    lows = f[low] if low.any() else None
+    np.cbrt(f, out=f)
+    if lows is not None:
+        lows *= _LAB_KAPPA / 116
+        lows += 16 / 116
+        f[low] = lows
+    # written in place, the differences keep a* and b* exactly 0 when f(X) = f(Y) = f(Z), as for black
+    out = np.empty_like(f)
+    np.multiply(f[..., 1], 116, out=out[..., 0])
+    out[..., 0] -= 16
+    np.subtract(f[..., 0], f[..., 1], out=out[..., 1])
+    out[..., 1] *= 500
+    np.subtract(f[..., 1], f[..., 2], out=out[..., 2])
+    out[..., 2] *= 200
+    return out
+
+
+def lab_to_xyz(lab, dtype=None):
+    """Convert CIELAB values to CIE XYZ (D65)"""
+    lab = _float_array(lab, dtype)
+    f = np.empty_like(lab)
+    f[..., 1] = (lab[..., 0] + 16) / 116
+    f[..., 0] = f[..., 1] + lab[..., 1] / 500
+    f[..., 2] = f[..., 1] - lab[..., 2] / 200
+    cube = f ** 3
+    lows = f * (116 / _LAB_KAPPA)
+    lows -= 16 / _LAB_KAPPA
+    np.copyto(cube, lows, where=cube <= _LAB_EPSILON)
+    cube *= WHITE_D65.astype(lab.dtype)
+    return cube
+
+
+def linear_to_oklab(rgb, dtype=None):
+    """Convert linear sRGB values to OKLab
+
+    Parameters
+    ----------
+    rgb : array-like
+        (..., 3) array of linear sRGB values
+    dtype : numpy dtype, optional
+        np.float32 or np.float64, by default the float type of rgb (np.float64 otherwise)
+
+    Returns
+    -------
+    np.ndarray
+        (..., 3) array of L, a, b values, with L in [0,1]
+    """
+    lms = _matmul(_float_array(rgb, dtype), _LINEAR_TO_LMS)
+    np.cbrt(lms, out=lms)
+    return _matmul(lms, _LMS_TO_OKLAB)
+
+
+def oklab_to_linear(lab, dtype=None):
+    """Convert OKLab values to linear sRGB"""
+    lms = _matmul(_float_array(lab, dtype), _OKLAB_TO_LMS)
+    lms **= 3
+    return _matmul(lms, _LMS_TO_LINEAR)
+
+
+def lab_to_lch(lab, dtype=None):
+    """Convert CIELAB or OKLab values to their cylindrical form (lightness, chroma, hue in degrees)"""
+    lab = _float_array(lab, dtype)
+    out = np.empty_like(lab)
+    out[..., 0] = lab[..., 0]
+    chroma = np.square(lab[..., 1])
+    chroma += np.square(lab[..., 2])
+    np.sqrt(chroma, out=out[..., 1])
+    hue = np.arctan2(lab[..., 2], lab[..., 1])
+    hue *= 180 / np.pi
+    # a float modulo is slow, the hue is only negative in [-180, 0)
+    np.add(hue, 360, out=hue, where=hue < 0)
+    out[..., 2] = hue
+    return out
+
+
+def lch_to_lab(lch, dtype=None):
+    """Convert cylindrical (lightness, chroma, hue in degrees) values to CIELAB or OKLab"""
+    lch = _float_array(lch, dtype)
+    out = np.empty_like(lch)
+    hue = np.radians(lch[..., 2])
+    out[..., 0] = lch[..., 0]
+    out[..., 1] = lch[..., 1] * np.cos(hue)
+    out[..., 2] = lch[..., 1] * np.sin(hue)
+    return out
+
+
+def _identity(colors, dtype=None):
+    return _float_array(colors, dtype)
+
+
+_TO_LINEAR = {
+    'srgb': srgb_to_linear,
+    'linear': _identity,
+    'xyz': xyz_to_linear,
+    'lab': lambda c, dtype=None: xyz_to_linear(lab_to_xyz(c, dtype)),
+    'lch': lambda c, dtype=None: xyz_to_linear(lab_to_xyz(lch_to_lab(c, dtype))),
+    'oklab': oklab_to_linear,
+    'oklch': lambda c, dtype=None: oklab_to_linear(lch_to_lab(c, dtype)),
+}
+
+_FROM_LINEAR = {
+    'srgb': linear_to_srgb,
+    'linear': _identity,
+    'xyz': linear_to_xyz,
+    'lab': _linear_to_lab,
+    'lch': lambda c, dtype=None: lab_to_lch(_linear_to_lab(c, dtype)),
+    'oklab': linear_to_oklab,
+    'oklch': lambda c, dtype=None: lab_to_lch(linear_to_oklab(c, dtype)),
+}
+
+# conversions that do not need to go through linear sRGB
+_SHORTCUTS = {
+    ('xyz', 'lab'): xyz_to_lab,
+    ('lab', 'xyz'): lab_to_xyz,
+    ('xyz', 'lch'): lambda c, dtype=None: lab_to_lch(xyz_to_lab(c, dtype)),
+    ('lch', 'xyz'): lambda c, dtype=None: lab_to_xyz(lch_to_lab(c, dtype)),
+    ('lab', 'lch'): lab_to_lch,
+    ('lch', 'lab'): lch_to_lab,
+    ('oklab', 'oklch'): lab_to_lch,
+    ('oklch', 'oklab'): lch_to_lab,
+}
+
+
+def convert_colorspace(colors, src='srgb', dst='oklab', dtype=None):
+    """Convert colors between color spaces
+
+    Supported spaces are 'srgb', 'linear' (linear sRGB), 'xyz' (CIE XYZ, D65),
+    'lab' (CIELAB), 'lch' (CIELAB LCh), 'oklab' and 'oklch'.
+    Large arrays are converted in blocks, float32 is about twice as fast as float64.
+
+    Parameters
+    ----------
+    colors : array-like
+        (..., 3) array of colors in the src space
+        uint8 sRGB arrays are interpreted as [0,255] values
+    src : str, optional
+        space of the input colors, by default 'srgb'
+    dst : str, optional
+        space of the output colors, by default 'oklab'
+    dtype : numpy dtype, optional
+        np.float32 or np.float64, by default the float type of colors (np.float64 otherwise)
+
+    Returns
+    -------
+    np.ndarray
+        (..., 3) array of colors in the dst space
+    """
+    src, dst = src.lower(), dst.lower()
+    for space in (src, dst):
+        if space not in _TO_LINEAR:
+            raise ValueError("Unknown color space '{0}', must be one of {1}".format(space, ', '.join(SPACES)))
+    if src == dst:
+        if src == 'srgb' and np.asarray(colors).dtype == np.uint8:
+            return np.asarray(colors).astype(dtype or np.float64) / 255
+        return _float_array(colors, dtype).copy()
+    if (src, dst) in _SHORTCUTS:
+        func = _SHORTCUTS[src, dst]
+    else:
+        func = lambda c, dtype=None: _FROM_LINEAR[dst](_TO_LINEAR[src](c, dtype))
+
+    colors = np.asarray(colors)
+    if colors.shape[-1:] != (3,):
+        raise ValueError("colors must have shape (..., 3), not {0}".format(colors.shape))
+    if colors.size <= 3 * CHUNK_SIZE:
+        return func(colors, dtype)
+    # large arrays are converted in blocks, so that the temporary arrays stay in the CPU cache
+    flat = colors.reshape(-1, 3)
+    if dtype is None:
+        dtype = colors.dtype if colors.dtype in (np.float32, np.float64) else np.float64
+    out = np.empty(flat.shape, dtype=dtype)
+    for i in range(0, len(flat), CHUNK_SIZE):
+        out[i:i + CHUNK_SIZE] = func(flat[i:i + CHUNK_SIZE], dtype)
+    return out.reshape(colors.shape)
+
+
+def delta_e(colors1, colors2):
+    """Euclidean distance between colors in OKLab or CIELAB (CIE76)
+
+    Parameters
+    ----------
+    colors1, colors2 : array-like
+        (..., 3) arrays of OKLab or CIELAB colors, broadcast together
+
+    Returns
+    -------
+    np.ndarray
+        (...) array of distances
+    """
+    diff = np.asarray(colors1, dtype=float) - np.asarray(colors2, dtype=float)
+    return np.sqrt(np.einsum('...i,...i->...', diff, diff))
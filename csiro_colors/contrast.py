@@ -0,0 +1,151 @@
+import numpy as np
+import matplotlib.colors as col
+
+from .converters import NAMED_COLORS, basestring
+from .colorarray import ColorArray, PACKED_DTYPE
+from .colorspaces import srgb_to_linear, _SRGB8_TO_LINEAR
+from .cmaps import csiro_named_colors, _resolve_cmap
+
+# WCAG 2 minimum contrast ratios, for normal text and for large text
+WCAG_AA = 4.5
+WCAG_AA_LARGE = 3.0
+WCAG_AAA = 7.0
+WCAG_AAA_LARGE = 4.5
+
+# number of colors processed at once
+CHUNK_SIZE = 2**16
+
+# weights of the linear sRGB channels in the relative luminance
+_LUMINANCE_WEIGHTS = np.array([0.2126, 0.7152, 0.0722])
+
+
+def _named_color(name):
+    if name.startswith('#'):
+        return name
+    try:
+        return csiro_named_colors[name]
+    except KeyError:
+        pass
+    return NAMED_COLORS.get(name.lower())
+
+
+def _as_rgb(colors):
+    # (..., 3) uint8 or float sRGB array from colors, HEX codes, named colors, colormaps or packed RGBA
+    if isinstance(colors, ColorArray):
+        return colors.rgb8
+    if isinstance(colors, col.Colormap):
+        return ColorArray.from_cmap(colors).rgb8
+    if isinstance(colors, basestring):
+        hex_code = _named_color(colors)
+        if hex_code is None:
+            return ColorArray.from_cmap(_resolve_cmap(colors)).rgb8
+        return ColorArray([hex_code]).rgb8[0]
+    if isinstance(colors, (list, tuple)) and colors and isinstance(colors[0], basestring):
+        hex_codes = [_named_color(c) for c in colors]
+        if None in hex_codes:
+            raise ValueError("Could not find named color '{0}'".format(colors[hex_codes.index(None)]))
+        return ColorArray(hex_codes).rgb8
+    colors = np.asarray(colors)
+    if colors.dtype == np.uint32:
+        # packed RGBA, as returned by apply_cmap(..., packed=True)
+        return colors.astype(PACKED_DTYPE, copy=False).view(np.uint8).reshape(colors.shape + (4,))[..., :3]
+    if colors.shape[-1:] == (4,):
+        return colors[..., :3]
+    if colors.shape[-1:] != (3,):
+        raise ValueError("colors must have shape (..., 3) or (..., 4), not {0}".format(colors.shape))
+    return colors
+
+
+def _luminance(rgb):
+    # relative luminance of a (N, 3) uint8 or float sRGB array
+    if rgb.dtype == np.uint8:
+        return np.dot(_SRGB8_TO_LINEAR.astype(np.float32)[rgb], _LUMINANCE_WEIGHTS.astype(np.float32))
+    return np.dot(srgb_to_linear(rgb), _LUMINANCE_WEIGHTS)
+
+
+def relative_luminance(colors):
+    """WCAG relative luminance of colors
+
+    sRGB values are linearized with the threshold of the sRGB standard (0.04045) rather than
+    the 0.03928 quoted by WCAG 2, the luminances differ by less than 1e-5.
+
+    Parameters
+    ----------
+    colors : str, list of str, array-like, Colormap or ColorArray
+        HEX code or named color (CSS or CSIRO), list of them, (..., 3) or (..., 4) sRGB array
+        (uint8 in [0,255] or float in [0,1]), packed RGBA uint32 array, colormap name, Colormap or ColorArray
+
+    Returns
+    -------
+    np.ndarray
+        (...) array of luminances, between 0 (black) and 1 (white)
+    """
+    rgb = _as_rgb(colors)
+    flat = rgb.reshape(-1, 3)
+    out = np.empty(len(flat))
+    for start in range(0, len(flat), CHUNK_SIZE):
+        out[start:start + CHUNK_SIZE] = _luminance(flat[start:start + CHUNK_SIZE])
+    return out.reshape(rgb.shape[:-1])
+
+
+def _ratio(l1, l2):
+    # contrast ratio of broadcast luminances
+    return (np.maximum(l1, l2) + 0.05) / (np.minimum(l1, l2) + 0.05)
+
+
+def contrast_matrix(colors, others):
+    """WCAG contrast ratios between every color and every other color
+
+    Parameters
+    ----------
+    colors : str, list of str, array-like, Colormap or ColorArray
+        colors, palette or colormap colors, see relative_luminance
+    others : str, list of str, array-like, Colormap or ColorArray
+        background or text colors, see relative_luminance
+
+    Returns
+    -------
+    np.ndarray
+        (..., M) array of contrast ratios between 1 and 21, for the (...) colors and the M other colors
+        compare with WCAG_AA, WCAG_AA_LARGE or WCAG_AAA
+    """
+    return _ratio(relative_luminance(colors)[..., None], relative_luminance(others).reshape(-1))
+
+
+def best_text_color(backgrounds, text_colors=('#ffffff', 'csiro_black'), return_contrast=False):
+    """Pick the text color with the highest WCAG contrast on every background
+
+    Parameters
+    ----------
+    backgrounds : str, list of str, array-like, Colormap or ColorArray
+        background colors, for example an (H, W, 4) image of heatmap cells, see relative_luminance
+    text_colors : list of str, array-like or ColorArray, optional
+        candidate text colors, by default white and csiro_black
+    return_contrast : bool, optional
+        whether to also return the contrast ratios, by default False
+
+    Returns
+    -------
+    np.ndarray or tuple of np.ndarray
+        (...) array of indices into text_colors, and of contrast ratios if return_contrast is True
+    """
+    rgb = _as_rgb(backgrounds)
+    flat = rgb.reshape(-1, 3)
+    candidates = relative_luminance(text_colors).reshape(-1)
+    if len(candidates) > 256:
+        raise ValueError("Only up to 256 text colors are supported")
+    # the contrast ratio is a distance between log(L + 0.05) values, so the best candidate is
+    # always the brightest or the darkest one, whichever is farther from the background
+    brightest, darkest = candidates.argmax(), candidates.argmin()
+    threshold = np.sqrt((candidates[brightest] + 0.05) * (candidates[darkest] + 0.05)) - 0.05
+    index = np.empty(len(flat), dtype=np.uint8)
+    contrast = np.empty(len(flat)) if return_contrast else None
+    for start in range(0, len(flat), CHUNK_SIZE):
+        luminance = _luminance(flat[start:start + CHUNK_SIZE])
+        index[start:start + CHUNK_SIZE] = np.where(luminance < threshold, brightest, darkest)
+        if return_contrast:
+            contrast[start:start + CHUNK_SIZE] = _ratio(luminance, candidates[index[start:start + CHUNK_SIZE]])
+    index = index.reshape(rgb.shape[:-1])
+    if return_contrast:
+        return index, contrast.reshape(rgb.shape[:-1])
+    return index
@@ -3,6 +3,8 @@ import numpy as np
 import json
 import os
 
+from .colorspaces import convert_colorspace
+
 # for python 2 and python 3 compatibility
 try:
     # python 2
@@ -12,15 +14,151 @@ except NameError:
     basestring = (str, bytes)
 number = (int, float, np.integer, np.floating)
 
+# lists longer than this are converted with the vectorized engine, shorter ones in pure python
+VECTORIZE_THRESHOLD = 16
+
 NAMED_COLORS = json.load(open(os.path.join(os.path.dirname(__file__), './named_colors.json')))
 
-def hex_to_rgb(hex_code, normalized=True):
+# lookup tables used by the vectorized engine
+_HEX_CHARS = np.frombuffer(b'0123456789abcdef', dtype=np.uint8).astype(np.uint32)
+_HEX_VALUES = np.full(256, 255, dtype=np.uint8)
+_HEX_VALUES[_HEX_CHARS] = np.arange(16)
+_HEX_VALUES[np.frombuffer(b'ABCDEF', dtype=np.uint8)] = np.arange(10, 16)
+
+
+def _hex_to_uint8(hex_code):
+    # parse an array of HEX strings or packed 0xRRGGBB integers into a (N, 3) uint8 array
+    hex_code = np.asarray(hex_code)
+    if hex_code.dtype.kind in 'ui':
+        packed = hex_code.reshape(-1).astype(np.uint32, copy=False)
+        out = np.empty((packed.size, 3), dtype=np.uint8)
+        out[:, 0] = packed >> 16
+        out[:, 1] = packed >> 8
+        out[:, 2] = packed
+        return out
+    elif hex_code.dtype.kind == 'U':
+        width = hex_code.dtype.itemsize // 4
+        codes = np.ascontiguousarray(hex_code.reshape(-1)).view(np.uint32)
+    elif hex_code.dtype.kind == 'S':
+        width = hex_code.dtype.itemsize
+        codes = np.ascontiguousarray(hex_code.reshape(-1)).view(np.uint8)
+    else:
+        raise TypeError("hex codes must be strings or packed 0xRRGGBB integers, not {0}".format(hex_code.dtype))
+    if width < 6:
+        raise ValueError("HEX codes must have at least 6 digits")
+    codes = codes.reshape(-1, width)
+    if width == 6:
+        codes = np.hstack((codes, np.zeros((codes.shape[0], 1), dtype=codes.dtype)))
+
+    has_hash = codes[:, 0] == ord('#')
+    if has_hash.all():
+        digits = codes[:, 1:7]
+    elif not has_hash.any():
+        digits = codes[:, :6]
+    else:
+        digits = np.where(has_hash[:, None], codes[:, 1:7], codes[:, :6])
+
+    values = _HEX_VALUES[np.minimum(digits, 255)]
+    if (values == 255).any():
+        bad = hex_code.reshape(-1)[(values == 255).any(axis=1)][0]
+        raise ValueError("Invalid HEX code '{0}'".format(bad))
+    return (values[:, 0::2] << 4) | values[:, 1::2]
+
+
+def hex_to_rgb_array(hex_code, normalized=True, dtype=np.float64, space='srgb'):
+    """Vectorized conversion of HEX color codes to RGB
+
+    Parameters
+    ----------
+    hex_code : array-like of str or int
+        HEX codes as a unicode or bytes array (for example U7 or S7, with or without '#'),
+        or an integer array of packed 0xRRGGBB values
+    normalized : bool, optional
+        Whether to return values in [0,1] as floats or in [0,255] as uint8, by default True
+    dtype : numpy dtype, optional
+        floating point type used for normalized values, by default np.float64
+    space : str, optional
+        color space of the output (see convert_colorspace), by default 'srgb'
+        normalized is ignored for other spaces
+
+    Returns
+    -------
+    np.ndarray
+        (N, 3) array of RGB values, or of colors in the given space
+    """
+    rgb = _hex_to_uint8(hex_code)
+    if space != 'srgb':
+        return convert_colorspace(rgb, 'srgb', space, dtype=dtype)
+    if normalized:
+        return rgb.astype(dtype) / np.dtype(dtype).type(255)
+    return rgb
+
+
+def _rgb_to_uint8(rgb, normalized=True):
+    # quantize RGB(A) values to uint8 the same way rgb_to_hex always did (truncation, modulo 256)
+    if rgb.dtype == np.uint8:
+        return rgb
+    factor = 255 if normalized else 1
+    return np.mod(rgb * factor, 256).astype(np.uint8)
+
+
+def _as_color_array(colors):
+    # ColorArray is defined on top of this module, so it can only be checked lazily
+    from .colorarray import ColorArray
+    if isinstance(colors, ColorArray):
+        return colors
+    return None
+
+
+def rgb_to_hex_array(rgb, normalized=True, space='srgb'):
+    """Vectorized conversion of RGB or RGBA values to HEX color strings
+
+    Parameters
+    ----------
+    rgb : array-like
+        (N, 3) or (N, 4) array of RGB or RGBA values.
+        uint8 arrays are always interpreted as [0,255] values
+    normalized : bool, optional
+        Whether float values are expressed as [0,1] or [0,255], by default True
+    space : str, optional
+        color space of the input (see convert_colorspace), by default 'srgb'
+        other spaces are rounded to the nearest sRGB color, clipped to the gamut
+
+    Returns
+    -------
+    np.ndarray
+        (N,) array of HEX strings with dtype U7
+    """
+    rgb = np.asarray(rgb)
+    if rgb.ndim == 1:
+        rgb = rgb[None, :]
+    if rgb.ndim != 2 or rgb.shape[1] not in (3, 4):
+        raise ValueError("you must provide an array of shape (N, 3) or (N, 4)")
+
+    if space != 'srgb':
+        rgb = np.clip(convert_colorspace(rgb[:, :3], space, 'srgb'), 0, 1)
+        rgb = np.rint(rgb * 255).astype(np.uint8)
+    else:
+        rgb = _rgb_to_uint8(rgb[:, :3], normalized=normalized)
+
+    chars = np.empty((rgb.shape[0], 7), dtype=np.uint32)
+    chars[:, 0] = ord('#')
+    chars[:, 1::2] = _HEX_CHARS[rgb >> 4]
+    chars[:, 2::2] = _HEX_CHARS[rgb & 15]
+    return chars.view('U7').reshape(-1)
+
+
+def hex_to_rgb(hex_code, normalized=True, space='srgb'):
     """Utility to convert HEX color codes to RGB
     
     Arguments:
     -----------
-    color : str or list
+    color : str, list, np.ndarray or ColorArray
         hex code(s) to be converted
+        lists longer than VECTORIZE_THRESHOLD use the vectorized engine,
+        arrays and ColorArray are converted with hex_to_rgb_array and returned as arrays
+    space : str, optional
+        color space of the output (see convert_colorspace), by default 'srgb'
 
     Returns:
     -----------
@@ -29,29 +167,55 @@ def hex_to_rgb(hex_code, normalized=True):
     """
     if isinstance(hex_code, basestring):
         hex_code = [hex_code]
+    elif isinstance(hex_code, np.ndarray):
+        return hex_to_rgb_array(hex_code, normalized=normalized, space=space)
     elif isinstance(hex_code, list):
         pass
+    elif _as_color_array(hex_code) is not None:
+        if space != 'srgb':
+            return convert_colorspace(hex_code.rgb8, 'srgb', space)
+        return hex_code.rgb if normalized else hex_code.rgb8
     else:
         raise TypeError("hex code must be a str or list of str")
-    hex_code = [h.lstrip('#') for h in hex_code]
-    if normalized:
-        den = 255
+    if not hex_code:
+        return []
+    if space == 'srgb' and len(hex_code) <= VECTORIZE_THRESHOLD:
+        if not all(isinstance(h, basestring) for h in hex_code):
+            raise TypeError("hex code must be a str or list of str")
+        den = 255 if normalized else 1
+        hex_code = [h.lstrip('#') for h in hex_code]
+        out = [(int(h[0:2], 16)/den, int(h[2:4], 16)/den, int(h[4:6], 16)/den) for h in hex_code]
+        if len(out) == 1:
+            return out[0]
+        return out
+    hex_array = np.asarray(hex_code)
+    if hex_array.dtype.kind not in 'US':
+        raise TypeError("hex code must be a str or list of str")
+    rgb = _hex_to_uint8(hex_array)
+    if space != 'srgb':
+        rgb = convert_colorspace(rgb, 'srgb', space)
     else:
-        den = 1
-    out = [(int(h[0:2], 16)/den, int(h[2:4], 16)/den, int(h[4:6], 16)/den) for h in hex_code]
+        rgb = rgb.astype(float)
+        if normalized:
+            rgb /= 255
+    out = list(map(tuple, rgb.tolist()))
     if len(out) == 1:
         return out[0]
     return out
 
-def rgb_to_hex(rgb_tuple, normalized=True):
+def rgb_to_hex(rgb_tuple, normalized=True, space='srgb'):
     """Utility to convert RGB or RGBA tuples to HEX color strings
 
     Parameters
     ----------
-    rgb_tuple : 3- or 4-items tuple
+    rgb_tuple : 3- or 4-items tuple, list of tuples, np.ndarray or ColorArray
         RGB or RGBA code
+        lists longer than VECTORIZE_THRESHOLD use the vectorized engine,
+        arrays and ColorArray are converted with rgb_to_hex_array and returned as arrays
     normalized : bool, optional
         Whether the RGB code is expressed as [0,1] or [0,255], by default True
+    space : str, optional
+        color space of the input (see convert_colorspace), by default 'srgb'
 
     Returns
     -------
@@ -61,20 +225,33 @@ def rgb_to_hex(rgb_tuple, normalized=True):
 
     if isinstance(rgb_tuple, tuple):
         rgb_tuple = [rgb_tuple]
+    elif isinstance(rgb_tuple, np.ndarray):
+        return rgb_to_hex_array(rgb_tuple, normalized=normalized, space=space)
     elif isinstance(rgb_tuple, list):
         pass
+    elif _as_color_array(rgb_tuple) is not None:
+        return rgb_tuple.hex
 
     if not all([isinstance(rgb, tuple) and (len(rgb) == 3 or len(rgb) == 4) for rgb in rgb_tuple ]):
         raise ValueError("you must provides tuples of 3 or 4 elements")
+    if not rgb_tuple:
+        return []
+    if space == 'srgb' and len(rgb_tuple) <= VECTORIZE_THRESHOLD:
+        factor = 255 if normalized else 1
+        out = ['#%02x%02x%02x' % tuple((int(c * factor % 256) for c in rgb[:3])) for rgb in rgb_tuple]
+        if len(out) == 1:
+            return out[0]
+        return out
 
-    if normalized:
-        factor = 255
-    else:
-        factor = 1
+    try:
+        rgb_array = np.array(rgb_tuple, dtype=float)
+    except ValueError:
+        rgb_array = None
+    if rgb_array is None or rgb_array.ndim != 2:
+        # mix of RGB and RGBA tuples
+        rgb_array = np.array([rgb[:3] for rgb in rgb_tuple], dtype=float)
 
-    out = []
-    for rgb in rgb_tuple:
-        out.append('#%02x%02x%02x' % tuple((int(c * factor % 256) for c in rgb[:3])) )
+    out = rgb_to_hex_array(rgb_array, normalized=normalized, space=space).tolist()
     if len(out) == 1:
         return out[0]
     return out
@@ -149,7 +326,7 @@ def cmap_to_hex(cmap):
 
     Parameters
     ----------
-    cmap : matplotlib.colors.Colormap
+    cmap : matplotlib.colors.Colormap or ColorArray
         Colormap object
 
     Returns
@@ -161,22 +338,27 @@ def cmap_to_hex(cmap):
     #     cmap = get_cmap(cmap)
     if isinstance(cmap, col.Colormap):
         pass
+    elif _as_color_array(cmap) is not None:
+        return cmap.hex.tolist()
     else:
         raise TypeError("The argument 'cmap' must be a colormap or colormap name")
 
     try:
-        colors = list(map(tuple, cmap.colors))
+        colors = col.to_rgba_array(cmap.colors)
     except AttributeError:
-        colors = list(map(tuple, cmap(np.linspace(0, 1, 256))))
-    return list(map(rgb_to_hex, colors))
+        colors = cmap(np.linspace(0, 1, 256))
+    return rgb_to_hex_array(colors).tolist()
 
-def cmap_to_rgb(cmap, normalized=True):
+def cmap_to_rgb(cmap, normalized=True, space='srgb'):
     """Utility to convert a matplotlib.colors.Colormap to a list of RGB codes
 
     Parameters
     ----------
-    cmap : matplotlib.colors.Colormap
+    cmap : matplotlib.colors.Colormap or ColorArray
         Colormap object
+    space : str, optional
+        color space of the output (see convert_colorspace), by default 'srgb'
+        normalized is ignored for other spaces
 
     Returns
     -------
@@ -187,9 +369,20 @@ def cmap_to_rgb(cmap, normalized=True):
     #     cmap = get_cmap(cmap)
     if isinstance(cmap, col.Colormap):
         pass
+    elif _as_color_array(cmap) is not None:
+        if space != 'srgb':
+            return list(convert_colorspace(cmap.rgb8, 'srgb', space))
+        return list(cmap.rgb * (255 if normalized else 1))
     else:
         raise TypeError("The argument 'cmap' must be a colormap or colormap name")
 
+    if space != 'srgb':
+        try:
+            colors = col.to_rgba_array(cmap.colors)
+        except AttributeError:
+            colors = cmap(np.linspace(0, 1, 256))
+        return list(convert_colorspace(colors[:, :3], 'srgb', space))
+
     if normalized:
         n = 255
     else:
@@ -0,0 +1,344 @@
+import numpy as np
+import matplotlib.colors as col
+
+from .converters import basestring
+from .colorarray import ColorArray
+from .colorspaces import srgb_to_linear, linear_to_srgb, convert_colorspace, _SRGB8_TO_LINEAR
+from .cmaps import search_colormaps, _resolve_cmap, _get_name_index, _select_registries
+
+# Simulation of color vision deficiencies, Machado, Oliveira and Fernandes (2009)
+# "A Physiologically-based Model for Simulation of Color Vision Deficiency".
+# Matrices apply to linear sRGB, for severities 0, 0.1, ..., 1, and are interpolated in between.
+
+CVD_TYPES = ('protan', 'deutan', 'tritan')
+
+_MACHADO_2009 = {
+    'protan': np.array([
+        [[1.000000, 0.000000, -0.000000], [0.000000, 1.000000, 0.000000], [-0.000000, -0.000000, 1.000000]],
+        [[0.856167, 0.182038, -0.038205], [0.029342, 0.955115, 0.015544], [-0.002880, -0.001563, 1.004443]],
+        [[0.734766, 0.334872, -0.069637], [0.051840, 0.919198, 0.028963], [-0.004928, -0.004209, 1.009137]],
+        [[0.630323, 0.465641, -0.095964], [0.069181, 0.890046, 0.040773], [-0.006308, -0.007724, 1.014032]],
+        [[0.539009, 0.579343, -0.118352], [0.082546, 0.866121, 0.051332], [-0.007136, -0.011959, 1.019095]],
+        [[0.458064, 0.679578, -0.137642], [0.092785, 0.846313, 0.060902], [-0.007494, -0.016807, 1.024301]],
+        [[0.385450, 0.769005, -0.154455], [0.100526, 0.829802, 0.069673], [-0.007442, -0.022190, 1.029632]],
+        [[0.319627, 0.849633, -0.169261], [0.106241, 0.815969, 0.077790], [-0.007025, -0.028051, 1.035076]],
+        [[0.259411, 0.923008, -0.182420], [0.110296, 0.804340, 0.085364], [-0.006276, -0.034346, 1.040622]],
+        [[0.203876, 0.990338, -0.194214], [0.112975, 0.794542, 0.092483], [-0.005222, -0.041043, 1.046265]],
+        [[0.152286, 1.052583, -0.204868], [0.114503, 0.786281, 0.099216], [-0.003882, -0.048116, 1.051998]],
+    ]),
+    'deutan': np.array([
+        [[1.000000, 0.000000, -0.000000], [0.000000, 1.000000, 0.000000], [-0.000000, -0.000000, 1.000000]],
+        [[0.866435, 0.177704, -0.044139], [0.049567, 0.939063, 0.011370], [-0.003453, 0.007233, 0.996220]],
+        [[0.760729, 0.319078, -0.079807], [0.090568, 0.889315, 0.020117], [-0.006027, 0.013325, 0.992702]],
+        [[0.675425, 0.433850, -0.109275], [0.125303, 0.847755, 0.026942], [-0.007950, 0.018572, 0.989378]],
+        [[0.605511, 0.528560, -0.134071], [0.155318, 0.812366, 0.032316], [-0.009376, 0.023176, 0.986200]],
+        [[0.547494, 0.607765, -0.155259], [0.181692, 0.781742, 0.036566], [-0.010410, 0.027275, 0.983136]],
+        [[0.498864, 0.674741, -0.173604], [0.205199, 0.754872, 0.039929], [-0.011131, 0.030969, 0.980162]],
+        [[0.457771, 0.731899, -0.189670], [0.226409, 0.731012, 0.042579], [-0.011595, 0.034333, 0.977261]],
+        [[0.422823, 0.781057, -0.203881], [0.245752, 0.709602, 0.044646], [-0.011843, 0.037423, 0.974421]],
+        [[0.392952, 0.823610, -0.216562], [0.263559, 0.690210, 0.046232], [-0.011910, 0.040281, 0.971630]],
+        [[0.367322, 0.860646, -0.227968], [0.280085, 0.672501, 0.047413], [-0.011820, 0.042940, 0.968881]],
+    ]),
+    'tritan': np.array([
+        [[1.000000, 0.000000, -0.000000], [0.000000, 1.000000, 0.000000], [-0.000000, -0.000000, 1.000000]],
+        [[0.926670, 0.092514, -0.019184], [0.021191, 0.964503, 0.014306], [0.008437, 0.054813, 0.936750]],
+        [[0.895720, 0.133330, -0.029050], [0.029997, 0.945400, 0.024603], [0.013027, 0.104707, 0.882266]],
+        [[0.905871, 0.127791, -0.033662], [0.026856, 0.941251, 0.031893], [0.013410, 0.148296, 0.838294]],
+        [[0.948035, 0.089490, -0.037526], [0.014364, 0.946792, 0.038844], [0.010853, 0.193991, 0.795156]],
+        [[1.017277, 0.027029, -0.044306], [-0.006113, 0.958479, 0.047634], [0.006379, 0.248708, 0.744913]],
+        [[1.104996, -0.046633, -0.058363], [-0.032137, 0.971635, 0.060503], [0.001336, 0.317922, 0.680742]],
+        [[1.193214, -0.109812, -0.083402], [-0.058496, 0.979410, 0.079086], [-0.002346, 0.403492, 0.598854]],
+        [[1.257728, -0.139648, -0.118081], [-0.078003, 0.975409, 0.102594], [-0.003316, 0.501214, 0.502102]],
+        [[1.278864, -0.125333, -0.153531], [-0.084748, 0.957674, 0.127074], [-0.000989, 0.601151, 0.399838]],
+        [[1.255528, -0.076749, -0.178779], [-0.078411, 0.930809, 0.147602], [0.004733, 0.691367, 0.303900]],
+    ]),
+}
+
+# number of pixels simulated at once
+CHUNK_SIZE = 2**14
+
+# colormaps are scored on all their colors if qualitative with up to this many colors,
+# otherwise on SCORE_SAMPLES evenly spaced samples
+MAX_QUALITATIVE_COLORS = 64
+SCORE_SAMPLES = 9
+
+# uint8 sRGB levels of 2**16 + 1 evenly spaced linear values, see _simulate_uint8
+_LINEAR_LEVELS = 2**16
+_linear_to_srgb8 = []
+
+# scores by (catalog name, severity, n_colors)
+_scores = {}
+
+
+def cvd_matrix(deficiency, severity=1.0):
+    """Return the linear sRGB matrix simulating a color vision deficiency
+
+    Parameters
+    ----------
+    deficiency : str
+        'protan' (red), 'deutan' (green) or 'tritan' (blue) deficiency
+    severity : float, optional
+        between 0 (normal vision) and 1 (dichromacy), by default 1.0
+
+    Returns
+    -------
+    np.ndarray
+        (3, 3) matrix, applied to linear sRGB column vectors
+    """
+    try:
+        table = _MACHADO_2009[deficiency]
+    except (KeyError, TypeError):
+        raise ValueError("The argument 'deficiency' must be one of {0}".format(', '.join(CVD_TYPES)))
+    if not 0 <= severity <= 1:
+        raise ValueError("The argument 'severity' must be between 0 and 1")
+    position = severity * 10
+    i = min(int(position), 9)
+    weight = position - i
+    return (1 - weight) * table[i] + weight * table[i + 1]
+
+
+def _srgb8_encoder():
+    if not _linear_to_srgb8:
+        linear = np.repeat(np.linspace(0, 1, _LINEAR_LEVELS + 1)[:, None], 3, axis=1)
+        _linear_to_srgb8.append(np.rint(linear_to_srgb(linear)[:, 0] * 255).astype(np.uint8))
+    return _linear_to_srgb8[0]
+
+
+def _simulate_uint8(rgb, matrix, out):
+    # linear values are looked up from the uint8 levels, and encoded back to sRGB with a
+    # table of _LINEAR_LEVELS levels, within one uint8 level of the exact conversion
+    encoder = _srgb8_encoder()
+    to_linear = _SRGB8_TO_LINEAR.astype(np.float32)
+    matrix = np.ascontiguousarray(matrix.T * _LINEAR_LEVELS, dtype=np.float32)
+    for start in range(0, len(rgb), CHUNK_SIZE):
+        linear = np.dot(to_linear[rgb[start:start + CHUNK_SIZE]], matrix)
+        linear += 0.5
+        np.clip(linear, 0, _LINEAR_LEVELS, out=linear)
+        out[start:start + CHUNK_SIZE] = encoder[linear.astype(np.intp)]
+
+
+def _simulate_float(rgb, matrix, out):
+    matrix = np.ascontiguousarray(matrix.T, dtype=out.dtype)
+    for start in range(0, len(rgb), CHUNK_SIZE):
+        linear = np.dot(srgb_to_linear(rgb[start:start + CHUNK_SIZE], out.dtype), matrix)
+        np.clip(linear, 0, 1, out=linear)
+        out[start:start + CHUNK_SIZE] = linear_to_srgb(linear)
+
+
+def simulate_cvd(colors, deficiency='deutan', severity=1.0, out=None):
+    """Simulate how colors are seen with a color vision deficiency
+
+    Parameters
+    ----------
+    colors : array-like, str, list of str or ColorArray
+        (..., 3) RGB or (..., 4) RGBA colors or image, uint8 or float in [0,1], HEX codes or ColorArray
+        the alpha channel is copied unchanged
+    deficiency : str or list of str, optional
+        'protan', 'deutan' or 'tritan', by default 'deutan'
+        passing a list simulates every deficiency at once
+    severity : float, optional
+        between 0 (normal vision) and 1 (dichromacy), by default 1.0
+    out : np.ndarray, optional
+        output array with the shape and dtype of colors, by default a new array
+        (len(deficiency),) + colors.shape when passing a list of deficiencies
+
+    Returns
+    -------
+    np.ndarray or ColorArray
+        simulated colors, a ColorArray when passing HEX codes or a ColorArray
+    """
+    if not isinstance(deficiency, basestring):
+        deficiencies = list(deficiency)
+        if isinstance(colors, ColorArray) or isinstance(colors, basestring) or \
+                (isinstance(colors, list) and colors and isinstance(colors[0], basestring)):
+            return [simulate_cvd(colors, d, severity) for d in deficiencies]
+        colors = np.asarray(colors)
+        if out is None:
+            out = np.empty((len(deficiencies),) + colors.shape, dtype=colors.dtype)
+        for d, o in zip(deficiencies, out):
+            simulate_cvd(colors, d, severity, out=o)
+        return out
+
+    matrix = cvd_matrix(deficiency, severity)
+    if isinstance(colors, basestring):
+        colors = [colors]
+    if isinstance(colors, list) and colors and isinstance(colors[0], basestring):
+        colors = ColorArray(colors)
+    if isinstance(colors, ColorArray):
+        rgba8 = colors.rgba8.copy()
+        _simulate_uint8(rgba8[:, :3], matrix, rgba8[:, :3])
+        return ColorArray.from_rgba8(rgba8)
+
+    colors = np.asarray(colors)
+    if colors.shape[-1:] not in ((3,), (4,)):
+        raise ValueError("colors must have shape (..., 3) or (..., 4), not {0}".format(colors.shape))
+    if colors.dtype != np.uint8 and colors.dtype.kind != 'f':
+        raise TypeError("colors must be uint8 or float, not {0}".format(colors.dtype))
+    if out is None:
+        out = np.empty_like(colors)
+    elif out.shape != colors.shape or out.dtype != colors.dtype:
+        raise ValueError("out must be a {0} array of shape {1}".format(colors.dtype, colors.shape))
+
+    flat = colors.reshape(-1, colors.shape[-1])
+    out_flat = out.reshape(flat.shape)
+    if colors.dtype == np.uint8:
+        _simulate_uint8(flat[:, :3], matrix, out_flat[:, :3])
+    else:
+        _simulate_float(flat[:, :3], matrix, out_flat[:, :3])
+    if colors.shape[-1] == 4:
+        out_flat[:, 3] = flat[:, 3]
+    return out
+
+
+def _score_matrices(severity):
+    # normal vision, then every deficiency
+    return np.stack([np.eye(3)] + [cvd_matrix(d, severity) for d in CVD_TYPES])
+
+
+def _min_distances(samples, matrices):
+    # (M, n, 3) uint8 colors and (D, 3, 3) matrices to the (D, M) minimum pairwise OKLab distances
+    n = samples.shape[1]
+    if n < 2:
+        return np.full((len(matrices), len(samples)), np.nan)
+    linear = srgb_to_linear(samples)
+    simulated = np.matmul(linear[None], matrices.transpose(0, 2, 1)[:, None])
+    np.clip(simulated, 0, 1, out=simulated)
+    lab = convert_colorspace(simulated, 'linear', 'oklab')
+    i, j = np.triu_indices(n, 1)
+    diff = lab[:, :, i] - lab[:, :, j]
+    return np.sqrt(np.einsum('...i,...i->...', diff, diff).min(axis=-1))
+
+
+def _score_samples(samples, severity):
+    # scores of a list of (n, 3) uint8 arrays, colormaps with the same number of samples are scored at once
+    scores = [None] * len(samples)
+    matrices = _score_matrices(severity)
+    groups = {}
+    for k, s in enumerate(samples):
+        groups.setdefault(len(s), []).append(k)
+    for members in groups.values():
+        distances = _min_distances(np.stack([samples[k] for k in members]), matrices)
+        for k, d in zip(members, distances.T):
+            scores[k] = dict(zip(('normal',) + CVD_TYPES, d.tolist()))
+    return scores
+
+
+def _cvd_samples(cmap, n_colors=None, kind=None):
+    if n_colors is None:
+        if kind == 'qualitative' and isinstance(cmap, col.ListedColormap) and cmap.N <= MAX_QUALITATIVE_COLORS:
+            return ColorArray.from_cmap(cmap).rgb8
+        n_colors = SCORE_SAMPLES
+    return ColorArray.from_cmap(cmap, n=n_colors).rgb8
+
+
+def cvd_score(colors, severity=1.0, n_colors=None):
+    """Score how distinguishable the colors of a palette or colormap stay with color vision deficiencies
+
+    Parameters
+    ----------
+    colors : str, Colormap, list of str or ColorArray
+        colormap name, Colormap or list of colors
+    severity : float, optional
+        severity of the simulated deficiencies, by default 1.0
+    n_colors : int, optional
+        number of colors sampled from a colormap, by default all the colors of qualitative
+        colormaps with up to MAX_QUALITATIVE_COLORS colors, SCORE_SAMPLES otherwise
+
+    Returns
+    -------
+    dict
+        minimum OKLab distance between any two colors, for 'normal' vision and every deficiency
+    """
+    if isinstance(colors, basestring):
+        target = _get_name_index().get(colors) or _get_name_index().get(colors.lower())
+        kind = target[0].kind(target[1]) if target is not None else None
+        samples = _cvd_samples(_resolve_cmap(colors), n_colors, kind)
+    elif isinstance(colors, col.Colormap):
+        kind = 'qualitative' if isinstance(colors, col.ListedColormap) and colors.N <= 20 else None
+        samples = _cvd_samples(colors, n_colors, kind)
+    else:
+        samples = ColorArray(colors).rgb8
+    return _score_samples([samples], severity)[0]
+
+
+def cvd_scores(source=None, severity=1.0, n_colors=None):
+    """Score every colormap of the registries, see cvd_score
+
+    Colormaps of all the registries are scored at once, scores are computed once per session.
+    Reversed colormaps have the same scores and are not listed.
+
+    Parameters
+    ----------
+    source : str or list of str, optional
+        registries to score: 'branca', 'csiro' or 'matplotlib', by default all of them
+    severity : float, optional
+        severity of the simulated deficiencies, by default 1.0
+    n_colors : int, optional
+        number of colors sampled from every colormap, see cvd_score
+
+    Returns
+    -------
+    dict
+        scores by colormap name, prefixed with the registry (for example 'csiro:csiro_all')
+        so that they can be passed to get_cmap
+    """
+    registries = _select_registries(source)
+    missing = [r for r in registries if (r.name, severity, n_colors) not in _scores]
+    if missing:
+        names, samples = [], []
+        for catalog in missing:
+            for name in sorted(catalog.keys()):
+                if not name.endswith('_r'):
+                    names.append((catalog, name))
+                    samples.append(_cvd_samples(catalog[name], n_colors, catalog.kind(name)))
+        scores = _score_samples(samples, severity)
+        for catalog in missing:
+            _scores.setdefault((catalog.name, severity, n_colors), {})
+        for (catalog, name), score in zip(names, scores):
+            _scores[catalog.name, severity, n_colors][name] = score
+
+    out = {}
+    for catalog in registries:
+        prefix = catalog.name.lower()
+        for name, score in _scores[catalog.name, severity, n_colors].items():
+            out['{0}:{1}'.format(prefix, name)] = score
+    return out
+
+
+def search_cvd_safe_colormaps(min_distance=0.05, deficiency=None, severity=1.0, query=None, kind=None,
+                              source=None, n_colors=None, page=0, page_size=None):
+    """Find the colormaps whose colors stay distinguishable with color vision deficiencies
+
+    Parameters
+    ----------
+    min_distance : float, optional
+        minimum OKLab distance between any two sampled colors, by default 0.05
+    deficiency : str or list of str, optional
+        deficiencies to check, by default all of CVD_TYPES
+    severity : float, optional
+        severity of the simulated deficiencies, by default 1.0
+    query, kind, source, page, page_size : optional
+        see search_colormaps
+    n_colors : int, optional
+        number of colors sampled from every colormap, see cvd_score
+
+    Returns
+    -------
+    CatalogView
+        matching colormaps, the most distinguishable first
+    """
+    if deficiency is None:
+        deficiency = CVD_TYPES
+    elif isinstance(deficiency, basestring):
+        deficiency = [deficiency]
+    for d in deficiency:
+        cvd_matrix(d)
+    view = search_colormaps(query=query, kind=kind, source=source, page=page, page_size=page_size)
+    scores = cvd_scores(source=[c.name for c in view.catalogs], severity=severity, n_colors=n_colors)
+    worst = {}
+    for catalog, name in view.entries:
+        score = scores['{0}:{1}'.format(catalog.name.lower(), name)]
+        worst[catalog.name, name] = min(score[d] for d in deficiency)
+    view.entries = sorted((e for e in view.entries if worst[e[0].name, e[1]] >= min_distance),
+                          key=lambda e: -worst[e[0].name, e[1]])
+    return view
@@ -0,0 +1,590 @@
+import json
+import os
+import re
+from functools import partial
+
+import numpy as np
+import matplotlib.colors as col
+
+from .converters import basestring, rgb_to_hex_array
+from .colorarray import ColorArray
+from .views import cmap_view
+from .raster import get_cmap_lut
+from .cmaps import ColormapCatalog, CatalogView, branca_registry, csiro_registry, matplotlib_registry, _resolve_cmap
+from ._tiff import encode_palette_tiff, decode_palette_tiff
+
+# file extension of every export format
+EXPORT_FORMATS = dict(
+    qml='.qml',           # QGIS singleband pseudocolor style
+    gdal='.txt',          # gdaldem color-relief color table
+    vrt='.vrt',           # GDAL VRTRasterBand with a color table
+    paraview='.json',     # ParaView / VTK color map preset
+    cpt='.cpt',           # GMT color palette table
+    css='.css',           # CSS custom properties
+    tiff='.tif',          # paletted TIFF
+)
+
+# ListedColormap with up to this many colors are exported as classes rather than gradients
+MAX_DISCRETE_COLORS = 64
+
+# formats read first when several files hold the same colormap, the most complete first
+_READ_PREFERENCE = ('qml', 'paraview', 'cpt', 'gdal', 'css', 'vrt', 'tiff')
+_EXTENSIONS = dict([(ext, fmt) for fmt, ext in EXPORT_FORMATS.items()] + [('.tiff', 'tiff')])
+
+
+def _number(value):
+    return '{0:.8g}'.format(value)
+
+
+def _safe_name(name, sep='_'):
+    # file or CSS identifier friendly name
+    return re.sub(r'[^\w.-]+', sep, name).strip(sep + '.') or 'colormap'
+
+
+class _SampledColormap():
+    # colors of a colormap, sampled once from its LUT and shared by all the writers
+
+    def __init__(self, cmap, n=None, vmin=0.0, vmax=1.0, name=None, discrete=None):
+        if not vmax > vmin:
+            raise ValueError("vmax must be greater than vmin, got vmin={0} and vmax={1}".format(vmin, vmax))
+        cmap = _resolve_cmap(cmap)
+        if n is not None and n != cmap.N:
+            cmap = cmap_view(cmap, N=n)
+        rgba = ColorArray.from_packed(get_cmap_lut(cmap)).rgba8
+        self.name = name or cmap.name
+        self.rgba8 = rgba[:-3]
+        self.under, self.over, self.bad = rgba[-3:].tolist()
+        self.vmin, self.vmax = float(vmin), float(vmax)
+        if discrete is None:
+            discrete = isinstance(cmap, col.ListedColormap) and cmap.N <= MAX_DISCRETE_COLORS
+        self.discrete = bool(discrete) or len(self.rgba8) == 1
+        self.opaque = bool((self.rgba8[:, 3] == 255).all())
+        self.values, self.index = self._stops()
+        self._hex = None
+        self._labels = None
+
+    @property
+    def hex(self):
+        # HEX codes of the colors, with the alpha only if some colors are transparent
+        if self._hex is None:
+            hex_codes = rgb_to_hex_array(self.rgba8[:, :3]).tolist()
+            if not self.opaque:
+                hex_codes = ['{0}{1:02x}'.format(h, a) for h, a in zip(hex_codes, self.rgba8[:, 3].tolist())]
+            self._hex = hex_codes
+        return self._hex
+
+    @property
+    def labels(self):
+        # values of the stops as text, formatted once for all the writers
+        if self._labels is None:
+            self._labels = [_number(v) for v in self.values.tolist()]
+        return self._labels
+
+    def _stops(self):
+        # (values, indices of the colors) of the gradient, classes are hard stops at both edges
+        n = len(self.rgba8)
+        if self.discrete:
+            edges = np.linspace(self.vmin, self.vmax, n + 1)
+            return np.repeat(edges, 2)[1:-1], np.repeat(np.arange(n), 2)
+        return np.linspace(self.vmin, self.vmax, n), np.arange(n)
+
+
+def _format_qml(s):
+    # xml is only imported when needed, it slows down importing the package
+    from xml.sax.saxutils import quoteattr
+    rgba = s.rgba8.tolist()
+    hex_codes = rgb_to_hex_array(s.rgba8[:, :3]).tolist()
+    if s.discrete:
+        # QGIS classes hold the values lower than or equal to their value
+        values = s.labels[1:-1:2] + ['inf']
+    else:
+        values = s.labels
+    lines = [
+        "<!DOCTYPE qgis PUBLIC 'http://mrcc.com/qgis.dtd' 'SYSTEM'>",
+        '<qgis version="3.28.0" styleCategories="Symbology">',
+        '  <pipe>',
+        '    <rasterrenderer type="singlebandpseudocolor" band="1" opacity="1" alphaBand="-1" '
+        'classificationMin="{0}" classificationMax="{1}">'.format(_number(s.vmin), _number(s.vmax)),
+        '      <rastershader>',
+        '        <colorrampshader colorRampType="{0}" classificationMode="1" clip="0" '
+        'minimumValue="{1}" maximumValue="{2}" name={3}>'.format(
+            'DISCRETE' if s.discrete else 'INTERPOLATED', _number(s.vmin), _number(s.vmax), quoteattr(s.name)),
+    ]
+    lines += ['          <item value="{0}" label="{0}" color="{1}" alpha="{2}"/>'.format(v, h, c[3])
+              for v, h, c in zip(values, hex_codes, rgba)]
+    lines += ['        </colorrampshader>', '      </rastershader>', '    </rasterrenderer>', '  </pipe>', '</qgis>', '']
+    return '\n'.join(lines)
+
+
+def _format_gdal(s):
+    rgba = s.rgba8.tolist()
+    lines = ['{0} {1} {2} {3} {4}'.format(v, *rgba[i]) for v, i in zip(s.labels, s.index.tolist())]
+    lines.append('nv {0} {1} {2} {3}'.format(*s.bad))
+    return '\n'.join(lines) + '\n'
+
+
+def _format_vrt(s):
+    from xml.sax.saxutils import escape
+    lines = ['<VRTRasterBand dataType="{0}" band="1">'.format('Byte' if len(s.rgba8) <= 256 else 'UInt16'),
+             '  <Description>{0}</Description>'.format(escape(s.name)),
+             '  <ColorInterp>Palette</ColorInterp>',
+             '  <ColorTable>']
+    lines += ['    <Entry c1="{0}" c2="{1}" c3="{2}" c4="{3}"/>'.format(*c) for c in s.rgba8.tolist()]
+    lines += ['  </ColorTable>', '</VRTRasterBand>', '']
+    return '\n'.join(lines)
+
+
+def _unit_rgb(rgb):
+    return np.round(np.asarray(rgb, dtype=float) / 255, 6).tolist()
+
+
+def _format_paraview(s):
+    values, index = s.values, s.index
+    points = np.column_stack([values, np.asarray(_unit_rgb(s.rgba8[index, :3]))])
+    preset = dict(Name=s.name, ColorSpace='RGB', NanColor=_unit_rgb(s.bad[:3]),
+                  BelowRangeColor=_unit_rgb(s.under[:3]), UseBelowRangeColor=True,
+                  AboveRangeColor=_unit_rgb(s.over[:3]), UseAboveRangeColor=True,
+                  NanOpacity=round(s.bad[3] / 255, 6), RGBPoints=np.round(points, 8).reshape(-1).tolist())
+    if not s.opaque:
+        # opacity transfer function: x, opacity, midpoint, sharpness
+        alpha = np.round(s.rgba8[index, 3] / 255, 6)
+        preset['Points'] = np.column_stack([values, alpha, np.full(len(values), 0.5), np.zeros(len(values))]
+                                           ).reshape(-1).tolist()
+    return json.dumps([preset]) + '\n'
+
+
+def _format_cpt(s):
+    labels, index = s.labels, s.index.tolist()
+    colors = ['{0}/{1}/{2}'.format(*c) for c in s.rgba8[:, :3].tolist()]
+    if s.discrete:
+        lo, hi = slice(0, None, 2), slice(1, None, 2)
+    else:
+        lo, hi = slice(0, -1), slice(1, None)
+    lines = ['# {0}'.format(s.name), '# COLOR_MODEL = RGB']
+    lines += ['{0} {1} {2} {3}'.format(v0, colors[i0], v1, colors[i1])
+              for v0, i0, v1, i1 in zip(labels[lo], index[lo], labels[hi], index[hi])]
+    for key, color in (('B', s.under), ('F', s.over), ('N', s.bad)):
+        # CPT colors are opaque, a transparent bad color is left to the reader
+        if color[3]:
+            lines.append('{0} {1}/{2}/{3}'.format(key, *color[:3]))
+    return '\n'.join(lines) + '\n'
+
+
+def _format_css(s):
+    name = _safe_name(s.name, '-')
+    values, index = s.values, s.index
+    percent = (values - s.vmin) / (s.vmax - s.vmin) * 100
+    hex_codes = s.hex
+    if s.discrete:
+        stops = ['{0} {1}% {2}%'.format(hex_codes[i], _number(p0), _number(p1))
+                 for i, p0, p1 in zip(index[::2].tolist(), percent[::2], percent[1::2])]
+    else:
+        stops = ['{0} {1}%'.format(hex_codes[i], _number(p)) for i, p in zip(index.tolist(), percent)]
+    lines = [':root {']
+    lines += ['  --{0}-{1}: {2};'.format(name, i, h) for i, h in enumerate(hex_codes)]
+    lines.append('  --{0}: linear-gradient(to right, {1});'.format(name, ', '.join(stops)))
+    lines += ['}', '']
+    return '\n'.join(lines)
+
+
+def _format_tiff(s):
+    rgb = s.rgba8[:, :3]
+    if len(rgb) > 256:
+        # TIFF palettes hold up to 256 colors
+        rgb = rgb[np.rint(np.linspace(0, len(rgb) - 1, 256)).astype(int)]
+    return encode_palette_tiff(rgb, s.name)
+
+
+_WRITERS = dict(qml=_format_qml, gdal=_format_gdal, vrt=_format_vrt, paraview=_format_paraview,
+                cpt=_format_cpt, css=_format_css, tiff=_format_tiff)
+
+
+def _check_formats(formats):
+    if formats is None:
+        return list(EXPORT_FORMATS)
+    if isinstance(formats, basestring):
+        formats = [formats]
+    formats = [f.lower() for f in formats]
+    unknown = [f for f in formats if f not in EXPORT_FORMATS]
+    if unknown:
+        raise ValueError("Unknown format(s) {0}, available formats are {1}".format(
+            ', '.join(unknown), ', '.join(EXPORT_FORMATS)))
+    return formats
+
+
+def format_colormap(cmap, fmt, n=None, vmin=0.0, vmax=1.0, name=None, discrete=None):
+    """Convert a colormap to the content of a GIS or visualization color file
+
+    Parameters
+    ----------
+    cmap : str or Colormap
+        colormap name (see get_cmap) or Colormap object
+    fmt : str
+        one of EXPORT_FORMATS: 'qml' (QGIS style), 'gdal' (gdaldem color-relief table),
+        'vrt' (GDAL VRTRasterBand color table), 'paraview' (ParaView JSON preset), 'cpt' (GMT),
+        'css' (CSS custom properties and gradient) or 'tiff' (paletted TIFF)
+    n : int, optional
+        number of colors, by default the number of colors of the colormap
+    vmin, vmax : float, optional
+        data values of the first and last colors, by default 0 and 1
+    name : str, optional
+        name written in the file, by default the name of the colormap
+    discrete : bool, optional
+        whether to write classes instead of a gradient, by default only for ListedColormap
+        with up to MAX_DISCRETE_COLORS colors
+
+    Returns
+    -------
+    str or bytes
+        file content, bytes for 'tiff'. The 'cpt' and 'tiff' colors are opaque
+    """
+    fmt, = _check_formats(fmt)
+    return _WRITERS[fmt](_SampledColormap(cmap, n=n, vmin=vmin, vmax=vmax, name=name, discrete=discrete))
+
+
+def _export_sources(source, include_reversed):
+    # list of (subfolder, name, colormap getter)
+    if source is None:
+        source = [branca_registry, csiro_registry, matplotlib_registry]
+    if isinstance(source, (basestring, col.Colormap, ColormapCatalog, CatalogView, dict)):
+        source = [source]
+    catalogs = [s for s in source if isinstance(s, (ColormapCatalog, CatalogView))]
+    subfolders = len(catalogs) > 1 or (len(catalogs) == 1 and isinstance(catalogs[0], CatalogView)
+                                       and len(catalogs[0].catalogs) > 1)
+    entries = []
+    for item in source:
+        if isinstance(item, ColormapCatalog):
+            item = CatalogView([item], include_reversed=include_reversed)
+        if isinstance(item, CatalogView):
+            for catalog, key in item.entries:
+                entries.append((catalog.name.lower() if subfolders else None, key, partial(catalog.__getitem__, key)))
+        elif isinstance(item, dict):
+            entries += [(None, key, partial(item.__getitem__, key)) for key in sorted(item)]
+        else:
+            cmap = _resolve_cmap(item)
+            entries.append((None, cmap.name, partial(_resolve_cmap, cmap)))
+    return entries
+
+
+def export_colormaps(source, folder, formats=None, n=None, vmin=0.0, vmax=1.0, discrete=None,
+                     include_reversed=False):
+    """Write colormaps to GIS and visualization color files, in one batch
+
+    Every colormap is sampled once and the same colors are written in all the formats.
+
+    Parameters
+    ----------
+    source : str, Colormap, dict, ColormapCatalog, CatalogView or list of them
+        colormaps to export: names (see get_cmap), Colormap objects, a mapping of names to
+        colormaps, a registry such as csiro_registry or a search result. Passing None exports
+        all the colormaps of branca_registry, csiro_registry and matplotlib_registry
+    folder : str
+        output folder, created if needed. When several registries are exported, their
+        colormaps are written in subfolders named after them ('branca', 'csiro', 'matplotlib')
+    formats : str or list of str, optional
+        formats to write, by default all of EXPORT_FORMATS, see format_colormap
+    n, vmin, vmax, discrete : optional
+        see format_colormap
+    include_reversed : bool, optional
+        whether to export the '_r' colormaps of the registries, by default False
+
+    Returns
+    -------
+    list of str
+        paths of the written files
+    """
+    formats = _check_formats(formats)
+    paths = []
+    for subfolder, name, get in _export_sources(source, include_reversed):
+        sampled = _SampledColormap(get(), n=n, vmin=vmin, vmax=vmax, name=name, discrete=discrete)
+        target = folder if subfolder is None else os.path.join(folder, subfolder)
+        os.makedirs(target, exist_ok=True)
+        for fmt in formats:
+            content = _WRITERS[fmt](sampled)
+            path = os.path.join(target, _safe_name(name) + EXPORT_FORMATS[fmt])
+            if isinstance(content, bytes):
+                with open(path, 'wb') as f:
+                    f.write(content)
+            else:
+                with open(path, 'w', encoding='utf-8', newline='\n') as f:
+                    f.write(content)
+            paths.append(path)
+    return paths
+
+
+def _stops_to_cmap(name, values, rgba, discrete=None, under=None, over=None, bad=None):
+    # colormap from gradient stops, classes are written as hard stops at both edges
+    values = np.asarray(values, dtype=float)
+    rgba = np.asarray(rgba, dtype=np.uint8).reshape(-1, 4)
+    if discrete is None:
+        discrete = (len(rgba) >= 2 and len(rgba) % 2 == 0 and (rgba[::2] == rgba[1::2]).all()
+                    and (values[1:-1:2] == values[2::2]).all())
+        if discrete:
+            rgba = rgba[::2]
+    if discrete:
+        cmap = ColorArray.from_rgba8(rgba).to_cmap(name=name)
+    else:
+        # drop the stops repeated at the boundaries of segments
+        keep = np.ones(len(values), dtype=bool)
+        keep[1:] = (values[1:] != values[:-1]) | (rgba[1:] != rgba[:-1]).any(axis=1)
+        values, rgba = values[keep], rgba[keep]
+        if len(values) == 1:
+            return ColorArray.from_rgba8(rgba).to_cmap(name=name)
+        positions = (values - values[0]) / (values[-1] - values[0])
+        if len(values) > MAX_DISCRETE_COLORS and np.allclose(positions, np.linspace(0, 1, len(values)), atol=1e-6):
+            # evenly sampled gradients, such as matplotlib's own ListedColormap, are kept as they are
+            cmap = ColorArray.from_rgba8(rgba).to_cmap(name=name)
+        else:
+            cmap = col.LinearSegmentedColormap.from_list(
+                name, list(zip(positions.tolist(), (rgba / 255.).tolist())), N=max(256, len(values)))
+    for setter, color in ((cmap.set_under, under), (cmap.set_over, over), (cmap.set_bad, bad)):
+        if color is not None:
+            setter(np.asarray(color, dtype=float) / 255)
+    return cmap
+
+
+def _read_qml(data, path):
+    import xml.etree.ElementTree as ET
+    shader = ET.fromstring(data).find('.//colorrampshader')
+    if shader is None:
+        raise ValueError("{0} has no raster color ramp".format(path))
+    items = shader.findall('item')
+    rgba = ColorArray([item.get('color') for item in items]).rgba8.copy()
+    rgba[:, 3] = [int(item.get('alpha', 255)) for item in items]
+    values = [float(item.get('value')) for item in items]
+    discrete = shader.get('colorRampType', 'INTERPOLATED') != 'INTERPOLATED'
+    return [(shader.get('name'), values, rgba, dict(discrete=discrete))]
+
+
+def _color_tokens(tokens):
+    # RGB(A) uint8 values from '#rrggbb' or numeric tokens
+    if tokens[0].startswith('#'):
+        return ColorArray([tokens[0]]).rgba8[0].tolist(), tokens[1:]
+    return [int(round(float(t))) for t in tokens[:3]] + [255], tokens[3:]
+
+
+def _read_gdal(data, path):
+    values, rgba, extra = [], [], {}
+    percents = set()
+    for line in data.splitlines():
+        tokens = re.split(r'[\s,:]+', line.strip())
+        if not tokens[0] or tokens[0].startswith('#'):
+            continue
+        color = [int(round(float(t))) for t in tokens[1:5]] + [255] * (5 - len(tokens))
+        if tokens[0].lower() == 'nv':
+            extra['bad'] = color
+            continue
+        # percentages of the data range become fractions, the stops are rescaled to the colormap anyway
+        percent = tokens[0].endswith('%')
+        percents.add(percent)
+        values.append(float(tokens[0].rstrip('%')) / (100 if percent else 1))
+        rgba.append(color)
+    if len(percents) > 1:
+        raise ValueError("{0} mixes percentages and absolute values, which cannot be read".format(path))
+    return [(None, values, rgba, extra)]
+
+
+def _read_vrt(data, path):
+    import xml.etree.ElementTree as ET
+    root = ET.fromstring(data)
+    table = root.find('.//ColorTable')
+    if table is None:
+        raise ValueError("{0} has no color table".format(path))
+    rgba = [[int(e.get(c, 255)) for c in ('c1', 'c2', 'c3', 'c4')] for e in table.findall('Entry')]
+    description = root.find('.//Description')
+    name = description.text if description is not None else None
+    return [(name, np.arange(len(rgba)), rgba, dict(discrete=True))]
+
+
+def _read_paraview(data, path):
+    presets = json.loads(data)
+    if isinstance(presets, dict):
+        presets = [presets]
+    out = []
+    for preset in presets:
+        if 'RGBPoints' not in preset:
+            continue
+        points = np.asarray(preset['RGBPoints'], dtype=float).reshape(-1, 4)
+        rgba = np.full((len(points), 4), 255, dtype=np.uint8)
+        rgba[:, :3] = np.rint(points[:, 1:] * 255)
+        if preset.get('Points'):
+            opacity = np.asarray(preset['Points'], dtype=float).reshape(-1, 4)
+            rgba[:, 3] = np.rint(np.interp(points[:, 0], opacity[:, 0], opacity[:, 1]) * 255)
+        extra = {}
+        for key, color in (('bad', 'NanColor'), ('under', 'BelowRangeColor'), ('over', 'AboveRangeColor')):
+            use = {'under': 'UseBelowRangeColor', 'over': 'UseAboveRangeColor'}.get(key)
+            if color in preset and (use is None or preset.get(use)):
+                extra[key] = np.rint(np.asarray(preset[color][:3]) * 255).astype(int).tolist() + [255]
+        if 'bad' in extra:
+            extra['bad'][3] = int(round(preset.get('NanOpacity', 1) * 255))
+        out.append((preset.get('Name'), points[:, 0], rgba, extra))
+    return out
+
+
+def _read_cpt(data, path):
+    values, rgba, extra = [], [], {}
+    for line in data.splitlines():
+        line = line.split(';')[0].strip()
+        if not line or line.startswith('#'):
+            continue
+        tokens = line.replace('/', ' ').split()
+        key = {'B': 'under', 'F': 'over', 'N': 'bad'}.get(tokens[0])
+        if key is not None:
+            extra[key] = _color_tokens(tokens[1:])[0]
+            continue
+        z0 = float(tokens[0])
+        c0, tokens = _color_tokens(tokens[1:])
+        z1 = float(tokens[0])
+        c1, _ = _color_tokens(tokens[1:])
+        values += [z0, z1]
+        rgba += [c0, c1]
+    return [(None, values, rgba, extra)]
+
+
+_CSS_GRADIENT = re.compile(r'--([\w-]+)\s*:\s*linear-gradient\(([^;]*)\)\s*;')
+_CSS_STOP = re.compile(r'(#[0-9a-fA-F]{6}(?:[0-9a-fA-F]{2})?)\s+(-?[\d.]+)%(?:\s+(-?[\d.]+)%)?')
+
+
+def _read_css(data, path):
+    out = []
+    for name, gradient in _CSS_GRADIENT.findall(data):
+        values, hex_codes = [], []
+        for hex_code, p0, p1 in _CSS_STOP.findall(gradient):
+            for p in (p0, p1) if p1 else (p0,):
+                values.append(float(p))
+                hex_codes.append(hex_code)
+        rgba = ColorArray([h[:7] for h in hex_codes]).rgba8.copy()
+        rgba[:, 3] = [int(h[7:], 16) if len(h) == 9 else 255 for h in hex_codes]
+        out.append((name, values, rgba, {}))
+    return out
+
+
+def _read_tiff(data, path):
+    rgb, description = decode_palette_tiff(data)
+    rgba = np.full((len(rgb), 4), 255, dtype=np.uint8)
+    rgba[:, :3] = rgb
+    return [(description or None, np.arange(len(rgba)), rgba, dict(discrete=True))]
+
+
+_READERS = dict(qml=_read_qml, gdal=_read_gdal, vrt=_read_vrt, paraview=_read_paraview,
+                cpt=_read_cpt, css=_read_css, tiff=_read_tiff)
+
+
+def _file_format(path, fmt=None):
+    if fmt is not None:
+        return _check_formats(fmt)[0]
+    try:
+        return _EXTENSIONS[os.path.splitext(path)[1].lower()]
+    except KeyError:
+        raise ValueError("Could not guess the format of {0}, please pass fmt".format(path))
+
+
+def _read_entries(path, fmt):
+    if fmt == 'tiff':
+        with open(path, 'rb') as f:
+            data = f.read()
+    else:
+        with open(path, encoding='utf-8') as f:
+            data = f.read()
+    entries = _READERS[fmt](data, path)
+    if not entries:
+        raise ValueError("{0} has no colormap".format(path))
+    return entries
+
+
+def read_colormap(path, fmt=None, name=None):
+    """Read a colormap written by export_colormaps, or by QGIS, GDAL, ParaView or GMT
+
+    Classes, palettes and evenly sampled gradients with more than MAX_DISCRETE_COLORS colors (as written
+    by export_colormaps) are returned as ListedColormap, other gradients as LinearSegmentedColormap.
+    The under, over and bad colors are restored when the format stores them.
+
+    Parameters
+    ----------
+    path : str
+        file to read
+    fmt : str, optional
+        format of the file, by default guessed from its extension, see EXPORT_FORMATS
+    name : str, optional
+        colormap to read from files holding several of them (ParaView presets or CSS), by default the first one
+
+    Returns
+    -------
+    Colormap
+        colormap, named after the file or the name it stores
+    """
+    fmt = _file_format(path, fmt)
+    entries = _read_entries(path, fmt)
+    if name is None:
+        entry = entries[0]
+    else:
+        matches = [e for e in entries if e[0] == name]
+        if not matches:
+            raise KeyError("{0} has no colormap named '{1}'".format(path, name))
+        entry = matches[0]
+    cmap_name, values, rgba, extra = entry
+    if cmap_name is None:
+        cmap_name = os.path.splitext(os.path.basename(path))[0]
+    return _stops_to_cmap(cmap_name, values, rgba, **extra)
+
+
+def _import_files(source, formats):
+    # (key, path, format) of the color files of a folder, file or list of them
+    if isinstance(source, basestring) and os.path.isdir(source):
+        files = []
+        for folder, _, filenames in sorted(os.walk(source)):
+            for filename in sorted(filenames):
+                path = os.path.join(folder, filename)
+                key = os.path.splitext(os.path.relpath(path, source))[0].replace(os.sep, '/')
+                files.append((key, path))
+    else:
+        if isinstance(source, basestring):
+            source = [source]
+        files = [(os.path.splitext(os.path.basename(p))[0], p) for p in source]
+    out = []
+    for key, path in files:
+        fmt = _EXTENSIONS.get(os.path.splitext(path)[1].lower())
+        if fmt is not None and (formats is None or fmt in formats):
+            out.append((key, path, fmt))
+    return out
+
+
+def load_colormaps(source, name='Imported', formats=None):
+    """Load color files into a ColormapCatalog
+
+    Files are only listed when the catalog is first accessed, and every colormap
+    is only read when it is first used.
+
+    Parameters
+    ----------
+    source : str or list of str
+        folder (searched recursively) or color files, see read_colormap
+    name : str, optional
+        name of the catalog, by default 'Imported'
+    formats : str or list of str, optional
+        formats to read, by default all of EXPORT_FORMATS. When a colormap was exported in
+        several formats, the most complete file is read (QML, then ParaView, CPT, GDAL, CSS, VRT and TIFF)
+
+    Returns
+    -------
+    ColormapCatalog
+        catalog of the colormaps, named after the files (relative paths without extension
+        for subfolders) or after the presets of ParaView files holding several of them
+    """
+    formats = None if formats is None else _check_formats(formats)
+
+    def loader():
+        entries = {}
+        files = _import_files(source, formats)
+        files.sort(key=lambda f: _READ_PREFERENCE.index(f[2]))
+        for key, path, fmt in files:
+            if fmt == 'paraview':
+                presets = [e[0] for e in _read_entries(path, fmt)]
+                if len(presets) > 1:
+                    for preset in presets:
+                        entries.setdefault(preset, partial(read_colormap, path, fmt, preset))
+                    continue
+            entries.setdefault(key, partial(read_colormap, path, fmt))
+        return entries
+
+    return ColormapCatalog(name, loader)
@@ -1,9 +1,14 @@
+import re
+
 import matplotlib.colors as col
 import numpy as np
 from itertools import cycle, islice
 
 from .converters import *
 from .cmaps import get_cmap
+from .colorarray import ColorArray, PACKED_DTYPE
+from ._cache import memoize
+from .colorspaces import convert_colorspace
 
 # for python 2 and python 3 compatibility
 try:
@@ -15,15 +20,20 @@ except NameError:
 number = (int, float, np.integer, np.floating)
 
 
+@memoize(maxsize=256)
 def generate_discrete_cmap(color_list, name='CSIRO', n_colors=20):
     """Function to generate discrete colormaps
+
+    Calls with a colormap name or a list of colors are cached, calls with Colormap
+    or ColorArray objects are not.
     
     Arguments:
     -----------
-    color_list : list of str, str or Colormap
+    color_list : list of str, str, ColorArray or Colormap
         list of colors
         if passing a str, this will be interpreted as a colormap to retrieve
-        if passing a Colormap, this will be discretized
+        if passing a Colormap, this will be discretized: its colors are sampled when
+        the function is called, later changes to the Colormap do not affect the result
 
     Returns:
     -----------
@@ -36,10 +46,11 @@ def generate_discrete_cmap(color_list, name='CSIRO', n_colors=20):
         return color_list
 
     if isinstance(color_list, col.Colormap):
-        sampling = np.linspace(0, 1, n_colors)
-        return col.ListedColormap(color_list(sampling), name=color_list.name)
-    color_list = [hex_to_rgb(c) for c in color_list]
-    return col.ListedColormap(color_list, name=name)
+        # sampled now, so that later changes to color_list do not change the result
+        out = col.ListedColormap(color_list(np.linspace(0, 1, n_colors)), name=color_list.name)
+        out.set_extremes(bad=color_list.get_bad(), under=color_list.get_under(), over=color_list.get_over())
+        return out
+    return ColorArray(color_list).to_cmap(name=name)
 
 
 def generate_palette(color_list, n_colors):
@@ -47,68 +58,241 @@ def generate_palette(color_list, n_colors):
     
     Arguments:
     -----------
-    color_list : list of str
+    color_list : list of str or ColorArray
         list of colors
     n_colors : int 
         number of colors required
 
     Returns:
     -----------
-    out : np.array
+    out : np.array or ColorArray
         array of colors having length equal to n_colors
+        a ColorArray is returned if color_list is a ColorArray
     """
+    if isinstance(color_list, ColorArray):
+        return ColorArray.from_packed(np.resize(color_list.packed, n_colors))
     return np.array(list(islice(cycle(color_list), n_colors)))
 
 
-def generate_linear_cmap(color_list, name='CSIRO'):
+def _distinct_candidates(resolution):
+    # sRGB grid used by generate_distinct_palette, with its OKLab coordinates
+    try:
+        return _DISTINCT_CANDIDATES[resolution]
+    except KeyError:
+        pass
+    levels = np.rint(np.linspace(0, 255, resolution)).astype(np.uint8)
+    rgb8 = np.stack(np.meshgrid(levels, levels, levels, indexing='ij'), axis=-1).reshape(-1, 3)
+    lab = convert_colorspace(rgb8, 'srgb', 'oklab').astype(np.float32)
+    return _DISTINCT_CANDIDATES.setdefault(resolution, (rgb8, lab))
+
+
+_DISTINCT_CANDIDATES = {}
+
+
+_BARE_HEX = re.compile(r'[0-9a-fA-F]{6}(?:[0-9a-fA-F]{2})?$')
+
+
+def _as_colors(colors):
+    # HEX code (with or without '#'), CSS4 color name, colormap name, list of colors or ColorArray to a ColorArray
+    if colors is None:
+        return None
+    if isinstance(colors, basestring):
+        if colors.startswith('#'):
+            return ColorArray([colors])
+        if colors.lower() in NAMED_COLORS:
+            return ColorArray([NAMED_COLORS[colors.lower()]])
+        if _BARE_HEX.match(colors):
+            return ColorArray(['#' + colors])
+        return ColorArray.from_cmap(get_cmap(colors))
+    return ColorArray(colors)
+
+
+def generate_distinct_palette(n_colors, seed_colors=None, palette=None, background='#ffffff',
+                              min_background_distance=0.15, lightness=(0.25, 0.95), resolution=24):
+    """Generate perceptually distinct colors, for example for many categories
+
+    Colors are picked one by one by farthest-point sampling in OKLab: every new color
+    is the candidate farthest from the colors already picked.
+    Colors given as a str can be a HEX code (with or without '#'), a CSS4 color name
+    or, otherwise, a colormap name whose colors are all used.
+
+    Arguments:
+    -----------
+    n_colors : int
+        number of colors to generate
+    seed_colors : str, list of str or ColorArray, optional (default : None)\n
+        colors to start from (for example 'csiro_primary'), returned first
+    palette : str, list of str or ColorArray, optional (default : None)\n
+        if given, colors are only picked among these colors (for example 'csiro_all')
+        instead of a grid of sRGB colors
+    background : str, list of str or None, optional (default : '#ffffff')\n
+        background color(s), colors closer than min_background_distance are excluded
+    min_background_distance : float, optional (default : 0.15)\n
+        minimum OKLab distance from the background colors
+    lightness : tuple of floats, optional (default : (0.25, 0.95))\n
+        bounds of the OKLab lightness of the generated colors, between 0 and 1
+    resolution : int, optional (default : 24)\n
+        number of levels per channel of the sRGB candidate grid
+
+    Returns:
+    -----------
+    out : ColorArray
+        n_colors distinct colors
+    """
+    if n_colors < 0:
+        raise ValueError("The argument 'n_colors' cannot be negative, got {0}".format(n_colors))
+    if palette is None:
+        rgb8, lab = _distinct_candidates(resolution)
+    else:
+        rgb8 = _as_colors(palette).rgb8
+        lab = convert_colorspace(rgb8, 'srgb', 'oklab').astype(np.float32)
+
+    keep = (lab[:, 0] >= lightness[0]) & (lab[:, 0] <= lightness[1])
+    background = _as_colors(background)
+    if background is not None:
+        background_lab = convert_colorspace(background.rgb8, 'srgb', 'oklab').astype(np.float32)
+        for b in background_lab:
+            keep &= np.sum((lab - b) ** 2, axis=1) >= min_background_distance ** 2
+    rgb8, lab = rgb8[keep], lab[keep]
+
+    seeds = _as_colors(seed_colors)
+    picked = [] if seeds is None else [seeds.packed]
+    n_seeds = 0 if seeds is None else len(seeds)
+    n_new = n_colors - n_seeds
+    if n_new <= 0:
+        if seeds is None:
+            return ColorArray.from_packed(np.empty(0, dtype=PACKED_DTYPE))
+        return ColorArray.from_packed(seeds.packed[:n_colors])
+    if n_new > len(lab):
+        raise ValueError("Only {0} candidate colors match the constraints, cannot pick {1}".format(len(lab), n_new))
+
+    # squared distance of every candidate to the nearest picked color
+    dist = np.full(len(lab), np.inf, dtype=np.float32)
+    for ref in ([seeds] if seeds is not None else []) + ([background] if background is not None else []):
+        for c in convert_colorspace(ref.rgb8, 'srgb', 'oklab').astype(np.float32):
+            np.minimum(dist, np.sum((lab - c) ** 2, axis=1), out=dist)
+    if np.isinf(dist).all():
+        # without references, start from the color farthest from the average
+        dist = np.sum((lab - lab.mean(axis=0)) ** 2, axis=1)
+
+    # one contiguous array per channel, so that every update is a few fast 1D operations
+    channels = np.ascontiguousarray(lab.T)
+    indices = np.empty(n_new, dtype=np.intp)
+    diff = np.empty_like(dist)
+    d2 = np.empty_like(dist)
+    for i in range(n_new):
+        indices[i] = k = np.argmax(dist)
+        d2.fill(0)
+        for channel in channels:
+            np.subtract(channel, channel[k], out=diff)
+            np.multiply(diff, diff, out=diff)
+            d2 += diff
+        np.minimum(dist, d2, out=dist)
+    picked.append(ColorArray.from_rgb(rgb8[indices]).packed)
+    return ColorArray.from_packed(np.concatenate(picked))
+
+
+# spaces where colors can be interpolated channel by channel
+INTERPOLATION_SPACES = ('srgb', 'linear', 'lab', 'oklab')
+
+
+@memoize(maxsize=256)
+def generate_linear_cmap(color_list, name='CSIRO', space='srgb', N=256):
     """Function to generate a linear colormap given 2 or more colors
+
+    Calls with a colormap name or a list of colors are cached, calls with Colormap
+    or ColorArray objects are not.
     
     Arguments:
     -----------
-    color_list : list of str, str or ListedColormap
+    color_list : list of str, str, ColorArray or ListedColormap
         list of HEX colors to use
         if passing a str, this will be interpreted as a colormap name to retrieve
         if passing a ListedColormap, this will be linearized
     name : str, optional (default : CSIRO)\n
         name of the colormap
+    space : str, optional (default : srgb)\n
+        color space used for the interpolation, one of 'srgb', 'linear', 'lab' or 'oklab'
+        interpolating in 'oklab' or 'lab' avoids dull midpoints between saturated colors
+    N : int, optional (default : 256)\n
+        number of colors of the table precomputed when space is not 'srgb'
     
     Returns:
     -----------
-    out : LinearSegmentedColormap
-        linear colormap
+    out : LinearSegmentedColormap or ListedColormap
+        linear colormap, a ListedColormap with N colors when space is not 'srgb'
     """
+    if space not in INTERPOLATION_SPACES:
+        raise ValueError("The argument 'space' must be one of {0}".format(', '.join(INTERPOLATION_SPACES)))
     if isinstance(color_list, basestring):
         color_list = get_cmap(color_list)
     elif isinstance(color_list, col.LinearSegmentedColormap):
         return color_list
 
     if isinstance(color_list, col.ListedColormap):
-        return generate_linear_cmap(cmap_to_hex(color_list), name=color_list.name)
-    xs = np.linspace(0, 1, len(color_list))
+        return generate_linear_cmap(ColorArray.from_cmap(color_list), name=color_list.name, space=space, N=N)
+    rgb = ColorArray(color_list).rgb
+    xs = np.linspace(0, 1, len(rgb))
+    if space != 'srgb':
+        return col.ListedColormap(_interpolate_colors(rgb, xs, space, N), name=name)
     cdict = {}
-    color_list = [hex_to_rgb(h) for h in color_list]
     for channel, idx in zip(['red', 'green', 'blue'], (0, 1, 2)):
-        steps = []
-        for c, x in zip(color_list, xs):
-            steps.append((x, c[idx], c[idx]))
-        cdict[channel] = tuple(steps)
+        cdict[channel] = np.column_stack((xs, rgb[:, idx], rgb[:, idx]))
     return col.LinearSegmentedColormap(name, cdict)
 
 
-def randomize_cmap(cmap, n=None, seed=None):
+def _interpolate_colors(rgb, xs, space, N):
+    # interpolate the (M, 3) sRGB colors placed at xs on N evenly spaced points, in the given space
+    values = convert_colorspace(rgb, 'srgb', space)
+    dense = np.linspace(0, 1, N)
+    interpolated = np.empty((N, 3))
+    for i in range(3):
+        interpolated[:, i] = np.interp(dense, xs, values[:, i])
+    out = np.clip(convert_colorspace(interpolated, space, 'srgb'), 0, 1)
+    # keep the exact input colors where they fall on the table, avoiding round-trip errors
+    idx = np.rint(xs * (N - 1)).astype(int)
+    exact = dense[idx] == xs
+    out[idx[exact]] = rgb[exact]
+    return out
+
+
+def _shuffle_keys(seed, n_cmaps, size):
+    # (n_cmaps, size) random keys, row i only depends on the seed and on i
+    if isinstance(seed, np.random.Generator):
+        return seed.random((n_cmaps, size))
+    if seed is not None and not isinstance(seed, (int, np.integer, np.random.SeedSequence)):
+        raise TypeError('The argument "seed" must be a integer, SeedSequence, Generator or None')
+    if isinstance(seed, np.random.SeedSequence):
+        # spawning changes the SeedSequence, children are spawned from a copy of the caller's one
+        sequence = np.random.SeedSequence(seed.entropy, spawn_key=seed.spawn_key, pool_size=seed.pool_size)
+    else:
+        sequence = np.random.SeedSequence(seed)
+    return np.stack([np.random.default_rng(child).random(size) for child in sequence.spawn(n_cmaps)])
+
+
+def randomize_cmap(cmap, n=None, seed=None, n_cmaps=None):
     """Utility to randomize a Colormap
 
+    The global numpy random state is never used, so calls with the same seed always give
+    the same colormaps, even across threads.
+
     Parameters
     ----------
     cmap : matplotlib.colors.Colormap
         Colormap to randomize
     n : int, optional
         number of colors to sample, by default None
+    seed : int, np.random.SeedSequence or np.random.Generator, optional
+        seed of the random colors, by default None (different on every call)
+    n_cmaps : int, optional
+        number of independent random colormaps to generate at once, by default None
+        colormap i only depends on the seed and on i, the first one is the colormap
+        returned when n_cmaps is None
 
     Returns
     -------
-    matplotlib.colors.ListedColormap
-        discrete colormap with random sampled colors
+    matplotlib.colors.ListedColormap or list of ListedColormap
+        discrete colormap with random sampled colors, or n_cmaps colormaps
 
     """
     if isinstance(cmap, str):
@@ -119,14 +303,10 @@ def randomize_cmap(cmap, n=None, seed=None):
         raise TypeError('The argument "cmap" must be a string or Colormap')
     if n is None:
         n = cmap.N
-    vals = np.arange(0,cmap.N,1)
-    if isinstance(seed, int):
-        np.random.seed(seed)
-    elif seed is None:
-        pass
-    else:
-        raise TypeError('The argument "seed" must be a integer or None')
-    np.random.shuffle(vals)
-    cmap = col.ListedColormap(cmap(vals[:n]))
-    return cmap
-
+    keys = _shuffle_keys(seed, 1 if n_cmaps is None else n_cmaps, cmap.N)
+    # sorting random keys shuffles every row at once, only the first n colors are evaluated
+    vals = np.argsort(keys, axis=1, kind='stable')[:, :n]
+    colors = cmap(vals)
+    if n_cmaps is None:
+        return col.ListedColormap(colors[0])
+    return [col.ListedColormap(c) for c in colors]
@@ -0,0 +1,245 @@
+import numpy as np
+
+from .converters import NAMED_COLORS, basestring, _hex_to_uint8, _as_color_array
+from .colorspaces import convert_colorspace
+from .cmaps import csiro_named_colors
+
+# number of query colors processed at once, small enough to fit in the CPU cache
+CHUNK_SIZE = 2**12
+
+PALETTES = ('all', 'css', 'csiro')
+
+# prebuilt indices by (palette, space, resolution)
+_indices = {}
+
+
+def _palette_colors(palette):
+    if palette == 'css':
+        return dict(NAMED_COLORS)
+    elif palette == 'csiro':
+        return dict(csiro_named_colors)
+    elif palette == 'all':
+        colors = dict(NAMED_COLORS)
+        colors.update(csiro_named_colors)
+        return colors
+    raise ValueError("The argument 'palette' must be one of {0} or a dict of HEX colors".format(', '.join(PALETTES)))
+
+
+def _query_colors(colors):
+    # colors to the (..., 3) sRGB array expected by convert_colorspace, uint8 or in [0,1]
+    color_array = _as_color_array(colors)
+    if color_array is not None:
+        return color_array.rgb8
+    if isinstance(colors, basestring):
+        colors = [colors]
+    colors = np.asarray(colors)
+    if colors.dtype.kind in 'US':
+        return _hex_to_uint8(colors).reshape(colors.shape + (3,))
+    if colors.shape[-1:] == (4,):
+        colors = colors[..., :3]
+    return colors
+
+
+class NamedColorIndex():
+    """Spatial index to find the nearest named color of many colors at once
+
+    The named colors are placed in a perceptual space, divided in a regular grid
+    of resolution^3 cells covering the sRGB gamut. Every cell lists the named colors
+    that can be the nearest to a point of that cell, so that each query only
+    compares a handful of candidates. Queries outside the grid are compared to every color.
+
+    Parameters
+    ----------
+    colors : dict
+        HEX colors by name
+    space : str, optional
+        'oklab' or 'lab', space of the distances, by default 'oklab'
+    resolution : int, optional
+        number of grid cells along each axis, by default 32
+    """
+
+    def __init__(self, colors, space='oklab', resolution=32):
+        if space not in ('oklab', 'lab'):
+            raise ValueError("The argument 'space' must be 'oklab' or 'lab'")
+        if not colors:
+            raise ValueError("The index needs at least one color")
+        self.space = space
+        self.resolution = resolution
+        self.names = np.array(list(colors.keys()))
+        self.hex = np.array([colors[n] for n in self.names.tolist()])
+        self.points = convert_colorspace(_hex_to_uint8(self.hex), 'srgb', space)
+        self._build_grid()
+
+    def _build_grid(self):
+        # the grid covers the sRGB gamut, sampled on its surface, and every named color
+        cube = np.stack(np.meshgrid(*[np.linspace(0, 1, 33)] * 3, indexing='ij'), axis=-1).reshape(-1, 3)
+        gamut = convert_colorspace(cube, 'srgb', self.space)
+        lo = np.minimum(gamut.min(axis=0), self.points.min(axis=0))
+        hi = np.maximum(gamut.max(axis=0), self.points.max(axis=0))
+        margin = (hi - lo) * 1e-3
+        self._lo, self._hi = lo - margin, hi + margin
+        self._cell = (self._hi - self._lo) / self.resolution
+
+        # per axis squared distances between every cell slab and every color
+        r = self.resolution
+        edges = self._lo[:, None] + self._cell[:, None] * np.arange(r + 1)
+        near, far = [], []
+        for axis in range(3):
+            p = self.points[:, axis]
+            low, high = edges[axis, :-1, None], edges[axis, 1:, None]
+            near.append(np.maximum(np.maximum(low - p, p - high), 0) ** 2)
+            far.append(np.maximum(np.abs(p - low), np.abs(p - high)) ** 2)
+
+        # a color is a candidate of a cell if it can be closer than the farthest point
+        # of the cell to the best color of that cell
+        candidates = []
+        for i in range(r):
+            dmin = near[0][i] + near[1][:, None, :] + near[2][None, :, :]
+            dmax = far[0][i] + far[1][:, None, :] + far[2][None, :, :]
+            bound = dmax.min(axis=-1, keepdims=True)
+            candidates.append((dmin <= bound).reshape(r * r, -1))
+        candidates = np.concatenate(candidates)
+
+        # pad each list with its first candidate, which does not change the nearest color
+        counts = candidates.sum(axis=1)
+        order = np.argsort(~candidates, axis=1, kind='stable')[:, :counts.max()]
+        pad = np.arange(order.shape[1]) >= counts[:, None]
+        order[pad] = np.broadcast_to(order[:, :1], order.shape)[pad]
+        self._candidates = order.astype(np.intp)
+        # float32 coordinates of the candidates, laid out as (cell, axis, candidate) for fast gathers
+        self._candidate_points = np.ascontiguousarray(self.points[order].transpose(0, 2, 1), dtype=np.float32)
+
+    @property
+    def max_candidates(self):
+        """Maximum number of colors compared for a query"""
+        return self._candidates.shape[1]
+
+    def __len__(self):
+        return len(self.names)
+
+    def __repr__(self):
+        return 'NamedColorIndex({0} colors, space={1!r}, resolution={2})'.format(len(self), self.space, self.resolution)
+
+    def _query_points(self, points):
+        # nearest color index and squared distance of (N, 3) points in the index space
+        index = np.empty(len(points), dtype=np.intp)
+        cell = np.floor((points - self._lo) / self._cell).astype(np.intp)
+        inside = ((cell >= 0) & (cell < self.resolution)).all(axis=1)
+
+        r = self.resolution
+        flat = (cell[inside, 0] * r + cell[inside, 1]) * r + cell[inside, 2]
+        # candidates are compared in float32, the distance of the best one is computed in float64
+        candidates = self._candidate_points[flat]
+        query = points[inside].astype(np.float32)
+        d2 = np.zeros(candidates[:, 0].shape, dtype=np.float32)
+        for axis in range(3):
+            diff = candidates[:, axis] - query[:, axis, None]
+            diff *= diff
+            d2 += diff
+        index[inside] = self._candidates[flat, d2.argmin(axis=1)]
+
+        if not inside.all():
+            diff = self.points[None, :, :] - points[~inside][:, None, :]
+            index[~inside] = np.einsum('nki,nki->nk', diff, diff).argmin(axis=1)
+        diff = self.points[index] - points
+        return index, np.einsum('ni,ni->n', diff, diff)
+
+    def query(self, colors, space='srgb'):
+        """Find the nearest named color of every color
+
+        Parameters
+        ----------
+        colors : array-like, list of str or ColorArray
+            (..., 3) or (..., 4) array of colors, HEX codes or ColorArray
+            sRGB uint8 arrays are interpreted as [0,255] values, float arrays as [0,1]
+        space : str, optional
+            space of colors when passing an array, by default 'srgb'
+
+        Returns
+        -------
+        tuple of np.ndarray
+            (...) arrays of indices into names and of distances in the index space
+        """
+        colors = _query_colors(colors)
+        shape = colors.shape[:-1]
+        flat = colors.reshape(-1, 3)
+        index = np.empty(len(flat), dtype=np.intp)
+        dist2 = np.empty(len(flat))
+        for i in range(0, len(flat), CHUNK_SIZE):
+            points = convert_colorspace(flat[i:i + CHUNK_SIZE], space, self.space)
+            index[i:i + CHUNK_SIZE], dist2[i:i + CHUNK_SIZE] = self._query_points(points)
+        return index.reshape(shape), np.sqrt(dist2).reshape(shape)
+
+    def nearest(self, colors, space='srgb', return_distance=False):
+        """Return the names of the nearest named colors
+
+        Parameters
+        ----------
+        colors : array-like, list of str or ColorArray
+            colors to look up, see query
+        space : str, optional
+            space of colors when passing an array, by default 'srgb'
+        return_distance : bool, optional
+            whether to also return the distances, by default False
+
+        Returns
+        -------
+        np.ndarray or tuple of np.ndarray
+            (...) array of names, and of distances if return_distance is True
+        """
+        index, dist = self.query(colors, space=space)
+        if return_distance:
+            return self.names[index], dist
+        return self.names[index]
+
+
+def get_named_color_index(palette='all', space='oklab', resolution=32):
+    """Return the prebuilt index of a set of named colors
+
+    Indices are built the first time they are needed and kept for the session.
+
+    Parameters
+    ----------
+    palette : str or dict, optional
+        'all', 'css' (matplotlib CSS4 colors), 'csiro' or a dict of HEX colors by name, by default 'all'
+    space : str, optional
+        'oklab' or 'lab', by default 'oklab'
+    resolution : int, optional
+        number of grid cells along each axis, by default 32
+
+    Returns
+    -------
+    NamedColorIndex
+        index of the named colors
+    """
+    if isinstance(palette, dict):
+        return NamedColorIndex(palette, space=space, resolution=resolution)
+    key = (palette, space, resolution)
+    try:
+        return _indices[key]
+    except KeyError:
+        index = NamedColorIndex(_palette_colors(palette), space=space, resolution=resolution)
+        return _indices.setdefault(key, index)
+
+
+def nearest_named_color(colors, palette='all', space='oklab', return_distance=False):
+    """Find the nearest CSS or CSIRO named color of every color
+
+    Parameters
+    ----------
+    colors : str, array-like, list of str or ColorArray
+        HEX codes, (..., 3) or (..., 4) sRGB array or ColorArray
+        uint8 arrays are interpreted as [0,255] values, float arrays as [0,1]
+    palette : str or dict, optional
+        'all', 'css', 'csiro' or a dict of HEX colors by name, by default 'all'
+    space : str, optional
+        'oklab' or 'lab', space of the perceptual distance, by default 'oklab'
+    return_distance : bool, optional
+        whether to also return the distances, by default False
+
+    Returns
+    -------
+    np.ndarray or tuple of np.ndarray
+        array of names, and of distances if return_distance is True
+    """
+    return get_named_color_index(palette, space=space).nearest(colors, return_distance=return_distance)
@@ -0,0 +1,195 @@
+import numpy as np
+import matplotlib.colors as col
+
+from .converters import basestring
+from .cmaps import _resolve_cmap
+from .colorarray import ColorArray
+from .nearest import NamedColorIndex
+
+# number of pixels processed at once
+CHUNK_SIZE = 2 ** 20
+
+DITHER_METHODS = (None, 'ordered', 'floyd-steinberg')
+
+# 8x8 Bayer threshold matrix, centered on 0
+_BAYER_8 = np.zeros((1, 1))
+for _ in range(3):
+    _BAYER_8 = np.block([[4 * _BAYER_8, 4 * _BAYER_8 + 2], [4 * _BAYER_8 + 3, 4 * _BAYER_8 + 1]])
+_BAYER_8 = ((_BAYER_8 + 0.5) / 64 - 0.5).astype(np.float32)
+
+# palette lookup cubes by (packed colors, resolution, space)
+_palette_luts = {}
+
+
+def _palette_colors(palette):
+    if isinstance(palette, (basestring, col.Colormap)):
+        colors = ColorArray.from_cmap(_resolve_cmap(palette))
+    else:
+        colors = ColorArray(palette)
+    if not 0 < len(colors) <= 256:
+        raise ValueError("The palette must have between 1 and 256 colors, not {0}".format(len(colors)))
+    return colors
+
+
+def get_palette_lut(palette, resolution=64, space='oklab'):
+    """Return the lookup cube mapping every sRGB color to its nearest palette color
+
+    The sRGB cube is divided in resolution^3 cells, every cell is mapped to the
+    palette color nearest to its centre. Cubes are computed once per session.
+
+    Parameters
+    ----------
+    palette : str, Colormap, list of str or ColorArray
+        colormap name (for example 'csiro_all'), colormap or list of colors, up to 256 colors
+    resolution : int, optional
+        number of cells along each axis, a power of 2 between 16 and 256, by default 64
+    space : str, optional
+        'oklab' or 'lab', space where distances are measured, by default 'oklab'
+
+    Returns
+    -------
+    tuple of np.ndarray and ColorArray
+        flat (resolution^3,) uint8 array of palette indices, indexed by (r * resolution + g) * resolution + b
+        of the cells, and the palette colors
+    """
+    if resolution not in (16, 32, 64, 128, 256):
+        raise ValueError("The argument 'resolution' must be a power of 2 between 16 and 256")
+    colors = _palette_colors(palette)
+    key = (tuple(colors.packed.tolist()), resolution, space)
+    try:
+        return _palette_luts[key], colors
+    except KeyError:
+        pass
+    index = NamedColorIndex(dict((str(i), h) for i, h in enumerate(colors.hex.tolist())), space=space)
+    centres = ((np.arange(resolution) + 0.5) * (256 / resolution) - 0.5) / 255
+    grid = np.stack(np.meshgrid(centres, centres, centres, indexing='ij'), axis=-1).reshape(-1, 3)
+    lut, _ = index.query(grid)
+    lut = lut.astype(np.uint8)
+    lut.flags.writeable = False
+    return _palette_luts.setdefault(key, lut), colors
+
+
+def _lookup(lut, rgb8, resolution):
+    # palette index of (..., 3) uint8 colors
+    shift = 8 - int(resolution).bit_length() + 1
+    cells = (rgb8 >> shift).astype(np.intp)
+    return lut[(cells[..., 0] * resolution + cells[..., 1]) * resolution + cells[..., 2]]
+
+
+def _to_uint8(rgb):
+    return np.clip(np.rint(rgb), 0, 255).astype(np.uint8)
+
+
+def _floyd_steinberg(rgb, carry, lut, resolution, palette):
+    # Error diffusion over an (h, w, 3) tile of [0,255] values, plus the errors carried from the
+    # previous tile. Pixels on the same anti-diagonal x + 2y do not depend on each other, so
+    # every wavefront is processed at once. Returns the palette indices and the errors to carry
+    h, w = rgb.shape[:2]
+    work = np.zeros((h + 1, w, 3), dtype=np.float32)
+    work[:h] = rgb
+    work[0] += carry
+    indices = np.empty((h, w), dtype=np.uint8)
+    for t in range(w + 2 * (h - 1)):
+        ys = np.arange(max(0, (t - w + 2) // 2), min(h - 1, t // 2) + 1)
+        xs = t - 2 * ys
+        values = work[ys, xs]
+        k = _lookup(lut, _to_uint8(values), resolution)
+        indices[ys, xs] = k
+        error = values - palette[k]
+        right = xs + 1 < w
+        left = xs > 0
+        work[ys[right], xs[right] + 1] += error[right] * (7 / 16)
+        work[ys[left] + 1, xs[left] - 1] += error[left] * (3 / 16)
+        work[ys + 1, xs] += error * (5 / 16)
+        work[ys[right] + 1, xs[right] + 1] += error[right] * (1 / 16)
+    return indices, work[h]
+
+
+def quantize_image(image, palette='csiro_all', dither=None, resolution=64, space='oklab',
+                   return_indices=False, out=None, tile_rows=None):
+    """Quantize an image to the nearest colors of a palette
+
+    Every pixel is mapped with a precomputed lookup cube (see get_palette_lut),
+    the image is processed tile by tile so that memory-mapped images of any size
+    can be quantized.
+
+    Parameters
+    ----------
+    image : np.ndarray
+        (..., 3) RGB or (..., 4) RGBA image, uint8 or float in [0,1]
+        the alpha channel is copied unchanged
+    palette : str, Colormap, list of str or ColorArray, optional
+        colormap name, colormap or list of colors, by default 'csiro_all'
+    dither : str, optional
+        None, 'ordered' (8x8 Bayer matrix) or 'floyd-steinberg', by default None
+    resolution : int, optional
+        resolution of the lookup cube, by default 64
+    space : str, optional
+        'oklab' or 'lab', space where distances are measured, by default 'oklab'
+    return_indices : bool, optional
+        whether to return the palette indices instead of the colors, by default False
+    out : np.ndarray, optional
+        output array, for example a np.memmap, by default a new array
+        (...) uint8 array of indices, or array with the shape and dtype of image
+    tile_rows : int, optional
+        number of rows per tile, by default tiles of about CHUNK_SIZE pixels
+
+    Returns
+    -------
+    np.ndarray
+        quantized image, or (...) uint8 array of palette indices if return_indices is True
+    """
+    if dither not in DITHER_METHODS:
+        raise ValueError("The argument 'dither' must be one of {0}".format(DITHER_METHODS))
+    image = np.asarray(image)
+    if image.ndim < 2 or image.shape[-1] not in (3, 4):
+        raise ValueError("image must have shape (..., 3) or (..., 4), not {0}".format(image.shape))
+    if image.dtype != np.uint8 and image.dtype.kind != 'f':
+        raise TypeError("image must be uint8 or float, not {0}".format(image.dtype))
+    lut, colors = get_palette_lut(palette, resolution=resolution, space=space)
+
+    if return_indices:
+        shape, dtype = image.shape[:-1], np.dtype(np.uint8)
+    else:
+        shape, dtype = image.shape, image.dtype
+    if out is None:
+        out = np.empty(shape, dtype=dtype)
+    elif out.shape != shape or out.dtype != dtype:
+        raise ValueError("out must be a {0} array of shape {1}".format(dtype, shape))
+
+    # images are processed as (rows, width, channels), (N, channels) arrays as a single row
+    if image.ndim == 2:
+        image2 = image[None]
+    else:
+        image2 = image.reshape((-1,) + image.shape[-2:])
+    out2 = out.reshape(image2.shape[:2] + out.shape[image.ndim - 1:])
+    height, width, channels = image2.shape
+    if tile_rows is None:
+        tile_rows = max(1, CHUNK_SIZE // width)
+
+    palette8 = colors.rgb8
+    palette_values = palette8 if dtype == np.uint8 else colors.rgb.astype(dtype)
+    scale = 255 if image.dtype.kind == 'f' else 1
+    # ordered dithering spreads values over the gap between palette levels along each channel
+    spread = 255 / max(1, round(len(colors) ** (1 / 3)) - 1)
+    carry = np.zeros((width, 3), dtype=np.float32)
+    for start in range(0, height, tile_rows):
+        stop = min(start + tile_rows, height)
+        rgb = image2[start:stop, :, :3]
+        if dither is None:
+            rgb8 = rgb if scale == 1 else _to_uint8(rgb * scale)
+            indices = _lookup(lut, rgb8, resolution)
+        elif dither == 'ordered':
+            threshold = _BAYER_8[np.arange(start, stop)[:, None] % 8, np.arange(width)[None, :] % 8]
+            indices = _lookup(lut, _to_uint8(rgb * np.float32(scale) + (threshold * spread)[..., None]), resolution)
+        else:
+            indices, carry = _floyd_steinberg(rgb * np.float32(scale), carry, lut, resolution,
+                                              palette8.astype(np.float32))
+
+        if return_indices:
+            out2[start:stop] = indices
+        else:
+            out2[start:stop, :, :3] = palette_values[indices]
+            if channels == 4:
+                out2[start:stop, :, 3] = image2[start:stop, :, 3]
+    return out
@@ -0,0 +1,451 @@
+import os
+import threading
+import weakref
+
+import numpy as np
+
+from .cmaps import _resolve_cmap
+from .colorarray import ColorArray, PACKED_DTYPE
+
+# for python 2 and python 3 compatibility
+try:
+    # python 2
+    basestring # type: ignore
+except NameError:
+    # python 3
+    basestring = (str, bytes)
+
+# number of pixels processed at once, this bounds the size of the float temporaries
+CHUNK_SIZE = 2 ** 20
+
+# integer types small enough to be mapped through a LUT covering every possible value
+_DIRECT_LUT_DTYPES = (np.dtype(np.uint8), np.dtype(np.int8), np.dtype(np.uint16), np.dtype(np.int16))
+
+_lut_cache = {}
+_lut_cache_lock = threading.Lock()
+
+
+def _evict_lut(key):
+    with _lut_cache_lock:
+        _lut_cache.pop(key, None)
+
+
+def get_cmap_lut(cmap):
+    """Retrieve the quantized RGBA lookup table of a colormap
+
+    The table has cmap.N colors followed by the under, over and bad colors,
+    quantized to uint8 exactly as ``cmap(x, bytes=True)`` does.
+    Tables are cached per colormap and rebuilt if the colormap is modified.
+
+    Parameters
+    ----------
+    cmap : str or Colormap
+        colormap name or Colormap object
+
+    Returns
+    -------
+    np.ndarray
+        (cmap.N + 3,) array of packed RGBA values (see ColorArray)
+    """
+    cmap = _resolve_cmap(cmap)
+    if not cmap._isinit:
+        cmap._init()
+    key = id(cmap)
+    with _lut_cache_lock:
+        cached = _lut_cache.get(key)
+    if cached is not None:
+        ref, source, lut = cached
+        if ref() is cmap and np.array_equal(source, cmap._lut):
+            return lut
+
+    source = cmap._lut.copy()
+    lut = np.ascontiguousarray((source * 255).astype(np.uint8)).view(PACKED_DTYPE).reshape(-1)
+    lut.flags.writeable = False
+    with _lut_cache_lock:
+        _lut_cache[key] = (weakref.ref(cmap, lambda _, key=key: _evict_lut(key)), source, lut)
+    return lut
+
+
+def _float_dtype(dtype):
+    # same promotion as matplotlib.colors.Normalize: float types are preserved,
+    # small integers become float32 and larger ones float64
+    if np.issubdtype(dtype, np.integer) or dtype == np.bool_:
+        return np.promote_types(dtype, np.float32)
+    return dtype
+
+
+def _normalize(data, vmin, vmax, norm):
+    # return the normalized block as a float array and the mask of bad values (or None)
+    if norm is not None:
+        xa = norm(data)
+        mask = np.ma.getmask(xa)
+        xa = np.array(np.ma.getdata(xa), copy=True)
+    else:
+        mask = np.ma.getmask(data)
+        data = np.ma.getdata(data)
+        xa = np.array(data, dtype=_float_dtype(data.dtype), copy=True)
+        if vmax == vmin:
+            xa[np.isfinite(xa)] = 0
+        else:
+            # in-place operations with float64 scalars, exactly like Normalize.__call__
+            xa -= np.float64(vmin)
+            xa /= np.float64(vmax) - np.float64(vmin)
+    if mask is np.ma.nomask:
+        mask = None
+    return xa, mask
+
+
+def _lut_indices(xa, mask, n):
+    # same binning as matplotlib.colors.Colormap.__call__
+    xa *= n
+    xa[xa == n] = n - 1
+    mask_under = xa < 0
+    mask_over = xa >= n
+    mask_bad = np.isnan(xa)
+    if mask is not None:
+        mask_bad |= mask
+    with np.errstate(invalid='ignore'):
+        idx = xa.astype(np.intp)
+    idx[mask_under] = n
+    idx[mask_over] = n + 1
+    idx[mask_bad] = n + 2
+    return idx
+
+
+def _scaling(data, cmap, vmin, vmax, norm):
+    # resolve the colormap, normalization and vmin/vmax shared by all the chunks
+    if norm is not None and (vmin is not None or vmax is not None):
+        raise ValueError("Passing a norm together with vmin/vmax is not supported")
+    cmap = _resolve_cmap(cmap)
+    if norm is not None:
+        if not norm.scaled():
+            norm.autoscale_None(np.ma.masked_invalid(data))
+        return cmap, None, None, norm
+    if vmin is None or vmax is None:
+        values = np.ma.getdata(data)
+        finite = np.isfinite(values) if values.dtype.kind == 'f' else None
+        if np.ma.getmask(data) is not np.ma.nomask:
+            valid = ~np.ma.getmask(data)
+            finite = valid if finite is None else finite & valid
+        values = values if finite is None else values[finite]
+        if values.size:
+            vmin = values.min() if vmin is None else vmin
+            vmax = values.max() if vmax is None else vmax
+        else:
+            vmin = 0 if vmin is None else vmin
+            vmax = 1 if vmax is None else vmax
+    return cmap, float(vmin), float(vmax), None
+
+
+def _allocate_output(shape, out, packed):
+    if packed:
+        if out is None:
+            out = np.empty(shape, dtype=PACKED_DTYPE)
+        if out.shape != tuple(shape) or out.dtype != PACKED_DTYPE:
+            raise ValueError("out must be a uint32 array of shape {0}".format(tuple(shape)))
+        if not out.flags.c_contiguous:
+            raise ValueError("out must be C-contiguous")
+        return out, out
+    if out is None:
+        out = np.empty(tuple(shape) + (4,), dtype=np.uint8)
+    if out.shape != tuple(shape) + (4,) or out.dtype != np.uint8:
+        raise ValueError("out must be a uint8 array of shape {0}".format(tuple(shape) + (4,)))
+    if not out.flags.c_contiguous:
+        raise ValueError("out must be C-contiguous")
+    return out, out.view(PACKED_DTYPE).reshape(shape)
+
+
+def _direct_lut(dtype, lut, cmap, vmin, vmax, norm):
+    # for 8 and 16 bit integers map every possible value once, so that pixels are a single table lookup
+    if dtype not in _DIRECT_LUT_DTYPES or norm is not None:
+        return None
+    info = np.iinfo(dtype)
+    values = np.arange(info.min, info.max + 1).astype(dtype)
+    return lut.take(_lut_indices(*_normalize(values, vmin, vmax, None), n=cmap.N))
+
+
+def _colorize_into(data, out32, lut, cmap, vmin, vmax, norm, full_lut=None, chunk_size=CHUNK_SIZE):
+    # colorize `data` into the packed `out32` buffer, chunk by chunk
+    flat_out = out32.reshape(-1)
+    flat_data = data.reshape(-1)
+    if full_lut is not None and not np.ma.isMaskedArray(data):
+        offset = np.iinfo(data.dtype).min
+        for start in range(0, flat_data.size, chunk_size):
+            block = flat_data[start:start + chunk_size]
+            if offset:
+                block = block.astype(np.intp) - offset
+            np.take(full_lut, block, out=flat_out[start:start + chunk_size])
+        return out32
+
+    for start in range(0, flat_data.size, chunk_size):
+        xa, mask = _normalize(flat_data[start:start + chunk_size], vmin, vmax, norm)
+        idx = _lut_indices(xa, mask, cmap.N)
+        np.take(lut, idx, out=flat_out[start:start + chunk_size])
+    return out32
+
+
+def apply_cmap(data, cmap, vmin=None, vmax=None, norm=None, out=None, packed=False):
+    """Map an array of values to uint8 RGBA colors through a colormap
+
+    This is equivalent to ``cmap(norm(data), bytes=True)``, but it goes through
+    a cached uint8 lookup table and processes the data in chunks, so that no
+    full size float64 RGBA array is ever allocated.
+    NaN and masked values get the bad color, values below vmin and above vmax
+    get the under and over colors.
+
+    Parameters
+    ----------
+    data : array-like
+        values to colorize, of any shape
+    cmap : str or Colormap
+        colormap name (see get_cmap) or Colormap object
+    vmin, vmax : float, optional
+        data range mapped to the colormap, by default the data min and max
+    norm : matplotlib.colors.Normalize, optional
+        normalization to apply instead of vmin/vmax, by default None
+    out : np.ndarray, optional
+        output buffer to write into, by default a new array is allocated
+        it must be a C-contiguous uint8 array of shape data.shape + (4,),
+        or a uint32 array of shape data.shape if packed is True
+    packed : bool, optional
+        whether to return packed RGBA uint32 values (see ColorArray) instead
+        of uint8 RGBA channels, by default False
+
+    Returns
+    -------
+    np.ndarray
+        uint8 array of shape data.shape + (4,), or packed uint32 array of shape data.shape
+    """
+    if not np.ma.isMaskedArray(data):
+        data = np.asarray(data)
+    cmap, vmin, vmax, norm = _scaling(data, cmap, vmin, vmax, norm)
+    lut = get_cmap_lut(cmap)
+    out, out32 = _allocate_output(data.shape, out, packed)
+    full_lut = _direct_lut(data.dtype, lut, cmap, vmin, vmax, norm)
+    _colorize_into(data, out32, lut, cmap, vmin, vmax, norm, full_lut=full_lut)
+    return out
+
+
+def _label_palette(cmap):
+    # packed colors of a colormap (without the under, over and bad colors) or of a list of colors
+    if isinstance(cmap, basestring) or hasattr(cmap, '_init'):
+        cmap = _resolve_cmap(cmap)
+        return get_cmap_lut(cmap)[:cmap.N]
+    return ColorArray(cmap).packed
+
+
+def _background_packed(color):
+    # like print_color, integer (or > 1) RGB(A) values are read as [0,255], floats as [0,1]
+    if isinstance(color, basestring):
+        return ColorArray(color).packed[0]
+    rgba = np.asarray(color)
+    if rgba.dtype.kind not in 'uif':
+        raise TypeError('RGB values can only be floating or integer')
+    normalized = rgba.dtype.kind == 'f' and not (rgba > 1).any()
+    return ColorArray.from_rgb(rgba, normalized=normalized).packed[0]
+
+
+# label ranges up to this size are renumbered with a presence table instead of sorting the labels
+_COMPACT_TABLE_SIZE = 2 ** 24
+
+
+def colorize_labels(labels, cmap, out=None, packed=False, compact=False, background_label=None,
+                    background_color=(0, 0, 0, 0)):
+    """Map an integer label image to uint8 RGBA colors
+
+    Label l gets the color l modulo the number of colors of the palette, so that the
+    same label always gets the same color. With compact=True, the labels present in the
+    image are first renumbered by rank, so that up to N labels get N different colors
+    even if their ids are sparse or huge.
+    Colors are looked up with np.take in a uint8 table, without any float conversion.
+
+    Parameters
+    ----------
+    labels : array-like
+        integer labels, of any shape
+    cmap : str, Colormap, list of str or ColorArray
+        colormap name, Colormap (its N colors are used) or list of colors
+    out : np.ndarray, optional
+        output buffer to write into, by default a new array is allocated
+        it must be a C-contiguous uint8 array of shape labels.shape + (4,),
+        or a uint32 array of shape labels.shape if packed is True
+    packed : bool, optional
+        whether to return packed RGBA uint32 values (see ColorArray), by default False
+    compact : bool, optional
+        whether to renumber the labels by rank before picking the colors, by default False
+    background_label : int, optional
+        label drawn with background_color, by default None
+    background_color : tuple or str, optional
+        RGB(A) or HEX color of the background label, by default transparent
+        integer values (or values above 1) are read as [0,255] values, float values as [0,1] values
+
+    Returns
+    -------
+    np.ndarray
+        uint8 array of shape labels.shape + (4,), or packed uint32 array of shape labels.shape
+    """
+    labels = np.asarray(labels)
+    if labels.dtype.kind not in 'iub':
+        raise TypeError("labels must be integers, not {0}".format(labels.dtype))
+    palette = _label_palette(cmap)
+    background = _background_packed(background_color)
+    out, out32 = _allocate_output(labels.shape, out, packed)
+    flat = labels.reshape(-1)
+    out_flat = out32.reshape(-1)
+    if flat.size == 0:
+        return out
+
+    low, high = int(flat.min()), int(flat.max())
+    has_background = background_label is not None and low <= background_label <= high
+    if high - low < _COMPACT_TABLE_SIZE:
+        # color of every label of the range, looked up with offsets from the lowest label
+        if compact:
+            present = np.zeros(high - low + 1, dtype=bool)
+            for start in range(0, flat.size, CHUNK_SIZE):
+                present[np.subtract(flat[start:start + CHUNK_SIZE], low, dtype=np.intp)] = True
+            if has_background:
+                present[background_label - low] = False
+            table = palette[(np.cumsum(present) - 1) % len(palette)]
+        else:
+            table = palette[np.arange(low, high + 1) % len(palette)]
+        if has_background:
+            table[background_label - low] = background
+        for start in range(0, flat.size, CHUNK_SIZE):
+            codes = np.subtract(flat[start:start + CHUNK_SIZE], low, dtype=np.intp)
+            np.take(table, codes, out=out_flat[start:start + CHUNK_SIZE])
+        return out
+
+    if not compact:
+        for start in range(0, flat.size, CHUNK_SIZE):
+            chunk = flat[start:start + CHUNK_SIZE]
+            np.take(palette, np.mod(chunk, len(palette)), out=out_flat[start:start + CHUNK_SIZE])
+            if background_label is not None:
+                out_flat[start:start + CHUNK_SIZE][chunk == background_label] = background
+        return out
+
+    # sparse labels spread over a huge range
+    unique = np.unique(flat)
+    if background_label is not None:
+        unique = unique[unique != background_label]
+    table = palette[np.arange(len(unique)) % len(palette)]
+    for start in range(0, flat.size, CHUNK_SIZE):
+        chunk = flat[start:start + CHUNK_SIZE]
+        np.take(table, np.searchsorted(unique, chunk), out=out_flat[start:start + CHUNK_SIZE], mode='clip')
+        if background_label is not None:
+            out_flat[start:start + CHUNK_SIZE][chunk == background_label] = background
+    return out
+
+
+def _open_input(data):
+    if isinstance(data, basestring):
+        if not data.endswith('.npy'):
+            raise ValueError("only .npy files can be opened from a path, got '{0}'".format(data))
+        return np.load(data, mmap_mode='r')
+    if not hasattr(data, 'shape') or not hasattr(data, 'dtype'):
+        data = np.asarray(data)
+    return data
+
+
+def _open_output(out, shape, packed):
+    if not isinstance(out, basestring):
+        return _allocate_output(shape, out, packed)
+    full_shape = tuple(shape) if packed else tuple(shape) + (4,)
+    dtype = PACKED_DTYPE if packed else np.uint8
+    if out.endswith('.npy'):
+        out = np.lib.format.open_memmap(out, mode='w+', dtype=dtype, shape=full_shape)
+    else:
+        out = np.memmap(out, mode='w+', dtype=dtype, shape=full_shape)
+    return _allocate_output(shape, out, packed)
+
+
+def _read_block(data, start, stop):
+    # rows of the input, keeping the mask of masked arrays
+    block = data[start:stop]
+    if np.ma.isMaskedArray(block):
+        return block
+    return np.asarray(block)
+
+
+def _chunk_minmax(data, start, stop):
+    block = _read_block(data, start, stop)
+    if np.ma.isMaskedArray(block):
+        block = block.compressed()
+    if block.dtype.kind == 'f':
+        block = block[np.isfinite(block)]
+    if not block.size:
+        return None
+    return block.min(), block.max()
+
+
+def apply_cmap_chunked(data, cmap, out=None, vmin=None, vmax=None, norm=None, packed=False,
+                       chunk_rows=None, n_workers=None):
+    """Colorize arrays larger than memory, tile by tile, on multiple threads
+
+    The data is read in blocks of rows (along the first axis) and every block
+    is colorized with the same cached LUT as apply_cmap, straight into the
+    output buffer. NumPy releases the GIL while indexing, so the blocks are
+    processed concurrently on a thread pool.
+
+    Parameters
+    ----------
+    data : str or array-like
+        path to a .npy file (opened memory-mapped) or any array-like object
+        with shape, dtype and slicing along the first axis (np.memmap, h5py, zarr...)
+    cmap : str or Colormap
+        colormap name (see get_cmap) or Colormap object
+    out : str or np.ndarray, optional
+        output to write into, by default a new array is allocated in memory
+        passing a path ending in .npy will create a memory-mapped .npy file,
+        any other path will create a raw memory-mapped file
+    vmin, vmax : float, optional
+        data range mapped to the colormap, by default the data min and max
+        (this requires an additional pass over the data)
+        masked values are ignored and get the bad color, as with apply_cmap
+    norm : matplotlib.colors.Normalize, optional
+        normalization to apply instead of vmin/vmax, it must already be scaled, by default None
+    packed : bool, optional
+        whether to write packed RGBA uint32 values instead of uint8 RGBA channels, by default False
+    chunk_rows : int, optional
+        number of rows per block, by default blocks of about CHUNK_SIZE * 8 values
+    n_workers : int, optional
+        number of threads, by default the number of CPUs
+
+    Returns
+    -------
+    np.ndarray or np.memmap
+        uint8 array of shape data.shape + (4,), or packed uint32 array of shape data.shape
+    """
+    from concurrent.futures import ThreadPoolExecutor
+
+    data = _open_input(data)
+    shape = tuple(data.shape)
+    if not shape:
+        raise ValueError("data must have at least one dimension")
+    if norm is not None and not norm.scaled():
+        raise ValueError("norm must be scaled (with vmin and vmax set) to colorize data in chunks")
+    if chunk_rows is None:
+        row_size = int(np.prod(shape[1:], dtype=np.int64))
+        chunk_rows = max(1, (CHUNK_SIZE * 8) // max(row_size, 1))
+    starts = list(range(0, shape[0], chunk_rows))
+
+    with ThreadPoolExecutor(max_workers=n_workers or os.cpu_count()) as pool:
+        if norm is None and (vmin is None or vmax is None):
+            ranges = [r for r in pool.map(lambda s: _chunk_minmax(data, s, s + chunk_rows), starts) if r is not None]
+            if ranges:
+                vmin = min(r[0] for r in ranges) if vmin is None else vmin
+                vmax = max(r[1] for r in ranges) if vmax is None else vmax
+        cmap, vmin, vmax, norm = _scaling(np.empty(0), cmap, vmin, vmax, norm)
+        lut = get_cmap_lut(cmap)
+        full_lut = _direct_lut(np.dtype(data.dtype), lut, cmap, vmin, vmax, norm)
+        out, out32 = _open_output(out, shape, packed)
+
+        def colorize(start):
+            block = _read_block(data, start, start + chunk_rows)
+            _colorize_into(block, out32[start:start + chunk_rows], lut, cmap, vmin, vmax, norm, full_lut=full_lut)
+
+        # consume the results to propagate exceptions
+        list(pool.map(colorize, starts))
+
+    if hasattr(out, 'flush'):
+        out.flush()
+    return out
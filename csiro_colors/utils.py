@@ -1,8 +1,12 @@
+import uuid
+from base64 import b64encode
+
 import numpy as np
-from IPython.display import HTML
 
-from ._color_picker import colorPicker
+from ._color_picker import colorPicker, ColorPicker
+from ._png import encode_png
 from .converters import NAMED_COLORS
+from .colorarray import ColorArray
 
 # for python 2 and python 3 compatibility
 try:
@@ -13,15 +17,117 @@ except NameError:
     basestring = (str, bytes)
 number = (int, float, np.integer, np.floating)
 
+# print_color renders more colors than this as a swatch grid
+SWATCH_THRESHOLD = 64
+
+
+def _swatch_colors(color):
+    # ColorArray of any color input of print_color, and the labels of HEX codes or named colors
+    if isinstance(color, ColorArray):
+        return color, None
+    if isinstance(color, basestring):
+        color = [color]
+    if isinstance(color, (list, tuple)) and len(color) and isinstance(color[0], basestring):
+        labels = list(color)
+        return ColorArray([NAMED_COLORS.get(c, c) for c in labels]), labels
+    color = np.asarray(color)
+    if color.ndim == 1 and color.dtype == np.uint32:
+        return ColorArray.from_packed(color), None
+    if color.ndim == 1:
+        color = color[None, :]
+    color = color.reshape(-1, color.shape[-1])
+    # like the text mode, integers or values above 1 are [0,255] values
+    normalized = color.dtype.kind == 'f' and not (color > 1).any()
+    return ColorArray.from_rgb(color, normalized=normalized), None
+
+
+def _n_colors(color):
+    # number of colors passed to print_color, without converting them
+    if isinstance(color, ColorArray):
+        return len(color)
+    if isinstance(color, np.ndarray):
+        if color.dtype == np.uint32:
+            return color.size
+        return color.size // color.shape[-1] if color.ndim else 1
+    if isinstance(color, (list, tuple)) and len(color) and not isinstance(color[0], number):
+        return len(color)
+    return 1
+
+
+def render_swatches(color, columns=None, swatch_size=16, tooltips=False):
+    """Render colors as a grid of swatches, in a single inline PNG image
+
+    The image has one pixel per color and is scaled up by the browser, so that the
+    output stays small for thousands of colors.
+
+    Arguments:
+    -----------
+    color : str, list of str, array-like or ColorArray
+        HEX codes or named colors, (N, 3) or (N, 4) RGB(A) array (uint8 or [0,255] values,
+        or floats in [0,1]), packed RGBA uint32 array or ColorArray
+    columns : int, optional (default : None)\n
+        number of swatches per row, by default up to 32
+    swatch_size : int, optional (default : 16)\n
+        size of the swatches in pixels
+    tooltips : bool, optional (default : False)\n
+        whether to show the index and HEX code of the swatch under the mouse
+
+    Returns:
+    -----------
+    out : str
+        HTML code
+    """
+    colors, labels = _swatch_colors(color)
+    n = len(colors)
+    if n == 0:
+        return ''
+    if columns is None:
+        columns = min(n, 32)
+    rows = -(-n // columns)
+    grid = np.zeros((rows * columns, 4), dtype=np.uint8)
+    grid[:n] = colors.rgba8
+    png = encode_png(grid.reshape(rows, columns, 4))
 
-def print_color(color):
+    uid = 'csiro_swatches_{0}'.format(uuid.uuid4().hex)
+    out = ['<img src="data:image/png;base64,{0}" width="{1}" height="{2}" alt="{3} colors" '
+           'style="image-rendering:pixelated; image-rendering:crisp-edges"{4}>'.format(
+               b64encode(png).decode('ascii'), columns * swatch_size, rows * swatch_size, n,
+               ' usemap="#{0}"'.format(uid) if tooltips else '')]
+    if tooltips:
+        hex_codes = colors.hex.tolist()
+        if labels is None:
+            labels = hex_codes
+        out.append('<map name="{0}">'.format(uid))
+        for i in range(n):
+            x, y = (i % columns) * swatch_size, (i // columns) * swatch_size
+            title = '{0}: {1}'.format(i, labels[i]) if labels[i] == hex_codes[i] else \
+                '{0}: {1} {2}'.format(i, labels[i], hex_codes[i])
+            out.append('<area coords="{0},{1},{2},{3}" title="{4}">'.format(
+                x, y, x + swatch_size, y + swatch_size, title))
+        out.append('</map>')
+    return ''.join(out)
+
+
+def print_color(color, swatches=None, columns=None, swatch_size=16, tooltips=False):
     """Utility to print hex color codes in your jupyter notebook
-    
+
     Arguments:
     -----------
-    color : str or list of str
+    color : str, list of str, array-like or ColorArray
         hex codes to be printed in your jupyter notebook
+    swatches : bool, optional (default : None)\n
+        whether to render the colors as a grid of swatches (see render_swatches) instead of text
+        by default only more than SWATCH_THRESHOLD colors, or a ColorArray, are rendered as swatches
+    columns, swatch_size, tooltips : optional\n
+        options of the swatch grid, see render_swatches
     """
+    from IPython.display import HTML
+
+    if swatches is None:
+        swatches = isinstance(color, ColorArray) or _n_colors(color) > SWATCH_THRESHOLD
+    if swatches:
+        return HTML(render_swatches(color, columns=columns, swatch_size=swatch_size, tooltips=tooltips))
+
     out = ""
     if not isinstance(color, (list, np.ndarray)) or all([isinstance(ci, number) for ci in color]):
         color = [color]
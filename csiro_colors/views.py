@@ -0,0 +1,176 @@
+import matplotlib.colors as col
+import numpy as np
+
+
+class _ViewMixin():
+    # Shared implementation of ColormapView and ListedColormapView.
+    # A view samples its base colormap between `start` and `stop` (stop < start means reversed)
+    # and builds its own table only when matplotlib initializes it.
+    # Views of views sample their parent view, exactly like sampling a materialized colormap would
+
+    def _setup(self, base, start, stop, N, alpha, name):
+        reverse = stop < start
+        if not isinstance(base, col.Colormap):
+            raise TypeError("The argument 'base' must be a Colormap")
+        if N is None:
+            if isinstance(base, col.ListedColormap):
+                N = max(1, int(round(base.N * abs(stop - start))))
+            else:
+                N = base.N
+        if name is None:
+            name = base.name + ('_r' if reverse else '')
+        col.Colormap.__init__(self, name, N)
+
+        self.base = base
+        self.start = float(start)
+        self.stop = float(stop)
+        self.alpha = alpha
+        # the extremes follow the base colormap, swapped when reversed
+        bad, under, over = (getattr(base, attr, None) for attr in ('_rgba_bad', '_rgba_under', '_rgba_over'))
+        if reverse:
+            under, over = over, under
+        if bad is not None:
+            self._rgba_bad = bad
+        self._rgba_under = under
+        self._rgba_over = over
+        self.colorbar_extend = base.colorbar_extend
+
+    def _sample_positions(self):
+        # same sampling as Colormap.resampled, which also picks the exact colors when reversing
+        return self.start + (self.stop - self.start) * np.linspace(0, 1, self.N)
+
+    def _init(self):
+        # Assemble the LUT first in a local variable in case of parallel threads
+        lut = np.zeros((self.N + 3, 4), float)
+        lut[:-3] = self.base(self._sample_positions())
+        if self.alpha is not None:
+            lut[:-3, 3] = self.alpha
+        self._lut = lut
+        self._isinit = True
+        self._set_extremes()
+
+    @property
+    def is_identity(self):
+        """Whether the view has the same colors as its base colormap"""
+        return (self.start == 0 and self.stop == 1 and self.N == self.base.N and self.alpha is None)
+
+    def reversed(self, name=None):
+        """Return a reversed view of the colormap"""
+        return cmap_view(self, start=1, stop=0, N=self.N, name=name)
+
+    def resampled(self, lutsize):
+        """Return a view of the colormap with lutsize entries"""
+        return cmap_view(self, N=lutsize, name=self.name)
+
+    def truncated(self, start, stop, N=None, name=None):
+        """Return a view of a sub-range of the colormap"""
+        return cmap_view(self, start=start, stop=stop, N=N, name=name)
+
+    def with_alpha(self, alpha):
+        """Return a view of the colormap with a fixed alpha"""
+        return cmap_view(self, N=self.N, alpha=alpha, name=self.name)
+
+    def materialize(self):
+        """Return a standalone ListedColormap with the colors of this view"""
+        self._ensure_init()
+        cmap = col.ListedColormap(self._lut[:-3].copy(), name=self.name)
+        cmap._rgba_bad, cmap._rgba_under, cmap._rgba_over = self._rgba_bad, self._rgba_under, self._rgba_over
+        return cmap
+
+    def _ensure_init(self):
+        if not self._isinit:
+            self._init()
+
+    def __repr__(self):
+        return '{0}({1!r}, start={2}, stop={3}, N={4})'.format(
+            type(self).__name__, self.base.name, self.start, self.stop, self.N)
+
+
+class ColormapView(_ViewMixin, col.Colormap):
+    """Continuous colormap defined as a view over another colormap
+
+    Reversed, resampled, truncated and alpha-adjusted variants share the base
+    colormap and only build their own table when matplotlib needs it.
+
+    Parameters
+    ----------
+    base : Colormap
+        colormap to derive from
+    start, stop : float, optional
+        sub-range of the base colormap, by default 0 and 1
+        passing stop < start will reverse the colormap
+    N : int, optional
+        number of colors, by default the number of colors of the base colormap
+    alpha : float, optional
+        alpha to apply to all colors, by default None (unchanged)
+    name : str, optional
+        name of the colormap, by default the base name (with '_r' if reversed)
+    """
+
+    def __init__(self, base, start=0.0, stop=1.0, N=None, alpha=None, name=None):
+        self._setup(base, start, stop, N, alpha, name)
+
+
+class ListedColormapView(_ViewMixin, col.ListedColormap):
+    """Discrete colormap defined as a view over another colormap
+
+    This behaves as a ListedColormap, its colors are computed from the base
+    colormap the first time they are needed.
+
+    Parameters
+    ----------
+    base : Colormap
+        colormap to derive from
+    start, stop : float, optional
+        sub-range of the base colormap, by default 0 and 1
+        passing stop < start will reverse the colormap
+    N : int, optional
+        number of colors, by default the number of colors of the base colormap in the range
+    alpha : float, optional
+        alpha to apply to all colors, by default None (unchanged)
+    name : str, optional
+        name of the colormap, by default the base name (with '_r' if reversed)
+    """
+
+    def __init__(self, base, start=0.0, stop=1.0, N=None, alpha=None, name=None):
+        self._setup(base, start, stop, N, alpha, name)
+
+    @property
+    def colors(self):
+        """(N, 4) array of RGBA colors, read from the table of the view"""
+        self._ensure_init()
+        return self._lut[:-3]
+
+
+def cmap_view(cmap, start=0.0, stop=1.0, N=None, alpha=None, name=None, discrete=None):
+    """Create a reversed, truncated, resampled or alpha-adjusted view of a colormap
+
+    Views keep a reference to the base colormap instead of copying its colors,
+    so creating many variants is cheap. The colors are only computed when the
+    view is used.
+
+    Parameters
+    ----------
+    cmap : Colormap
+        colormap to derive from
+    start, stop : float, optional
+        sub-range of the colormap, by default 0 and 1
+        passing stop < start will reverse the colormap
+    N : int, optional
+        number of colors, by default the number of colors of the colormap in the range
+    alpha : float, optional
+        alpha to apply to all colors, by default None (unchanged)
+    name : str, optional
+        name of the new colormap, by default the name of cmap (with '_r' if reversed)
+    discrete : bool, optional
+        whether to return a ListedColormapView, by default only if cmap is a ListedColormap
+
+    Returns
+    -------
+    ColormapView or ListedColormapView
+        view over cmap
+    """
+    if discrete is None:
+        discrete = isinstance(cmap, col.ListedColormap)
+    cls = ListedColormapView if discrete else ColormapView
+    return cls(cmap, start=start, stop=stop, N=N, alpha=alpha, name=name)